@@ -0,0 +1,32 @@
+import time
+import tracemalloc
+import nura
+import nura.nn.functional as nf
+
+
+def run(length, weights):
+    q, k, v = (nura.randn(1, 4, length, 32, usegrad=True) for _ in range(3))
+    mask = nura.tensor(nura.tril(nura.ones(length, length)).data.astype(bool))
+    tracemalloc.start()
+    start = time.perf_counter()
+    out, _ = nf.attention(q, k, v, mask, weights=weights)
+    out.sum().backward()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    print("causal attention forward+backward, 4 heads, head dim 32")
+    for length in (1024, 2048, 4096):
+        for weights in (True, False):
+            name = "dense" if weights else "tiled"
+            elapsed, peak = run(length, weights)
+            print(
+                f"T={length:<5} {name}: {elapsed:6.2f}s peak: {peak:8.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
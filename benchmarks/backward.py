@@ -0,0 +1,59 @@
+import time
+import nura
+import nura.nn as nn
+from nura.autograd.functional import _backward
+from nura.autograd.graph import toposort
+
+
+class MLP(nn.Module):
+
+    def __init__(self, dim: int, depth: int) -> None:
+        super().__init__()
+        self.layers = [nn.Linear(dim, dim) for _ in range(depth)]
+        for i, l in enumerate(self.layers):
+            setattr(self, f"linear{i}", l)
+        self.relu = nn.ReLU()
+
+    def forward(self, x):
+        for l in self.layers:
+            x = self.relu(l(x))
+        return x
+
+
+def timeit(model, x, y, steps, fn):
+    times = []
+    for _ in range(steps):
+        for p in model.parameters():
+            p.cleargrad()
+        loss = nn.functional.mse(model(x), y)
+        start = time.perf_counter()
+        fn(loss)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    steps = 300
+    print("median time per call (us)")
+    for dim, depth in ((8, 4), (8, 16), (32, 32), (128, 8)):
+        model = MLP(dim, depth)
+        x = nura.randn(4, dim)
+        y = nura.randn(4, dim)
+        plan = nura.Plan()
+
+        topo = timeit(model, x, y, steps, lambda l: toposort(l.gradfn))
+        replay = timeit(
+            model, x, y, steps, lambda l: plan.schedule((l.gradfn,))
+        )
+        base = timeit(model, x, y, steps, lambda l: _backward((l,), (), ()))
+        planned = timeit(model, x, y, steps, lambda l: l.backward(plan=plan))
+        print(
+            f"{dim=:<4} {depth=:<3} toposort: {topo * 1e6:7.1f} "
+            f"replay: {replay * 1e6:7.1f} _backward: {base * 1e6:8.1f} "
+            f"plan: {planned * 1e6:8.1f} speedup: {base / planned:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import time
+import nura
+import nura.nn as nn
+
+
+class MLP(nn.Module):
+
+    def __init__(self, dim: int, depth: int) -> None:
+        super().__init__()
+        self.layers = [nn.Linear(dim, dim) for _ in range(depth)]
+        for i, l in enumerate(self.layers):
+            setattr(self, f"linear{i}", l)
+        self.relu = nn.ReLU()
+
+    def forward(self, x):
+        for l in self.layers:
+            x = self.relu(l(x))
+        return x
+
+
+def timeit(model, step, x, y, steps):
+    times = []
+    for _ in range(steps):
+        for p in model.parameters():
+            p.cleargrad()
+        start = time.perf_counter()
+        step(x, y).backward()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    steps = 300
+    print("median forward and backward time per training step (us)")
+    for dim, depth in ((8, 4), (8, 16), (32, 32), (128, 8)):
+        model = MLP(dim, depth)
+        x = nura.randn(4, dim)
+        y = nura.randn(4, dim)
+        step = lambda x, y: nn.functional.mse(model(x), y)
+        compiled = nura.compile(step, (x, y))
+
+        eager = timeit(model, step, x, y, steps)
+        replay = timeit(model, compiled, x, y, steps)
+        print(
+            f"{dim=:<4} {depth=:<3} eager: {eager * 1e6:8.1f} "
+            f"compiled: {replay * 1e6:8.1f} speedup: {eager / replay:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
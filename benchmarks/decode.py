@@ -0,0 +1,41 @@
+import time
+import numpy as np
+import nura
+import nura.nn as nn
+
+
+def decode(mha, x, cache):
+    steps = x.dim[1]
+    outputs = []
+    for t in range(steps):
+        if cache is not None:
+            token = x[:, t : t + 1]
+            out, _ = mha(token, token, token, cache=cache)
+        else:
+            prefix = x[:, : t + 1]
+            mask = nura.tensor(np.tril(np.ones((t + 1, t + 1))).astype(bool))
+            out, _ = mha(prefix, prefix, prefix, mask=mask)
+            out = out[:, t : t + 1]
+        outputs.append(out)
+    return outputs
+
+
+def main():
+    mha = nn.MultiHeadAttention(256, 32, 32, 8)
+    print("autoregressive decoding, dm=256 heads=8 batch=4")
+    for steps in (128, 256, 512):
+        x = nura.randn(4, steps, 256)
+        with nura.inference():
+            start = time.perf_counter()
+            decode(mha, x, None)
+            full = time.perf_counter() - start
+            start = time.perf_counter()
+            decode(mha, x, nn.KVCache(steps))
+            cached = time.perf_counter() - start
+        print(
+            f"steps={steps:<4} recompute: {full:6.2f}s cache: {cached:6.2f}s ({full / cached:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import time
+import numpy as np
+import nura
+import nura.nn as nn
+
+
+def train(embedding, optimizer, batches):
+    start = time.perf_counter()
+    for x in batches:
+        optimizer.zerograd()
+        embedding(x).sum().backward()
+        optimizer.step()
+    return (time.perf_counter() - start) / len(batches)
+
+
+def main():
+    vocab, emdim = 500_000, 64
+    batches = [
+        nura.tensor(np.random.randint(0, vocab, (16, 128))) for _ in range(10)
+    ]
+    print(f"embedding training step, vocab={vocab} emdim={emdim} tokens=2048")
+    for optimizer in (nn.SGD, nn.Adam, nn.RMSProp, nn.AdaGrad):
+        times = []
+        for sparse in (False, True):
+            embedding = nn.Embedding(emdim, vocab, sparse=sparse)
+            times.append(
+                train(
+                    embedding, optimizer(embedding.parameters(), 1e-3), batches
+                )
+            )
+        dense, sparse = times
+        print(
+            f"{optimizer.name():<8} dense: {dense * 1e3:8.1f}ms sparse: {sparse * 1e3:6.1f}ms ({dense / sparse:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import resource
+import time
+import nura
+import nura.nn.functional as nf
+from nura.autograd.functional import jvp
+
+
+def rss():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 2**20
+
+
+def main():
+    calls, every = 100_000, 10_000
+    w, b = nura.randn(16, 16), nura.randn(16)
+    func = lambda x: nf.tanh(nf.linear(x, w, b)).exp().sum()
+    x, v = nura.randn(8, 16), nura.randn(8, 16)
+
+    print("resident memory during repeated jvp calls (MiB)")
+    start = time.perf_counter()
+    for i in range(1, calls + 1):
+        jvp(x, v, func)
+        if not i % every:
+            elapsed = time.perf_counter() - start
+            print(f"calls={i:<7} rss: {rss():7.1f} elapsed: {elapsed:6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import time
+import nura
+import nura.nn.functional as nf
+
+
+def update(p, g, m, v, rate):
+    m = m * 0.9 + g * 0.1
+    v = v * 0.999 + g * g * 0.001
+    return p - rate * m / ((v + 1e-8) ** 0.5)
+
+
+def gelu(x):
+    return x * 0.5 * (nf.tanh((x + x * x * x * 0.044715) * 0.79788456) + 1.0)
+
+
+def timeit(func, args, steps, backward=False):
+    times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        output = func(*args)
+        if backward:
+            output.backward(nura.oneslike(output))
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    steps = 5
+    print("median time per call (ms)")
+    for n in (10**5, 10**6, 10**7):
+        p, g, m, v = (nura.randn(n) for _ in range(4))
+        v = v.abs()
+        rate = nura.tensor(1e-3)
+        args = (p, g, m, v, rate)
+        eager = timeit(update, args, steps)
+        fused = timeit(nura.compile(update, args), args, steps)
+        print(
+            f"adam {n=:<9} eager: {eager * 1e3:8.2f} "
+            f"fused: {fused * 1e3:8.2f} speedup: {eager / fused:.2f}x"
+        )
+
+        x = nura.randn(n, usegrad=True)
+        eager = timeit(gelu, (x,), steps, backward=True)
+        fused = timeit(nura.compile(gelu, x), (x,), steps, backward=True)
+        print(
+            f"gelu {n=:<9} eager: {eager * 1e3:8.2f} "
+            f"fused: {fused * 1e3:8.2f} speedup: {eager / fused:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
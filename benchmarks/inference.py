@@ -0,0 +1,49 @@
+import time
+import nura
+import nura.nn as nn
+
+
+class MLP(nn.Module):
+
+    def __init__(self, dim: int, depth: int) -> None:
+        super().__init__()
+        self.layers = [nn.Linear(dim, dim) for _ in range(depth)]
+        for i, l in enumerate(self.layers):
+            setattr(self, f"linear{i}", l)
+        self.relu = nn.ReLU()
+
+    def forward(self, x):
+        for l in self.layers:
+            x = self.relu(l(x))
+        return x
+
+
+def timeit(model, x, steps, mode):
+    times = []
+    for _ in range(steps):
+        with mode():
+            start = time.perf_counter()
+            model(x)
+            times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    steps = 500
+    print("median forward time (us)")
+    for dim, depth in ((8, 4), (32, 8), (128, 8)):
+        model = MLP(dim, depth)
+        x = nura.randn(1, dim)
+        usegrad = timeit(model, x, steps, nura.usegrad)
+        nograd = timeit(model, x, steps, nura.nograd)
+        inference = timeit(model, x, steps, nura.inference)
+        print(
+            f"{dim=:<4} {depth=:<2} usegrad: {usegrad * 1e6:7.1f} "
+            f"nograd: {nograd * 1e6:7.1f} inference: {inference * 1e6:7.1f} "
+            f"speedup: {nograd / inference:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import time
+import nura
+
+
+def branches(x, weights):
+    loss = None
+    for w in weights:
+        h = (x @ w).sin() @ w
+        loss = h.sum() if loss is None else loss + h.sum()
+    return loss
+
+
+def timeit(x, weights, steps, plan):
+    times = []
+    for _ in range(steps):
+        for w in weights:
+            w.cleargrad()
+        loss = branches(x, weights)
+        start = time.perf_counter()
+        loss.backward(plan=plan)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    steps = 20
+    print("median backward time (ms)")
+    for dim, nbranches in ((256, 3), (512, 4)):
+        x = nura.randn(256, dim)
+        weights = [nura.randn(dim, dim, usegrad=True) for _ in range(nbranches)]
+        base = timeit(x, weights, steps, nura.Plan())
+        for workers in (2, 4):
+            plan = nura.Plan(workers=workers)
+            parallel = timeit(x, weights, steps, plan)
+            plan.close()
+            print(
+                f"{dim=:<4} {nbranches=} {workers=} serial: {base * 1e3:7.2f} "
+                f"parallel: {parallel * 1e3:7.2f} speedup: {base / parallel:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
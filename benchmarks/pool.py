@@ -0,0 +1,29 @@
+import time
+import nura
+import nura.nn.functional as nf
+
+
+def main():
+    steps = 200
+    w = nura.randn(50_000, 64, usegrad=True)
+    x = nura.randint(0, 50_000, (64, 32))
+
+    pool = nura.Pool()
+    start = time.perf_counter()
+    with nura.pooling(pool):
+        for _ in range(steps):
+            w.cleargrad()
+            h = nf.embedding(x, w)
+            (h[:, 1:].sum(dim=1) + h.max(dim=1)).sum().backward()
+    elapsed = time.perf_counter() - start
+
+    allocs, reuses = pool.allocs, pool.reuses
+    allocbytes, reusebytes = pool.allocbytes / 2**20, pool.reusebytes / 2**20
+    print(f"steps={steps} elapsed: {elapsed:.2f}s")
+    print(
+        f"allocs={allocs} ({allocbytes:.1f} MiB) reuses={reuses} ({reusebytes:.1f} MiB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
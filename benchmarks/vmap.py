@@ -0,0 +1,49 @@
+import time
+import nura
+import nura.nn.functional as nf
+from nura.autograd.functional import vjp
+
+
+def loss(w, b, x, y):
+    return ((nf.tanh(nf.linear(x, w, b)) - y) ** 2.0).sum()
+
+
+def pergrad(w, b, x, y):
+    return vjp((w, b), nura.tensor(1.0), loss, x, y)[1]
+
+
+def looped(w, b, x, y):
+    grads = [pergrad(w, b, x[i], y[i]) for i in range(x.dim[0])]
+    return tuple(nura.tensor([g[j].data for g in grads]) for j in range(2))
+
+
+def batched(w, b, x, y):
+    return nura.vmap(pergrad, indims=(None, None, 0, 0))(w, b, x, y)
+
+
+def timeit(func, args, steps):
+    times = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main():
+    steps = 20
+    print("median per-example gradient time (ms)")
+    for n, dim in ((16, 16), (64, 32), (256, 64)):
+        w, b = nura.randn(dim, dim), nura.randn(dim)
+        x, y = nura.randn(n, dim), nura.randn(n, dim)
+        loop = timeit(looped, (w, b, x, y), steps)
+        vmap = timeit(batched, (w, b, x, y), steps)
+        print(
+            f"{n=:<4} {dim=:<3} loop: {loop * 1e3:7.2f} "
+            f"vmap: {vmap * 1e3:7.2f} speedup: {loop / vmap:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
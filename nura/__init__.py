@@ -1,9 +1,35 @@
 import numpy as np
 import nura.autograd.graph as graph
 import nura.autograd.forwardad as forwardad
+import nura.autograd.batching as batching
+import nura.autograd.compiler as compiler
+import nura.autograd.memory as memory
 
-from .autograd.functional import backward, grad
-from .autograd.mode import Autograd, usegrad, nograd, setgrad, forwardmode
+from .autograd.functional import (
+    backward,
+    grad,
+    jacsparse,
+    jacpattern,
+    hvp,
+    hessian,
+)
+from .autograd.sparsity import Sparsity
+from .autograd.rowsparse import RowSparse
+from .autograd.plan import Plan
+from .autograd.pool import Pool
+from .autograd.checkpoint import checkpoint
+from .autograd.batching import vmap
+from .autograd.compiler import compile
+from .autograd.profile import Profile, profiler
+from .autograd.mode import (
+    Autograd,
+    usegrad,
+    nograd,
+    setgrad,
+    forwardmode,
+    inference,
+    pooling,
+)
 from .types import char, byte, short, int, long, half, float, double, bool, dtypeof, inf
 from .tensors import tensor
 
@@ -49,6 +75,7 @@ from .functional import (
     select,
     flatten,
     concat,
+    maskedfill,
 )
 
 from .utils import (
@@ -102,5 +129,4 @@ from .utils import (
     totensor,
 )
 
-
 np.set_printoptions(precision=4)
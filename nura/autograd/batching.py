@@ -0,0 +1,279 @@
+import numpy as np
+import nura
+from nura.tensors import Tensor
+from nura.autograd.function import Function, Context
+from nura.autograd.mode import batching
+from nura.functions import (
+    Matmul,
+    Sum,
+    Mean,
+    Squeeze,
+    Unsqueeze,
+    Reshape,
+    Transpose,
+    Permute,
+)
+from numpy import ndarray
+from nura.types import dimlike
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+
+
+class Level:
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._arrays: Dict[int, ndarray] = {}
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def batched(self, tensor: Any) -> bool:
+        if not isinstance(tensor, Tensor):
+            return False
+        return self._arrays.get(id(tensor._data)) is tensor._data
+
+    def rank(self, tensor: Tensor) -> int:
+        return (
+            tensor._data.ndim - 1 if self.batched(tensor) else tensor._data.ndim
+        )
+
+    def add(self, tensor: Tensor) -> Tensor:
+        self.track(tensor.data)
+        if tensor.grad is not None:
+            self.track(tensor.grad.data)
+        return tensor
+
+    def lift(self, tensor: Tensor) -> Tensor:
+        if self.batched(tensor):
+            return tensor
+        arr = np.broadcast_to(tensor.data, (self.size,) + tensor.data.shape)
+        return self.add(tensor.mutated(data=arr.copy()))
+
+    def track(self, arr: ndarray) -> ndarray:
+        self._arrays[id(arr)] = arr
+        return arr
+
+    def __repr__(self) -> str:
+        size = self.size
+        return f"{self.__class__.__name__}({size=})"
+
+
+class Stack(Function):
+    linear = True
+
+    @staticmethod
+    def forward(context: Context, *tensors: Tensor):
+        context.save(*tensors)
+        return np.stack([t.data for t in tensors])
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        return tuple(grad.data[i] for i in range(grad.dim[0]))
+
+    @staticmethod
+    def tangent(context: Context, *grads: Tensor):
+        return np.stack([g.data for g in grads])
+
+
+def vmap(
+    func: Callable[..., Any],
+    indims: Union[Optional[int], Tuple[Optional[int], ...]] = 0,
+    outdims: Union[int, Tuple[Any, ...]] = 0,
+) -> Callable[..., Any]:
+
+    def batched(*args: Any) -> Any:
+        if nura.Autograd._batch is not None:
+            raise RuntimeError(
+                "Cannot vmap function, nested vmap is not supported"
+            )
+        dims = indims if isinstance(indims, tuple) else (indims,) * len(args)
+        if len(dims) != len(args):
+            raise ValueError(
+                f"Cannot vmap function, received {len(dims)} input dimensions for {len(args)} arguments"
+            )
+        sizes = set(
+            a.dim[d]
+            for a, d in zip(args, dims)
+            if isinstance(a, Tensor) and d is not None
+        )
+        if len(sizes) != 1:
+            raise ValueError(
+                "Cannot vmap function, batched inputs must share a single batch dimension"
+            )
+
+        level = Level(sizes.pop())
+        args = tuple(
+            (
+                level.add(_movedim(a, d, 0))
+                if isinstance(a, Tensor) and d is not None
+                else a
+            )
+            for a, d in zip(args, dims)
+        )
+        with batching(level):
+            output = func(*args)
+
+        return _unbatch(level, output, outdims)
+
+    return batched
+
+
+def _unbatch(
+    level: Level, output: Any, outdims: Union[int, Tuple[Any, ...]]
+) -> Any:
+    if not isinstance(output, tuple):
+        if not isinstance(output, Tensor):
+            raise ValueError(
+                "Cannot vmap function, function must return tensors or tuples of tensors"
+            )
+        return _movedim(_expand(level, output), 0, outdims)
+    dims = outdims if isinstance(outdims, tuple) else (outdims,) * len(output)
+    if len(dims) != len(output):
+        raise ValueError(
+            f"Cannot vmap function, received {len(dims)} output dimensions for {len(output)} outputs"
+        )
+    return tuple(_unbatch(level, o, d) for o, d in zip(output, dims))
+
+
+def apply(function: Type[Function], *args: Any, **kwargs: Any) -> Any:
+    level = nura.Autograd._batch
+    assert level is not None
+    with batching(None):
+        if not any(level.batched(a) for a in args):
+            return function.apply(*args, **kwargs)
+        rule = _rules.get(function)
+        if rule is not None:
+            output = rule(level, function, args, kwargs)
+        elif function.batched:
+            output = _broadcast(level, function, args, kwargs)
+        else:
+            output = _loop(level, function, args, kwargs)
+    return level.add(output)
+
+
+def _broadcast(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    rank = max(level.rank(a) for a in args if isinstance(a, Tensor))
+    args = tuple(_align(level, a, rank) for a in args)
+    return function.apply(*args, **kwargs)
+
+
+def _loop(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    rows = []
+    for i in range(level.size):
+        row = tuple(a[i] if level.batched(a) else a for a in args)
+        rows.append(function.apply(*row, **kwargs))
+    return Stack.apply(*rows)
+
+
+def _matmul(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, b = args
+    arow = level.batched(a) and a.ndim == 2
+    bcol = level.batched(b) and b.ndim == 2
+    if arow:
+        a = level.add(a.reshape((a.dim[0], 1, a.dim[1])))
+    if bcol:
+        b = level.add(b.reshape(b.dim + (1,)))
+    rank = max(level.rank(a), level.rank(b))
+    output = function.apply(
+        _align(level, a, rank), _align(level, b, rank), **kwargs
+    )
+    if arow:
+        output = output.reshape(output.dim[:-2] + output.dim[-1:])
+    if bcol:
+        output = output.reshape(output.dim[:-1])
+    return output
+
+
+def _reduce(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, dim, keepdims = args
+    return function.apply(a, _shift(dim, level.rank(a)), keepdims)
+
+
+def _squeeze(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, dim = args + tuple(kwargs.values())
+    if dim is None:
+        dim = tuple(i for i, d in enumerate(a.data.shape[1:]) if d == 1)
+    return function.apply(a, _shift(dim, level.rank(a)))
+
+
+def _unsqueeze(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, dim = args
+    rank = level.rank(a) + (1 if isinstance(dim, int) else len(dim))
+    return function.apply(a, _shift(dim, rank))
+
+
+def _reshape(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, newdim = args
+    newdim = (newdim,) if isinstance(newdim, int) else tuple(newdim)
+    return function.apply(a, (level.size,) + newdim)
+
+
+def _transpose(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, dim0, dim1 = args
+    rank = level.rank(a)
+    return function.apply(a, _shift(dim0, rank), _shift(dim1, rank))
+
+
+def _permute(
+    level: Level, function: Type[Function], args: Tuple[Any, ...], kwargs: Any
+) -> Tensor:
+    a, dims = args
+    return function.apply(a, (0,) + _shift(dims, level.rank(a)))
+
+
+def _shift(dim: dimlike, rank: int) -> Any:
+    if isinstance(dim, int):
+        return dim % rank + 1
+    return tuple(d % rank + 1 for d in dim)
+
+
+def _align(level: Level, tensor: Any, rank: int) -> Any:
+    if not level.batched(tensor) or level.rank(tensor) == rank:
+        return tensor
+    dim = tensor.dim
+    return tensor.reshape(dim[:1] + (1,) * (rank - len(dim) + 1) + dim[1:])
+
+
+def _expand(level: Level, tensor: Tensor) -> Tensor:
+    if level.batched(tensor):
+        return tensor
+    zeros = nura.zeros((level.size,) + tensor.dim).to(tensor.dtype)
+    return zeros + tensor
+
+
+def _movedim(tensor: Tensor, src: int, dst: int) -> Tensor:
+    src, dst = src % tensor.ndim, dst % tensor.ndim
+    if src == dst:
+        return tensor
+    dims = [i for i in range(tensor.ndim) if i != src]
+    dims.insert(dst, src)
+    return tensor.permute(tuple(dims))
+
+
+_rules: Dict[Type[Function], Callable[..., Tensor]] = {
+    Matmul: _matmul,
+    Sum: _reduce,
+    Mean: _reduce,
+    Squeeze: _squeeze,
+    Unsqueeze: _unsqueeze,
+    Reshape: _reshape,
+    Transpose: _transpose,
+    Permute: _permute,
+}
@@ -0,0 +1,91 @@
+import numpy as np
+import nura
+from nura.tensors import Tensor
+from nura.autograd.function import Function, Context
+from nura.autograd.functional import _reverse
+from nura.autograd.plan import Plan
+from numpy import ndarray
+from typing import Any, Callable, Tuple, Optional, Sequence
+
+
+class Checkpoint(Function):
+    threadsafe = False
+
+    @staticmethod
+    def forward(
+        context: Context,
+        func: Callable[..., Tensor],
+        input: Tuple[Any, ...],
+        parameters: Tuple[Tensor, ...],
+    ) -> ndarray:
+        tensors = {
+            id(t): t for t in input if isinstance(t, Tensor) and t.gradtensor
+        }
+        parameters = tuple(p for p in parameters if id(p) not in tensors)
+        context.save(*tensors.values(), *parameters)
+        context.nparams = len(parameters)
+        context.func = func
+        context.input = input
+        context.state = np.random.get_state()
+        with nura.nograd():
+            output = func(*input)
+        if not isinstance(output, Tensor):
+            raise ValueError(
+                "Cannot checkpoint function, function must return a single tensor"
+            )
+        return output.data
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor) -> Tuple[ndarray, ...]:
+        tensors = context.tensors()
+        split = len(tensors) - context.nparams
+        leaves = {
+            id(t): t.mutated(
+                usegrad=t.usegrad, grad=None, gradfn=None, leaf=True
+            )
+            for t in tensors[:split]
+        }
+        input = tuple(
+            leaves.get(id(t), t) if isinstance(t, Tensor) else t
+            for t in context.input
+        )
+        leaves = tuple(leaves.values()) + tensors[split:]
+
+        state = np.random.get_state()
+        np.random.set_state(context.state)
+        try:
+            with nura.usegrad():
+                output = context.func(*input)
+        finally:
+            np.random.set_state(state)
+        if output.gradfn is None or not output.usegrad:
+            return tuple(np.zeros_like(t.data) for t in leaves)
+
+        plan = Plan()
+        retain = set(t.gradfn for t in leaves if t.gradfn is not None)
+        nodes = plan.schedule((output.gradfn,))
+        if any(n.function is None and n not in retain for n in nodes):
+            raise RuntimeError(
+                "Cannot recompute checkpoint, function uses tensors requiring gradients that were not passed as input or parameters"
+            )
+        gradmap = _reverse((output,), (grad,), retain, plan, accumulate=False)
+        return tuple(
+            gradmap[t.gradfn] if t.gradfn in gradmap else np.zeros_like(t.data)
+            for t in leaves
+        )
+
+
+def checkpoint(
+    func: Callable[..., Tensor],
+    *input: Any,
+    parameters: Optional[Sequence[Tensor]] = None,
+) -> Tensor:
+
+    parameters = tuple(parameters) if parameters is not None else ()
+    if not all(isinstance(p, Tensor) and p.leaf for p in parameters):
+        raise ValueError(
+            "Cannot checkpoint function, parameters must be leaf tensors"
+        )
+    if not nura.Autograd.reversemode():
+        return func(*input)
+    return Checkpoint.apply(func, input, parameters)
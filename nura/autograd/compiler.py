@@ -0,0 +1,711 @@
+import numpy as np
+import nura
+from nura.tensors import Tensor
+from nura.autograd.function import Function, Context, _nullcontext
+from nura.autograd.functional import _dense, _sumgrad
+from nura.autograd.fusion import Kernel, Fused
+from nura.autograd.mode import tracing
+from nura.autograd.pool import Pool
+from nura.functions import Pos, Reshape
+from numpy import ndarray
+from nura.types import dim
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+
+class Slot:
+
+    def __init__(self, index: int) -> None:
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Slot) and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((Slot, self.index))
+
+    def __repr__(self) -> str:
+        index = self.index
+        return f"{self.__class__.__name__}({index=})"
+
+
+class Op:
+
+    def __init__(
+        self,
+        function: Type[Function],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        output: int,
+        saved: Tuple[int, ...],
+    ) -> None:
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        self._output = output
+        self._saved = saved
+
+    @property
+    def function(self) -> Type[Function]:
+        return self._function
+
+    @property
+    def args(self) -> Tuple[Any, ...]:
+        return self._args
+
+    @property
+    def kwargs(self) -> Dict[str, Any]:
+        return self._kwargs
+
+    @property
+    def output(self) -> int:
+        return self._output
+
+    @property
+    def saved(self) -> Tuple[int, ...]:
+        return self._saved
+
+    @property
+    def slots(self) -> Tuple[int, ...]:
+        values = self.args + tuple(self.kwargs.values())
+        return tuple(a.index for a in values if isinstance(a, Slot))
+
+    def substituted(self, alias: Dict[int, int]) -> "Op":
+        if not alias:
+            return self
+        args = tuple(_substitute(a, alias) for a in self.args)
+        kwargs = {k: _substitute(v, alias) for k, v in self.kwargs.items()}
+        saved = tuple(alias.get(k, k) for k in self.saved)
+        return Op(self.function, args, kwargs, self.output, saved)
+
+    def name(self) -> str:
+        return self.function.name()
+
+    def __repr__(self) -> str:
+        name, output, slots = self.name(), self.output, self.slots
+        return f"{self.__class__.__name__}({name=} {output=} {slots=})"
+
+
+class Graph:
+
+    def __init__(self, reference: Optional["Graph"] = None) -> None:
+        self._ops: List[Op] = []
+        self._kinds: List[str] = []
+        self._dims: List[dim] = []
+        self._dtypes: List[Any] = []
+        self._arrays: Dict[int, ndarray] = {}
+        self._tensors: Dict[int, Tensor] = {}
+        self._versions: Dict[int, int] = {}
+        self._slots: Dict[int, int] = {}
+        self._inputs: Tuple[int, ...] = ()
+        self._values: Tuple[Any, ...] = ()
+        self._output = -1
+        self._reference = reference
+
+    @property
+    def ops(self) -> Tuple[Op, ...]:
+        return tuple(self._ops)
+
+    @property
+    def inputs(self) -> Tuple[int, ...]:
+        return self._inputs
+
+    @property
+    def output(self) -> int:
+        return self._output
+
+    @property
+    def values(self) -> Tuple[Any, ...]:
+        return self._values
+
+    @property
+    def params(self) -> Tuple[int, ...]:
+        return tuple(k for k, kind in enumerate(self._kinds) if kind == "param")
+
+    @property
+    def consts(self) -> Tuple[int, ...]:
+        return tuple(k for k, kind in enumerate(self._kinds) if kind == "const")
+
+    @property
+    def arrays(self) -> Dict[int, ndarray]:
+        return self._arrays
+
+    @property
+    def nslots(self) -> int:
+        return len(self._kinds)
+
+    def kind(self, slot: int) -> str:
+        return self._kinds[slot]
+
+    def dim(self, slot: int) -> dim:
+        return self._dims[slot]
+
+    def dtype(self, slot: int) -> Any:
+        return self._dtypes[slot]
+
+    def tensor(self, slot: int) -> Tensor:
+        return self._tensors[slot]
+
+    def slot(self, tensor: Tensor, kind: Optional[str] = None) -> int:
+        k = self._slots.get(id(tensor))
+        if k is not None:
+            return k
+        if kind is None:
+            kind = "param" if tensor.usegrad else "const"
+        k = len(self._kinds)
+        self._kinds.append(kind)
+        self._dims.append(tensor.data.shape)
+        self._dtypes.append(tensor.data.dtype)
+        self._arrays[k] = tensor.data
+        self._tensors[k] = tensor
+        self._versions[k] = tensor.version
+        self._slots[id(tensor)] = k
+        return k
+
+    def trace(self, input: Tuple[Any, ...]) -> None:
+        self._inputs = tuple(
+            self.slot(a, "input") if isinstance(a, Tensor) else -1
+            for a in input
+        )
+        self._values = tuple(
+            None if isinstance(a, Tensor) else a for a in input
+        )
+
+    def record(
+        self,
+        function: Type[Function],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        context: Context,
+        output: Tensor,
+    ) -> None:
+        args = tuple(
+            Slot(self.slot(a)) if isinstance(a, Tensor) else a for a in args
+        )
+        kwargs = {
+            k: Slot(self.slot(v)) if isinstance(v, Tensor) else v
+            for k, v in kwargs.items()
+        }
+        saved = tuple(self._slots.get(id(t), -1) for t in context.tensors())
+        k = self.slot(output, "op")
+        op = Op(function, args, kwargs, k, saved)
+        if self._reference is not None:
+            ops = self._reference._ops
+            i = len(self._ops)
+            if i >= len(ops) or not _matches(self, op, self._reference, ops[i]):
+                raise RuntimeError(
+                    "Cannot compile function, traced operations or constants "
+                    "depend on input values and would be frozen while tracing"
+                )
+        self._ops.append(op)
+
+    def finish(self, output: Tensor) -> None:
+        if any(
+            t.version != self._versions[k] for k, t in self._tensors.items()
+        ):
+            raise RuntimeError(
+                "Cannot compile function, one or more tensors were modified in-place while tracing"
+            )
+        self._output = self.slot(output)
+        self._tensors = {k: self._tensors[k] for k in self.params}
+        self._versions.clear()
+        self._slots.clear()
+
+    def optimize(self) -> None:
+        _fold(self)
+        _noops(self)
+        _cse(self)
+        _dce(self)
+        _fuse(self)
+        live = set(op.output for op in self._ops)
+        live.update(*(op.slots for op in self._ops), (self.output,))
+        self._arrays = {k: self._arrays[k] for k in self.consts if k in live}
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def __repr__(self) -> str:
+        ops, inputs, params = len(self), len(self.inputs), len(self.params)
+        return f"{self.__class__.__name__}({ops=} {inputs=} {params=})"
+
+
+class Replay(Function):
+    threadsafe = False
+
+    @staticmethod
+    def forward(
+        context: Context, compiled: "Compiled", input: Tuple[Any, ...]
+    ) -> ndarray:
+        graph = compiled.graph
+        values = compiled.values(input)
+        leaves = tuple(
+            k
+            for k in graph.inputs + graph.params
+            if k >= 0 and _requires(values[k])
+        )
+        context.save(*(values[k] for k in leaves))
+        if context is _nullcontext:
+            leaves = ()
+        contexts = compiled.run(values, leaves)
+        if leaves:
+            context.compiled = compiled
+            context.leaves = leaves
+            context.contexts = contexts
+        arr = values[graph.output].data
+        return arr if graph.kind(graph.output) == "op" else arr.copy()
+
+    @staticmethod
+    def backward(
+        context: Context, grad: Tensor
+    ) -> Tuple[Optional[ndarray], ...]:
+        compiled = context.compiled
+        return compiled.reverse(context.contexts, context.leaves, grad.data)
+
+
+class Compiled:
+
+    def __init__(self, func: Callable[..., Tensor], graph: Graph) -> None:
+        self._func = func
+        self._graph = graph
+        self._pool = Pool()
+        self._consts = {k: _wrap(a, False) for k, a in graph.arrays.items()}
+        self._schedule = tuple(
+            (
+                op.function,
+                op.args,
+                op.kwargs,
+                tuple(
+                    (j, a.index)
+                    for j, a in enumerate(op.args)
+                    if isinstance(a, Slot)
+                ),
+                tuple(
+                    (k, v.index)
+                    for k, v in op.kwargs.items()
+                    if isinstance(v, Slot)
+                ),
+                op.output,
+            )
+            for op in graph.ops
+        )
+        self._backwards: Dict[Tuple[int, ...], Any] = {}
+
+    @property
+    def func(self) -> Callable[..., Tensor]:
+        return self._func
+
+    @property
+    def graph(self) -> Graph:
+        return self._graph
+
+    def values(self, input: Tuple[Any, ...]) -> List[Optional[Tensor]]:
+        graph = self._graph
+        values: List[Optional[Tensor]] = [None] * graph.nslots
+        for k, t in self._consts.items():
+            values[k] = t
+        for k in graph.params:
+            values[k] = graph.tensor(k)
+        for k, a in zip(graph.inputs, input):
+            if k >= 0:
+                values[k] = a
+        return values
+
+    def run(
+        self, values: List[Optional[Tensor]], leaves: Tuple[int, ...]
+    ) -> List[Context]:
+        requires = self._backward(leaves)[0] if leaves else frozenset()
+        contexts: List[Context] = []
+        for function, args, kwargs, refs, kwrefs, output in self._schedule:
+            if refs:
+                args = list(args)
+                for j, k in refs:
+                    args[j] = values[k]
+            if kwrefs:
+                kwargs = dict(kwargs)
+                for name, k in kwrefs:
+                    kwargs[name] = values[k]
+            if leaves:
+                context = Context()
+                arr = function.forward(context, *args, **kwargs)
+                values[output] = _wrap(arr, output in requires)
+                contexts.append(context)
+            else:
+                arr = function.forward(_nullcontext, *args, **kwargs)
+                values[output] = _wrap(arr, False)
+        return contexts
+
+    def reverse(
+        self,
+        contexts: List[Context],
+        leaves: Tuple[int, ...],
+        grad: ndarray,
+    ) -> Tuple[Optional[ndarray], ...]:
+        graph, pool = self._graph, self._pool
+        grads: List[Optional[ndarray]] = [None] * graph.nslots
+        grads[graph.output] = grad
+        for i, function, output, edges in self._backward(leaves)[1]:
+            nodegrad = grads[output]
+            if nodegrad is None:
+                continue
+            grads[output] = None
+            gradoutput = function.backward(contexts[i], _wrap(nodegrad, False))
+            if not isinstance(gradoutput, tuple):
+                gradoutput = (gradoutput,)
+            for j, k, dim, dtype in edges:
+                if gradoutput[j] is None:
+                    continue
+                arr = np.asarray(_dense(gradoutput[j]))
+                if arr.shape != dim:
+                    arr = _sumgrad(dim, dtype, arr, pool)
+                if arr.dtype != dtype:
+                    arr = arr.astype(dtype)
+                grads[k] = arr if grads[k] is None else grads[k] + arr
+        return tuple(grads[k] for k in leaves)
+
+    def _backward(
+        self, leaves: Tuple[int, ...]
+    ) -> Tuple[FrozenSet[int], Tuple[Any, ...]]:
+        schedule = self._backwards.get(leaves)
+        if schedule is not None:
+            return schedule
+        graph = self._graph
+        requires = set(leaves)
+        steps = []
+        for i, op in enumerate(graph.ops):
+            if not any(k in requires for k in op.slots):
+                continue
+            requires.add(op.output)
+            edges = tuple(
+                (j, k, graph.dim(k), graph.dtype(k))
+                for j, k in enumerate(op.saved)
+                if k in requires
+            )
+            steps.append((i, op.function, op.output, edges))
+        schedule = (frozenset(requires), tuple(reversed(steps)))
+        self._backwards[leaves] = schedule
+        return schedule
+
+    def __call__(self, *input: Any) -> Tensor:
+        autograd = nura.Autograd
+        if autograd._batch is not None or autograd._trace is not None:
+            return self._func(*input)
+        if autograd.forwardmode():
+            return self._func(*input)
+        self._check(input)
+        return Replay.apply(self, input)
+
+    def _check(self, input: Tuple[Any, ...]) -> None:
+        graph = self._graph
+        if len(input) != len(graph.inputs):
+            raise ValueError(
+                f"Cannot run compiled function, expected {len(graph.inputs)} inputs but received {len(input)}"
+            )
+        for i, (a, k, value) in enumerate(
+            zip(input, graph.inputs, graph.values)
+        ):
+            if k < 0:
+                if isinstance(a, Tensor) or a != value:
+                    raise ValueError(
+                        f"Cannot run compiled function, non-tensor input {i} must match the traced value ({value=})"
+                    )
+                continue
+            if not isinstance(a, Tensor):
+                raise ValueError(
+                    f"Cannot run compiled function, input {i} must be a tensor"
+                )
+            if a.data.shape != graph.dim(k) or a.data.dtype != graph.dtype(k):
+                raise ValueError(
+                    f"Cannot run compiled function, input {i} does not match the traced dimension and type ({a.dim} != {graph.dim(k)})"
+                )
+
+    def __repr__(self) -> str:
+        ops, params = len(self._graph), len(self._graph.params)
+        return f"{self.__class__.__name__}({ops=} {params=})"
+
+
+def compile(
+    func: Callable[..., Tensor], input: Union[Tuple[Any, ...], Tensor]
+) -> Compiled:
+    input = input if isinstance(input, tuple) else (input,)
+    graph = Graph()
+    graph.trace(input)
+    with nura.nograd(), tracing(graph):
+        output = func(*input)
+    if not isinstance(output, Tensor):
+        raise ValueError(
+            "Cannot compile function, function must return a single tensor"
+        )
+    graph.finish(output)
+    _probe(func, input, graph)
+    graph.optimize()
+    return Compiled(func, graph)
+
+
+def apply(function: Type[Function], *args: Any, **kwargs: Any) -> Tensor:
+    graph = nura.Autograd._trace
+    assert graph is not None
+    context = Context()
+    with tracing(None):
+        arr = function.forward(context, *args, **kwargs)
+    output = nura.tensor(arr)
+    graph.record(function, args, kwargs, context, output)
+    return output
+
+
+def _probe(
+    func: Callable[..., Tensor], input: Tuple[Any, ...], graph: Graph
+) -> None:
+    rng = np.random.default_rng(0)
+    probe = tuple(
+        (
+            nura.tensor(_perturb(a.data, rng)).to(a.dtype)
+            if isinstance(a, Tensor) and a.gradtensor
+            else a
+        )
+        for a in input
+    )
+    state = np.random.get_state()
+    probed = Graph(graph)
+    probed.trace(probe)
+    try:
+        with nura.nograd(), tracing(probed), np.errstate(all="ignore"):
+            output = func(*probe)
+    finally:
+        np.random.set_state(state)
+    if len(probed) != len(graph) or probed.slot(output) != graph.output:
+        raise RuntimeError(
+            "Cannot compile function, traced operations depend on input values"
+        )
+
+
+def _perturb(arr: ndarray, rng: np.random.Generator) -> ndarray:
+    return arr * rng.uniform(0.5, 1.5, arr.shape)
+
+
+def _matches(graph: Graph, op: Op, reference: Graph, other: Op) -> bool:
+    if op.function is not other.function or len(op.args) != len(other.args):
+        return False
+    if op.kwargs.keys() != other.kwargs.keys():
+        return False
+    values = op.args + tuple(op.kwargs.values())
+    others = other.args + tuple(other.kwargs[k] for k in op.kwargs)
+    for a, b in zip(values, others):
+        if isinstance(a, Slot) != isinstance(b, Slot):
+            return False
+        if not isinstance(a, Slot):
+            if not _same(a, b):
+                return False
+            continue
+        if a.index != b.index or graph.kind(a.index) != reference.kind(b.index):
+            return False
+        if graph.kind(a.index) == "const" and not _same(
+            graph.arrays[a.index], reference.arrays[b.index]
+        ):
+            return False
+    return True
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, ndarray) or isinstance(b, ndarray):
+        if not isinstance(a, ndarray) or not isinstance(b, ndarray):
+            return False
+        nan = a.dtype.kind in "fc" and b.dtype.kind in "fc"
+        return a.shape == b.shape and np.array_equal(a, b, equal_nan=nan)
+    try:
+        return bool(a == b)
+    except Exception:
+        return a is b
+
+
+def _fold(graph: Graph) -> None:
+    ops = []
+    for op in graph._ops:
+        if op.function.deterministic and all(
+            graph.kind(k) == "const" for k in op.slots
+        ):
+            graph._kinds[op.output] = "const"
+            continue
+        ops.append(op)
+    graph._ops = ops
+
+
+def _noops(graph: Graph) -> None:
+    ops, alias, source = [], {}, {}
+    for op in graph._ops:
+        op = op.substituted(alias)
+        if op.function is Pos:
+            alias[op.output] = op.slots[0]
+            continue
+        if op.function is Reshape:
+            a = op.slots[0]
+            a = source.get(a, a)
+            if graph.dim(a) == graph.dim(op.output):
+                alias[op.output] = a
+                continue
+            op = Op(
+                Reshape, (Slot(a), graph.dim(op.output)), {}, op.output, (a,)
+            )
+            source[op.output] = a
+        ops.append(op)
+    graph._ops = ops
+    graph._output = alias.get(graph._output, graph._output)
+
+
+def _cse(graph: Graph) -> None:
+    ops, alias, seen = [], {}, {}
+    for op in graph._ops:
+        op = op.substituted(alias)
+        key = _key((op.function, op.args, op.kwargs))
+        if op.function.deterministic and key is not None:
+            if key in seen:
+                alias[op.output] = seen[key]
+                continue
+            seen[key] = op.output
+        ops.append(op)
+    graph._ops = ops
+    graph._output = alias.get(graph._output, graph._output)
+
+
+def _dce(graph: Graph) -> None:
+    ops, live = [], {graph.output}
+    for op in reversed(graph._ops):
+        if op.output not in live:
+            continue
+        live.update(op.slots)
+        ops.append(op)
+    graph._ops = ops[::-1]
+
+
+def _fuse(graph: Graph) -> None:
+    producers = {op.output: op for op in graph._ops}
+    uses = {graph.output: 1}
+    for op in graph._ops:
+        for k in set(op.slots):
+            uses[k] = uses.get(k, 0) + 1
+
+    groups: Dict[int, List[Op]] = {}
+    fused: Set[int] = set()
+    for op in reversed(graph._ops):
+        if op.output in fused or not _fusable(graph, op):
+            continue
+        members, stack = [op], [op]
+        while stack:
+            for k in stack.pop().slots:
+                producer = producers.get(k)
+                if (
+                    producer is None
+                    or producer in members
+                    or uses[k] != 1
+                    or graph.dim(k) != graph.dim(op.output)
+                    or not _fusable(graph, producer)
+                ):
+                    continue
+                members.append(producer)
+                stack.append(producer)
+        if len(members) < 2:
+            continue
+        fused.update(m.output for m in members)
+        groups[op.output] = members
+
+    ops = []
+    for op in graph._ops:
+        if op.output in groups:
+            ops.append(_kernel(graph, groups[op.output]))
+        elif op.output not in fused:
+            ops.append(op)
+    graph._ops = ops
+
+
+def _fusable(graph: Graph, op: Op) -> bool:
+    if op.function.ufunc is None or op.kwargs:
+        return False
+    if not all(isinstance(a, Slot) for a in op.args):
+        return False
+    dim, dtype = graph.dim(op.output), graph.dtype(op.output)
+    if not np.issubdtype(dtype, np.floating):
+        return False
+    return all(
+        graph.dtype(k) == dtype
+        and (graph.dim(k) == dim or _single(graph.dim(k)))
+        for k in op.slots
+    )
+
+
+def _kernel(graph: Graph, members: List[Op]) -> Op:
+    order = {op.output: i for i, op in enumerate(graph._ops)}
+    members = sorted(members, key=lambda m: order[m.output])
+    outputs = set(m.output for m in members)
+    inputs = list(
+        dict.fromkeys(k for m in members for k in m.slots if k not in outputs)
+    )
+    regs = {k: i for i, k in enumerate(inputs)}
+    steps = []
+    for m in members:
+        steps.append((m.function, tuple(regs[k] for k in m.slots)))
+        regs[m.output] = len(regs)
+    root = members[-1].output
+    kernel = Kernel(
+        len(inputs), tuple(steps), graph.dim(root), graph.dtype(root)
+    )
+    args = (kernel,) + tuple(Slot(k) for k in inputs)
+    return Op(Fused, args, {}, root, tuple(inputs))
+
+
+def _single(dim: dim) -> bool:
+    return all(d == 1 for d in dim)
+
+
+def _substitute(arg: Any, alias: Dict[int, int]) -> Any:
+    if isinstance(arg, Slot) and arg.index in alias:
+        return Slot(alias[arg.index])
+    return arg
+
+
+def _key(arg: Any) -> Any:
+    if isinstance(arg, ndarray):
+        return (ndarray, arg.shape, arg.dtype.str, arg.tobytes())
+    if isinstance(arg, (tuple, list)):
+        keys = tuple(_key(a) for a in arg)
+        return None if any(k is None for k in keys) else (type(arg), keys)
+    if isinstance(arg, dict):
+        return _key(tuple(sorted(arg.items())))
+    if isinstance(arg, slice):
+        return _key((slice, arg.start, arg.stop, arg.step))
+    if isinstance(arg, Tensor):
+        return None
+    try:
+        hash(arg)
+    except TypeError:
+        return None
+    return arg
+
+
+def _requires(tensor: Optional[Tensor]) -> bool:
+    return (
+        tensor is not None
+        and tensor.usegrad
+        and tensor.gradtensor
+        and nura.Autograd.reversemode()
+    )
+
+
+def _wrap(arr: Any, usegrad: bool) -> Tensor:
+    if type(arr) is ndarray:
+        return Tensor(arr, usegrad, None, None, True)
+    tensor = nura.tensor(arr)
+    tensor.mutate(usegrad=usegrad)
+    return tensor
@@ -1,15 +1,53 @@
+import weakref
+import numpy as np
 import nura
 from nura.tensors import Tensor
 from nura.autograd.function import Function, Context
 from nura.types import Scalar
-from typing import Optional, Set, Union, Type
+from numpy import ndarray
+from typing import Dict, Optional, Union, Type, Tuple
 
-primals: Set[Tensor] = set()
+
+class Tape:
+
+    def __init__(self) -> None:
+        self._tensors: Dict[int, weakref.ref] = {}
+
+    def add(self, tensor: Tensor) -> None:
+        key = id(tensor)
+        tensors = self._tensors
+
+        def discard(ref: weakref.ref) -> None:
+            if tensors.get(key) is ref:
+                del tensors[key]
+
+        tensors[key] = weakref.ref(tensor, discard)
+
+    def release(self) -> None:
+        for ref in tuple(self._tensors.values()):
+            tensor = ref()
+            if tensor is not None:
+                tensor.cleargrad()
+        self._tensors.clear()
+
+    def __len__(self) -> int:
+        return len(self._tensors)
+
+    def __repr__(self) -> str:
+        tensors = len(self)
+        return f"{self.__class__.__name__}({tensors=})"
 
 
 def cleanup():
-    for t in primals:
-        t.cleargrad()
+    tape = nura.Autograd._tape
+    if tape is not None:
+        tape.release()
+
+
+def record(tensor: Tensor) -> None:
+    tape = nura.Autograd._tape
+    if tape is not None:
+        tape.add(tensor)
 
 
 def primal(
@@ -33,14 +71,117 @@ def primal(
     else:
         grad = nura.zeroslike(tensor)
     p = tensor.mutated(grad=grad)
-    primals.add(p)
+    record(p)
     return p
 
 
 def primalify(output: Tensor, function: Type[Function], context: Context) -> None:
-    direction = tuple(
-        t.grad if t.grad is not None else nura.zeroslike(t) for t in context.tensors()
+    direction = tuple(t.grad for t in context.tensors())
+    if all(d is None for d in direction):
+        output.mutate(usegrad=True)
+        return
+    grad = nura.tensor(tangent(function, context, direction))
+    output.mutate(usegrad=True, grad=grad)
+    record(output)
+
+
+def tangent(
+    function: Type[Function],
+    context: Context,
+    direction: Tuple[Optional[Tensor], ...],
+) -> ndarray:
+    profile = nura.Autograd._profile
+    if profile is None:
+        return _tangent(function, context, direction)
+    args = (function, context, direction)
+    return profile.run(function.name(), "tangent", _tangent, args)
+
+
+def _tangent(
+    function: Type[Function],
+    context: Context,
+    direction: Tuple[Optional[Tensor], ...],
+) -> ndarray:
+    tensors = context.tensors()
+    batch = _batch(tensors, direction)
+    if not batch or _batchable(function, tensors, direction):
+        return function.tangent(context, *direction)
+    return np.stack(
+        [function.tangent(context, *_row(tensors, direction, k)) for k in range(batch)]
+    )
+
+
+def backtangent(
+    function: Type[Function],
+    context: Context,
+    grad: Tensor,
+    direction: Tuple[Optional[Tensor], ...],
+) -> Tuple[Optional[ndarray], ...]:
+    profile = nura.Autograd._profile
+    if profile is None:
+        return _backtangent(function, context, grad, direction)
+    args = (function, context, grad, direction)
+    return profile.run(function.name(), "backtangent", _backtangent, args)
+
+
+def _backtangent(
+    function: Type[Function],
+    context: Context,
+    grad: Tensor,
+    direction: Tuple[Optional[Tensor], ...],
+) -> Tuple[Optional[ndarray], ...]:
+    tensors = context.tensors()
+    batch = _batch(tensors, direction)
+    if not batch or _batchable(function, tensors, direction):
+        return _tupify(function.backtangent(context, grad, *direction))
+    rows = [
+        _tupify(function.backtangent(context, grad, *_row(tensors, direction, k)))
+        for k in range(batch)
+    ]
+    return tuple(np.stack(r) if r[0] is not None else None for r in zip(*rows))
+
+
+def _batch(tensors: Tuple[Tensor, ...], direction: Tuple[Optional[Tensor], ...]) -> int:
+    return next(
+        (
+            d.dim[0]
+            for t, d in zip(tensors, direction)
+            if d is not None and d.ndim > t.ndim
+        ),
+        0,
+    )
+
+
+def _batchable(
+    function: Type[Function],
+    tensors: Tuple[Tensor, ...],
+    direction: Tuple[Optional[Tensor], ...],
+) -> bool:
+    if not function.batched:
+        return False
+    rank = max(t.ndim for t in tensors)
+    return all(
+        d is None or d.ndim == t.ndim or t.ndim == rank
+        for t, d in zip(tensors, direction)
+    )
+
+
+def _tupify(
+    arr: Union[Tuple[Optional[ndarray], ...], ndarray],
+) -> Tuple[Optional[ndarray], ...]:
+    if isinstance(arr, tuple):
+        return tuple(np.asarray(a) if a is not None else None for a in arr)
+    return (np.asarray(arr),)
+
+
+def _row(
+    tensors: Tuple[Tensor, ...], direction: Tuple[Optional[Tensor], ...], k: int
+) -> Tuple[Optional[Tensor], ...]:
+    return tuple(
+        (
+            d
+            if d is None or d.ndim == t.ndim
+            else Tensor(d.data[k], False, None, None, True)
+        )
+        for t, d in zip(tensors, direction)
     )
-    grad = nura.tensor(function.tangent(context, *direction))
-    output.mutate(grad=grad)
-    primals.add(output)
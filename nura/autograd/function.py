@@ -1,3 +1,4 @@
+import numpy as np
 import nura
 from nura.tensors import Tensor
 from numpy import ndarray
@@ -38,7 +39,24 @@ class Context:
         return self.__class__.__name__
 
 
+class NullContext(Context):
+
+    def save(self, *tensors: Tensor) -> None:
+        pass
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_nullcontext = NullContext()
+
+
 class Function:
+    batched = False
+    linear = False
+    deterministic = True
+    threadsafe = True
+    ufunc: Optional[np.ufunc] = None
 
     @staticmethod
     def forward(context: Context, *args: Any, **kwargs: Any) -> ndarray:
@@ -54,10 +72,34 @@ class Function:
     def tangent(context: Context, *args: Any, **kwargs: Any) -> ndarray:
         raise NotImplementedError
 
+    @staticmethod
+    def backtangent(
+        context: Context, grad: Tensor, *args: Any, **kwargs: Any
+    ) -> Union[Tuple[ndarray, ...], ndarray]:
+        raise NotImplementedError
+
     @classmethod
     def apply(cls, *args: Any, **kwargs: Any) -> Any:
+        if nura.Autograd._batch is not None:
+            return nura.batching.apply(cls, *args, **kwargs)
+        if nura.Autograd._trace is not None:
+            return nura.compiler.apply(cls, *args, **kwargs)
+        profile = nura.Autograd._profile
+        if nura.Autograd._inference:
+            if profile is None:
+                arr = cls.forward(_nullcontext, *args, **kwargs)
+            else:
+                args = (_nullcontext,) + args
+                arr = profile.run(cls.name(), "forward", cls.forward, args, kwargs)
+            if type(arr) is ndarray:
+                return Tensor(arr, False, None, None, True)
+            return nura.tensor(arr)
         context = Context()
-        arr = cls.forward(context, *args, **kwargs)
+        if profile is None:
+            arr = cls.forward(context, *args, **kwargs)
+        else:
+            args = (context,) + args
+            arr = profile.run(cls.name(), "forward", cls.forward, args, kwargs)
         output = nura.tensor(arr)
         if context.usesgrad():
             if nura.Autograd.forwardmode():
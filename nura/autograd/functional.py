@@ -1,15 +1,25 @@
 import numpy as np
 import nura
 from nura.tensors import Tensor
-from nura.autograd.graph import Node, toposort
-from typing import Any, Dict, Generator, Tuple, Optional, Callable, Union, Set
-from collections import deque
+from nura.autograd.graph import Node
+from nura.autograd.plan import Plan
+from nura.autograd.pool import Pool
+from nura.autograd.profile import profiled
+from nura.autograd.mode import batching, pooling
+from nura.autograd.sparsity import Sparsity
+from nura.autograd.rowsparse import RowSparse
+from nura.autograd.slab import Slab, fillgaps
+from numpy import ndarray
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Tuple, Optional, Callable, Union, List, Set
 
 
 def backward(
     output: Union[Tuple[Tensor, ...], Tensor],
     grad: Optional[Union[Tuple[Tensor, ...], Tensor]] = None,
     input: Optional[Union[Tuple[Tensor, ...], Tensor]] = None,
+    plan: Optional[Plan] = None,
+    retaingraph: bool = False,
 ) -> None:
 
     output, grad, input = _tupify(output), _tupify(grad), _tupify(input)
@@ -43,41 +53,26 @@ def backward(
         raise ValueError(
             "Cannot run backward, received inputs not on computational graph"
         )
-    _backward(output, grad, input)
+    _backward(output, grad, input, plan, retaingraph)
 
 
 def _backward(
-    output: Tuple[Tensor, ...], grad: Tuple[Tensor, ...], input: Tuple[Tensor, ...]
+    output: Tuple[Tensor, ...],
+    grad: Tuple[Tensor, ...],
+    input: Tuple[Tensor, ...],
+    plan: Optional[Plan] = None,
+    retaingraph: bool = False,
 ) -> None:
 
-    nodes = tuple(o.gradfn for o in output if o.gradfn is not None)
-    topotuple = toposort(nodes)
-    retain = _getretain(topotuple, input)
-    gradmap = _getgradmap(nodes, output, grad)
-    queue = deque(topotuple)
-
-    while queue:
-        node = queue.popleft()
-        nodegrad = gradmap[node]
-        if node in retain:
-            _accumulate(node, nodegrad)
-        if node.edges:
-            gradoutput = _tupify(node.apply(nodegrad))
-            for edge, edgegrad in zip(node.edges, gradoutput):
-                if edge is None:
-                    continue
-                if edge not in gradmap:
-                    gradmap[edge] = nura.zeroslike(edge.output)
-                if _mismatch(edge.output, edgegrad):
-                    edgegrad = _sumgrad(edge.output, edgegrad)
-                gradmap[edge] += edgegrad
-        gradmap.pop(node)
+    retain = set(i.gradfn for i in input)
+    _reverse(output, grad, retain, plan, accumulate=True, retaingraph=retaingraph)
 
 
 def grad(
     input: Union[Tuple[Tensor, ...], Tensor],
     output: Union[Tuple[Tensor, ...], Tensor],
     grad: Optional[Union[Tuple[Tensor, ...], Tensor]] = None,
+    retaingraph: bool = False,
 ) -> Tuple[Tensor, ...]:
 
     output, grad, input = _tupify(output), _tupify(grad), _tupify(input)
@@ -105,59 +100,241 @@ def grad(
         raise ValueError("Cannot run backward, received duplicate input tensors")
     if not all(i.gradtensor and i.usegrad and i.gradfn is not None for i in input):
         raise ValueError("Cannot run grad, received inputs not on computational graph")
-    return _grad(input, output, grad)
+    return _grad(input, output, grad, retaingraph)
 
 
 def _grad(
-    input: Tuple[Tensor, ...], output: Tuple[Tensor, ...], grad: Tuple[Tensor, ...]
+    input: Tuple[Tensor, ...],
+    output: Tuple[Tensor, ...],
+    grad: Tuple[Tensor, ...],
+    retaingraph: bool = False,
 ) -> Tuple[Tensor, ...]:
-    nodes = tuple(o.gradfn for o in output if o.gradfn is not None)
-    topotuple = toposort(nodes)
-    retain = _getretain((), input)
-    gradmap = _getgradmap(nodes, output, grad)
-    queue = deque(topotuple)
-
-    while queue:
-        node = queue.popleft()
-        nodegrad = gradmap[node]
-        if node.edges:
-            gradoutput = _tupify(node.apply(nodegrad))
-            for edge, edgegrad in zip(node.edges, gradoutput):
-                if edge is None:
-                    continue
-                if edge not in gradmap:
-                    gradmap[edge] = nura.zeroslike(edge.output)
-                if _mismatch(edge.output, edgegrad):
-                    edgegrad = _sumgrad(edge.output, edgegrad)
-                gradmap[edge] += edgegrad
-        if node not in retain:
-            gradmap.pop(node)
-    return tuple(gradmap[i.gradfn] for i in input if i.gradfn is not None)
-
-
-def _getretain(node: Tuple[Node, ...], input: Tuple[Tensor, ...]) -> Set[Node]:
-    retain = set()
-    for n in node:
-        if n.accumulate:
-            retain.add(n)
-    for i in input:
-        if i.gradfn is not None:
-            retain.add(i.gradfn)
-    return retain
-
-
-def _getgradmap(
-    node: Tuple[Node, ...], output: Tuple[Tensor, ...], grad: Tuple[Tensor, ...]
-) -> Dict[Node, Tensor]:
+
+    retain = set(i.gradfn for i in input)
+    gradmap = _reverse(output, grad, retain, accumulate=False, retaingraph=retaingraph)
+    return tuple(
+        (
+            _wrap(gradmap[i.gradfn])
+            if i.gradfn in gradmap
+            else nura.zeroslike(i).mutated(usegrad=False)
+        )
+        for i in input
+        if i.gradfn is not None
+    )
+
+
+def _reverse(
+    output: Tuple[Tensor, ...],
+    grad: Tuple[Tensor, ...],
+    retain: Set[Node],
+    plan: Optional[Plan] = None,
+    accumulate: bool = True,
+    retaingraph: bool = False,
+    batch: int = 0,
+) -> Dict[Node, ndarray]:
+
+    level = nura.Autograd._batch
+    if level is not None:
+        batched = [n for n in retain if level.batched(n.output)]
+        grad = tuple(
+            level.lift(g) if level.batched(o) else g for o, g in zip(output, grad)
+        )
+        with batching(None):
+            gradmap = _reverse(
+                output, grad, retain, plan, accumulate, retaingraph, batch
+            )
+        for n in batched:
+            if n in gradmap:
+                level.track(gradmap[n])
+        return gradmap
+
+    if plan is None:
+        plan = Plan(nura.Autograd._pool)
+    with pooling(plan.pool):
+        return _sweep(output, grad, retain, plan, accumulate, retaingraph, batch)
+
+
+def _sweep(
+    output: Tuple[Tensor, ...],
+    grad: Tuple[Tensor, ...],
+    retain: Set[Node],
+    plan: Plan,
+    accumulate: bool,
+    retaingraph: bool,
+    batch: int,
+) -> Dict[Node, ndarray]:
+    nodes = plan.schedule(tuple(o.gradfn for o in output if o.gradfn is not None))
+    pool, executor = plan.pool, plan.executor
+    grads, owned = _getgrads(plan, output, grad)
     gradmap = {}
-    for i, (n, o) in enumerate(zip(node, output)):
-        if i < len(grad):
-            gradmap[n] = grad[i]
+    futures: Dict[int, Future] = {}
+    written: Dict[int, List[Tuple[int, int]]] = {}
+    prefix = (batch,) if batch else ()
+    if executor is not None:
+        _launch(executor, futures, plan, nodes, grads, written, 0, batch)
+
+    for i, (node, slots) in enumerate(zip(nodes, plan.edges)):
+        if i in written:
+            fillgaps(grads[i], written.pop(i))
+        nodegrad, release = grads[i], owned[i]
+        grads[i] = None
+        if nodegrad is None:
+            if not retaingraph:
+                node.release()
+            if executor is not None:
+                _launch(
+                    executor, futures, plan, nodes, grads, written, i + 1, batch
+                )
+            continue
+        if node in retain or (accumulate and node.accumulate):
+            if accumulate:
+                release = not _accumulate(node, nodegrad, release) and release
+            else:
+                gradmap[node] = nodegrad
+                release = False
+        if not slots:
+            if release:
+                pool.release(nodegrad)
+            if executor is not None:
+                _launch(
+                    executor, futures, plan, nodes, grads, written, i + 1, batch
+                )
+            continue
+
+        future = futures.pop(i, None)
+        if future is None:
+            gradoutput = _apply(node, nodegrad, batch)
         else:
-            gradmap[n] = nura.oneslike(o)
+            gradoutput = future.result()
+        for j, (k, edgegrad) in enumerate(zip(slots, gradoutput)):
+            if k < 0 or edgegrad is None:
+                continue
+            if isinstance(edgegrad, Slab):
+                _writeslab(k, edgegrad, nodes, grads, owned, written, pool)
+                continue
+            if k in written:
+                fillgaps(grads[k], written.pop(k))
+            if isinstance(edgegrad, RowSparse):
+                if (
+                    accumulate
+                    and not batch
+                    and not plan.edges[k]
+                    and (grads[k] is None or isinstance(grads[k], RowSparse))
+                ):
+                    grads[k] = edgegrad if grads[k] is None else grads[k].add(edgegrad)
+                    continue
+                edgegrad = edgegrad.dense()
+            if isinstance(grads[k], RowSparse):
+                grads[k], owned[k] = grads[k].dense(), True
+            edge = nodes[k].output
+            alias = edgegrad is nodegrad or edgegrad.base is nodegrad
+            edgeowned = not alias and _owns(edgegrad, gradoutput[:j])
+            release = release and not alias
+            dim, dtype = prefix + edge.dim, edge.data.dtype
+            if edgegrad.shape != dim:
+                edgegrad = _sumgrad(dim, dtype, edgegrad, pool, len(prefix))
+                edgeowned = True
+            if edgegrad.dtype != dtype:
+                edgegrad, edgeowned = edgegrad.astype(dtype), True
+
+            if grads[k] is None:
+                grads[k], owned[k] = edgegrad, edgeowned
+            elif owned[k]:
+                np.add(grads[k], edgegrad, out=grads[k])
+                if edgeowned:
+                    pool.release(edgegrad)
+            elif edgeowned:
+                grads[k] = np.add(grads[k], edgegrad, out=edgegrad)
+                owned[k] = True
+            else:
+                buffer = pool.acquire(dim, dtype)
+                grads[k] = np.add(grads[k], edgegrad, out=buffer)
+                owned[k] = True
+        if not retaingraph:
+            node.release()
+        if release:
+            pool.release(nodegrad)
+        if executor is not None:
+            _launch(
+                executor, futures, plan, nodes, grads, written, i + 1, batch
+            )
     return gradmap
 
 
+def _launch(
+    executor: ThreadPoolExecutor,
+    futures: Dict[int, Future],
+    plan: Plan,
+    nodes: Tuple[Node, ...],
+    grads: List[Optional[ndarray]],
+    written: Dict[int, List[Tuple[int, int]]],
+    step: int,
+    batch: int = 0,
+) -> None:
+    for k in plan.ready[step]:
+        node = nodes[k]
+        if k in written:
+            fillgaps(grads[k], written.pop(k))
+        threadsafe = node.function is None or node.function.threadsafe
+        if plan.edges[k] and grads[k] is not None and threadsafe:
+            futures[k] = executor.submit(_apply, node, grads[k], batch)
+
+
+def _writeslab(
+    k: int,
+    slab: Slab,
+    nodes: Tuple[Node, ...],
+    grads: List[Optional[ndarray]],
+    owned: List[bool],
+    written: Dict[int, List[Tuple[int, int]]],
+    pool: Pool,
+) -> None:
+    if grads[k] is None:
+        edge = nodes[k].output
+        grads[k], owned[k] = pool.acquire(edge.dim, edge.data.dtype), True
+        written[k] = []
+    if k in written and not slab.overlaps(written[k]):
+        slab.write(grads[k])
+        written[k].append(slab.span)
+        return
+    if k in written:
+        fillgaps(grads[k], written.pop(k))
+    if isinstance(grads[k], RowSparse):
+        grads[k] = grads[k].dense()
+    elif not owned[k]:
+        edge = nodes[k].output
+        buffer = pool.acquire(edge.dim, edge.data.dtype)
+        np.copyto(buffer, grads[k])
+        grads[k] = buffer
+    owned[k] = True
+    slab.scatter(grads[k])
+
+
+def _apply(node: Node, grad: ndarray, batch: int = 0) -> Tuple[Optional[ndarray], ...]:
+    if not batch or node.batched:
+        return node.apply(_wrap(grad))
+    rows = [node.apply(_wrap(g)) for g in grad]
+    return tuple(
+        np.stack([_dense(a) for a in r]) if r[0] is not None else None
+        for r in zip(*rows)
+    )
+
+
+def _getgrads(
+    plan: Plan, output: Tuple[Tensor, ...], grad: Tuple[Tensor, ...]
+) -> Tuple[List[Optional[ndarray]], List[bool]]:
+    grads: List[Optional[ndarray]] = [None] * len(plan)
+    owned = [False] * len(plan)
+    for i, (k, o) in enumerate(zip(plan.roots, output)):
+        if i < len(grad):
+            grads[k] = grad[i].data
+            continue
+        arr = plan.pool.acquire(o.dim, o.data.dtype)
+        arr.fill(1)
+        grads[k], owned[k] = arr, True
+    return grads, owned
+
+
 def _tupify(input: Optional[Union[Tuple[Tensor, ...], Tensor]]) -> Tuple[Tensor, ...]:
     if input is None:
         return ()
@@ -166,36 +343,75 @@ def _tupify(input: Optional[Union[Tuple[Tensor, ...], Tensor]]) -> Tuple[Tensor,
     return input
 
 
-def _mismatch(tensor: Tensor, grad: Tensor) -> bool:
-    return tensor.dim != grad.dim
+def _wrap(arr: ndarray) -> Tensor:
+    return Tensor(arr, False, None, None, True)
+
+
+def _dense(arr: Union[ndarray, RowSparse, Slab]) -> ndarray:
+    if isinstance(arr, (RowSparse, Slab)):
+        return arr.dense()
+    return arr
 
 
-def _sumgrad(tensor: Tensor, grad: Tensor) -> Tensor:
-    if tensor.ndim <= grad.ndim:
-        pad = np.pad(tensor.dim, (grad.ndim - tensor.ndim, 0), constant_values=0)
-        mismatched = pad != grad.dim
-        dim = np.nonzero(mismatched)[0]
-        grad = grad.sum(dim=tuple(dim), keepdims=True)
-        if tensor.ndim < grad.ndim:
-            dim = tuple(range(grad.ndim - tensor.ndim))
-            grad = grad.squeeze(dim)
+def _owns(arr: ndarray, others: Tuple[ndarray, ...]) -> bool:
+    if arr.base is not None or not arr.flags.writeable:
+        return False
+    return not any(arr is o for o in others)
+
+
+@profiled("engine")
+def _sumgrad(
+    dim: Tuple[int, ...], dtype: Any, grad: ndarray, pool: Pool, batch: int = 0
+) -> ndarray:
+    out = pool.acquire(dim, dtype)
+    lead = grad.ndim - len(dim)
+    if lead < 0:
+        grad = grad.reshape(grad.shape[:batch] + (1,) * -lead + grad.shape[batch:])
+        lead = 0
+    summed = tuple(range(batch, batch + lead)) + tuple(
+        i + lead
+        for i, d in enumerate(dim)
+        if i >= batch and d == 1 and grad.shape[i + lead] != 1
+    )
+    keepdim = tuple(1 if i in summed else d for i, d in enumerate(grad.shape))
+    if keepdim[:batch] + keepdim[batch + lead :] == dim:
+        np.sum(grad, axis=summed, keepdims=True, out=out.reshape(keepdim))
     else:
-        grad = nura.zeroslike(tensor) + grad
-    return grad
+        arr = np.sum(grad, axis=summed, keepdims=True)
+        np.copyto(out, arr.reshape(arr.shape[:batch] + arr.shape[batch + lead :]))
+    return out
 
 
-def _accumulate(node: Node, grad: Tensor) -> None:
-    if node.output.dim != grad.dim:
+def _accumulate(
+    node: Node, grad: Union[ndarray, RowSparse], owned: bool = False
+) -> bool:
+    tensor = node.output
+    dim = grad.dim if isinstance(grad, RowSparse) else grad.shape
+    if tensor.dim != dim:
         raise ValueError(
-            f"Cannot accumulate gradient, node output dimensions does not match gradient dimensions ({node.output.dim} != {grad.dim})"
+            f"Cannot accumulate gradient, node output dimensions does not match gradient dimensions ({tensor.dim} != {dim})"
         )
-    if node.output.dtype != grad.dtype:
+    if tensor.data.dtype != grad.dtype:
         raise ValueError(
-            f"Cannot accumulate gradient, node output type does not match gradient type ({node.output.dtype.name()} != {grad.dtype.name()})"
+            f"Cannot accumulate gradient, node output type does not match gradient type ({tensor.dtype.name()} != {nura.dtypeof(grad).name()})"
         )
-    if node.output._grad is None:
-        node.output._grad = nura.zeroslike(node.output)
-    node.output._grad += grad
+    if isinstance(grad, RowSparse):
+        if tensor._grad is None:
+            tensor._grad = grad
+        elif isinstance(tensor._grad, RowSparse):
+            tensor._grad = tensor._grad.add(grad)
+        else:
+            grad.scatter(tensor._grad.data)
+        return False
+    if isinstance(tensor._grad, RowSparse):
+        arr = grad if owned else grad.copy()
+        tensor._grad = _wrap(tensor._grad.scatter(arr))
+        return owned
+    if tensor._grad is None:
+        tensor._grad = _wrap(grad if owned else grad.copy())
+        return owned
+    np.add(tensor._grad.data, grad, out=tensor._grad.data)
+    return False
 
 
 def vjp(
@@ -218,6 +434,8 @@ def vjp(
 
     input = tuple(t.mutated(usegrad=True, grad=None, leaf=True) for t in input)
     vector = vector.mutated(usegrad=False, grad=None)
+    if nura.Autograd._batch is not None:
+        input = tuple(nura.Autograd._batch.lift(t) for t in input)
     output, vjps = _vjp(input, vector, func, *args, **kwargs)
     return output.mutated(usegrad=False, gradfn=None, leaf=True), vjps
 
@@ -275,11 +493,190 @@ def _jvp(
 ) -> Tuple[Tensor, Tensor]:
     with nura.forwardmode():
         output = func(*input, *args, **kwargs)
-        assert output.grad is not None
         grad = output.grad
+        if grad is None:
+            grad = nura.zeros(output.dim).to(output.dtype)
     return output, grad
 
 
+def hvp(
+    input: Union[Tuple[Tensor, ...], Tensor],
+    vector: Union[Tuple[Tensor, ...], Tensor],
+    func: Callable[..., Tensor],
+    *args,
+    **kwargs,
+) -> Tuple[Tensor, Tuple[Tensor, ...]]:
+
+    input = _tupify(input)
+    vector = _tupify(vector)
+    if not all(i.gradtensor for i in input):
+        raise ValueError(
+            "Cannot run hessian-vector product, all input tensors must be differentiable"
+        )
+    if len(input) != len(vector):
+        raise ValueError(
+            "Cannot run hessian-vector product, the amount of vectors supplied must match the amount of input tensors"
+        )
+    if any(v.dim != i.dim for i, v in zip(input, vector)):
+        raise ValueError(
+            "Cannot run hessian-vector product, vector(s) must share dimensions of corresponding input tensors"
+        )
+
+    input = tuple(t.mutated(usegrad=True, grad=None, leaf=True) for t in input)
+    output = _scalar(input, func, *args, **kwargs)
+    hvps = _hvp(input, output, tuple(v.data for v in vector))
+    output = output.mutated(usegrad=False, gradfn=None, leaf=True)
+    return output, tuple(_wrap(h) for h in hvps)
+
+
+def hessian(
+    input: Union[Tuple[Tensor, ...], Tensor],
+    func: Callable[..., Tensor],
+    pos: int = 0,
+    *args: Any,
+    chunk: Optional[int] = None,
+    **kwargs: Any,
+) -> Tuple[Tensor, Tensor]:
+
+    input = _tupify(input)
+    if not all(t.gradtensor for t in input):
+        raise ValueError(
+            "Cannot compute hessian, input tensor(s) must be differentiable"
+        )
+    if pos not in range(-len(input), len(input)):
+        raise ValueError("Cannot compute hessian, selected position is out of range")
+    if chunk is not None and chunk < 1:
+        raise ValueError(
+            f"Cannot compute hessian, chunk size must be positive ({chunk=})"
+        )
+
+    input = tuple(t.mutated(usegrad=True, grad=None, leaf=True) for t in input)
+    output = _scalar(input, func, *args, **kwargs)
+    tensor = input[pos]
+    nelem = tensor.nelem
+    chunk = nelem if chunk is None else min(chunk, nelem)
+    perts = np.eye(nelem, dtype=tensor.data.dtype).reshape((nelem,) + tensor.dim)
+    hess = nura.zeros(tensor.dim + tensor.dim).to(output.dtype)
+    cols = hess.data.reshape(nelem, nelem)
+
+    vector: List[Optional[ndarray]] = [None] * len(input)
+    for start in range(0, nelem, max(chunk, 1)):
+        vector[pos] = perts[start : start + chunk]
+        retaingraph = start + chunk < nelem
+        hvps = _hvp(input, output, tuple(vector), len(vector[pos]), retaingraph)
+        cols[:, start : start + chunk] = hvps[pos].reshape(-1, nelem).T
+    return output.mutated(usegrad=False, gradfn=None, leaf=True), hess
+
+
+def _scalar(
+    input: Tuple[Tensor, ...], func: Callable[..., Tensor], *args: Any, **kwargs: Any
+) -> Tensor:
+    with nura.usegrad():
+        output = func(*input, *args, **kwargs)
+    if output.nelem != 1:
+        raise ValueError(
+            f"Cannot compute second order derivative, function must return a single element tensor ({output.dim=})"
+        )
+    return output
+
+
+def _hvp(
+    input: Tuple[Tensor, ...],
+    output: Tensor,
+    vector: Tuple[Optional[ndarray], ...],
+    batch: int = 0,
+    retaingraph: bool = False,
+) -> Tuple[ndarray, ...]:
+
+    prefix = (batch,) if batch else ()
+    if output.gradfn is None:
+        return tuple(np.zeros(prefix + t.dim, t.data.dtype) for t in input)
+    plan = Plan()
+    nodes = plan.schedule((output.gradfn,))
+    pool = plan.pool
+    seeds = {t.gradfn: v for t, v in zip(input, vector) if v is not None}
+    tangents = [seeds.get(n) for n in nodes]
+
+    for i in reversed(range(len(nodes))):
+        node, slots = nodes[i], plan.edges[i]
+        if node.function is None or i in plan.roots:
+            continue
+        if all(k < 0 or tangents[k] is None for k in slots):
+            continue
+        direction = _direction(node, slots, tangents, prefix)
+        tangents[i] = nura.forwardad.tangent(node.function, node.context, direction)
+
+    grads: List[Optional[ndarray]] = [None] * len(nodes)
+    hvps: List[Optional[ndarray]] = [None] * len(nodes)
+    grads[plan.roots[0]] = np.ones_like(output.data)
+    for i, (node, slots) in enumerate(zip(nodes, plan.edges)):
+        grad, hvp = grads[i], hvps[i]
+        if node.function is None or grad is None:
+            continue
+        gradoutput = node.apply(_wrap(grad))
+        hvpoutput = _apply(node, hvp, batch) if hvp is not None else ()
+        terms: Tuple[Optional[ndarray], ...] = ()
+        if not node.function.linear and any(
+            k >= 0 and tangents[k] is not None for k in slots
+        ):
+            direction = _direction(node, slots, tangents, prefix)
+            terms = nura.forwardad.backtangent(
+                node.function, node.context, _wrap(grad), direction
+            )
+        for j, (k, edgegrad) in enumerate(zip(slots, gradoutput)):
+            if k < 0 or edgegrad is None:
+                continue
+            edgegrad = _dense(edgegrad)
+            edge = nodes[k].output
+            dim, dtype = edge.dim, edge.data.dtype
+            grads[k] = _addgrad(grads[k], edgegrad, dim, dtype, pool)
+            for arr in hvpoutput[j : j + 1] + terms[j : j + 1]:
+                if arr is None:
+                    continue
+                hvps[k] = _addgrad(
+                    hvps[k], _dense(arr), prefix + dim, dtype, pool, batch
+                )
+        if not retaingraph:
+            node.release()
+
+    index = {n: i for i, n in enumerate(nodes)}
+    return tuple(
+        (
+            hvps[index[t.gradfn]]
+            if t.gradfn in index and hvps[index[t.gradfn]] is not None
+            else np.zeros(prefix + t.dim, t.data.dtype)
+        )
+        for t in input
+    )
+
+
+def _direction(
+    node: Node,
+    slots: Tuple[int, ...],
+    tangents: List[Optional[ndarray]],
+    prefix: Tuple[int, ...],
+) -> Tuple[Optional[Tensor], ...]:
+    return tuple(
+        _wrap(tangents[k]) if k >= 0 and tangents[k] is not None else None
+        for t, k in zip(node.context.tensors(), slots)
+    )
+
+
+def _addgrad(
+    grad: Optional[ndarray],
+    arr: ndarray,
+    dim: Tuple[int, ...],
+    dtype: Any,
+    pool: Pool,
+    batch: int = 0,
+) -> ndarray:
+    if arr.shape != dim:
+        arr = _sumgrad(dim, dtype, arr, pool, 1 if batch else 0)
+    if arr.dtype != dtype:
+        arr = arr.astype(dtype)
+    return arr if grad is None else grad + arr
+
+
 def jacrev(
     input: Union[Tuple[Tensor, ...], Tensor],
     func: Callable[..., Tensor],
@@ -303,14 +700,15 @@ def jacrev(
         output = func(*input, *args, **kwargs)
     tensor = input[pos]
     jac = _getjac(tensor, output)
-    perts = _getperts(output)
+    if output.gradfn is None or tensor.gradfn is None:
+        return output.mutated(usegrad=False, gradfn=None, leaf=True), jac
 
-    for row, pert in zip(np.ndindex(output.dim), perts):
-        _, vjps = _vjp(input, pert, func, *args, **kwargs)
-        jacrow = vjps[pos]
-        slc = row + (...,)
-        jac[slc] = jacrow
-    return output, jac
+    nelem = output.nelem
+    perts = np.eye(nelem, dtype=output.data.dtype).reshape((nelem,) + output.dim)
+    rows = _vjpbatch(output, tensor, perts)
+    if rows is not None:
+        jac.data[...] = rows.reshape(jac.dim)
+    return output.mutated(usegrad=False, gradfn=None, leaf=True), jac
 
 
 def jacfwd(
@@ -318,6 +716,7 @@ def jacfwd(
     func: Callable[..., Tensor],
     pos: int = 0,
     *args: Any,
+    chunk: Optional[int] = None,
     **kwargs: Any,
 ) -> Tuple[Tensor, Tensor]:
 
@@ -330,33 +729,157 @@ def jacfwd(
         raise ValueError(
             "Cannot compute forward-ad jacobian, selected position is out of range"
         )
+    if chunk is not None and chunk < 1:
+        raise ValueError(
+            f"Cannot compute forward-ad jacobian, chunk size must be positive ({chunk=})"
+        )
 
-    with nura.forwardmode():
-        output = func(*input, *args, **kwargs)
     tensor = input[pos]
-    perts = _getperts(tensor)
+    nelem = tensor.nelem
+    chunk = nelem if chunk is None else min(chunk, nelem)
+    perts = np.eye(nelem, dtype=tensor.data.dtype).reshape((nelem,) + tensor.dim)
+
+    output, jac, cols = None, None, None
+    for start in range(0, max(nelem, 1), max(chunk, 1)):
+        pert = perts[start : start + chunk]
+        output, tangents = _jvpbatch(input, func, pos, pert, *args, **kwargs)
+        if jac is None:
+            jac = _getjac(tensor, output)
+            cols = jac.data.reshape(output.dim + (nelem,))
+        if tangents is not None:
+            cols[..., start : start + chunk] = np.moveaxis(tangents, 0, -1)
+    assert output is not None and jac is not None
+    return output.mutated(usegrad=False, grad=None, leaf=True), jac
+
+
+def jacpattern(
+    input: Union[Tuple[Tensor, ...], Tensor],
+    func: Callable[..., Tensor],
+    pos: int = 0,
+    *args: Any,
+    **kwargs: Any,
+) -> Sparsity:
+
+    output, jac = jacrev(input, func, pos, *args, **kwargs)
+    return Sparsity(jac.data.reshape(output.nelem, -1) != 0)
+
+
+def jacsparse(
+    input: Union[Tuple[Tensor, ...], Tensor],
+    func: Callable[..., Tensor],
+    pos: int = 0,
+    *args: Any,
+    pattern: Optional[Union[Sparsity, Tensor, ndarray]] = None,
+    mode: Optional[str] = None,
+    csr: bool = False,
+    **kwargs: Any,
+) -> Tuple[Tensor, Union[Tensor, Tuple[Tensor, Tensor, Tensor]]]:
+
+    input = _tupify(input)
+    if not all(t.gradtensor for t in input):
+        raise ValueError(
+            "Cannot compute sparse jacobian, input tensor(s) must be differentiable"
+        )
+    if pos not in range(-len(input), len(input)):
+        raise ValueError(
+            "Cannot compute sparse jacobian, selected position is out of range"
+        )
+    if mode not in (None, "fwd", "rev"):
+        raise ValueError(
+            f"Cannot compute sparse jacobian, mode must be 'fwd', 'rev' or None ({mode=})"
+        )
+
+    if pattern is None:
+        raise ValueError(
+            "Cannot compute sparse jacobian, a pattern is required "
+            "(jacpattern detects one with a dense jacrev pass, compute it once "
+            "and reuse it across calls)"
+        )
+
+    tensor = input[pos]
+    if not isinstance(pattern, Sparsity):
+        mask = pattern.data if isinstance(pattern, Tensor) else np.asarray(pattern)
+        pattern = Sparsity(mask.reshape(-1, tensor.nelem))
+    if pattern.dim[1] != tensor.nelem:
+        raise ValueError(
+            f"Cannot compute sparse jacobian, pattern columns do not match input elements ({pattern.dim[1]} != {tensor.nelem})"
+        )
+    mode = pattern.mode() if mode is None else mode
+    rows, cols = pattern.rows, pattern.cols
+
+    if mode == "fwd":
+        seeds = _seeds(pattern.colors, tensor)
+        output, tangents = _jvpbatch(input, func, pos, seeds, *args, **kwargs)
+        output = output.mutated(usegrad=False, grad=None, leaf=True)
+        _checkrows(pattern, output)
+        compressed, index = tangents, (pattern.colors[cols], rows)
+    else:
+        input = tuple(t.mutated(usegrad=True, grad=None, leaf=True) for t in input)
+        with nura.usegrad():
+            output = func(*input, *args, **kwargs)
+        _checkrows(pattern, output)
+        seeds = _seeds(pattern.rowcolors, output)
+        compressed = _vjpbatch(output, input[pos], seeds)
+        output = output.mutated(usegrad=False, gradfn=None, leaf=True)
+        index = (pattern.rowcolors[rows], cols)
+
+    if compressed is None:
+        values = np.zeros(pattern.nnz, dtype=output.data.dtype)
+    else:
+        values = compressed.reshape(len(seeds), -1)[index]
+    if csr:
+        return output, _tocsr(pattern, values)
     jac = _getjac(tensor, output)
-    colinput = [
-        t.mutated(usegrad=True, grad=nura.zeroslike(t)) if i != pos else t
-        for i, t in enumerate(input)
-    ]
-
-    for col, pert in zip(np.ndindex(tensor.dim), perts):
-        colinput[pos] = colinput[pos].mutated(usegrad=True, grad=pert)
-        _, jaccol = _jvp(tuple(colinput), func, *args, **kwargs)
-        slc = (...,) + col
-        jac[slc] = jaccol
+    jac.data.reshape(pattern.dim)[rows, cols] = values
     return output, jac
 
 
-def _getperts(tensor: Tensor) -> Generator[Tensor, None, None]:
-    nelem, dim, dtype = tensor.nelem, tensor.dim, tensor.dtype
-    perts = nura.zeros((nelem,) + dim).to(dtype)
-    arange = np.arange(nelem)
-    indices = np.unravel_index(arange, dim)
-    slc = (arange,) + indices
-    perts[slc] = 1.0
-    return (perts[i] for i in range(nelem))
+def _jvpbatch(
+    input: Tuple[Tensor, ...],
+    func: Callable[..., Tensor],
+    pos: int,
+    perts: ndarray,
+    *args: Any,
+    **kwargs: Any,
+) -> Tuple[Tensor, Optional[ndarray]]:
+    colinput = [t.mutated(usegrad=False, grad=None) for t in input]
+    colinput[pos] = input[pos].mutated(usegrad=True, grad=nura.tensor(perts))
+    with nura.forwardmode():
+        output = func(*colinput, *args, **kwargs)
+        grad = output.grad
+    if grad is None or grad.ndim == output.ndim:
+        return output, None
+    return output, grad.data
+
+
+def _vjpbatch(output: Tensor, tensor: Tensor, perts: ndarray) -> Optional[ndarray]:
+    if output.gradfn is None or tensor.gradfn is None:
+        return None
+    retain = {tensor.gradfn}
+    gradmap = _reverse(
+        (output,), (_wrap(perts),), retain, accumulate=False, batch=len(perts)
+    )
+    return gradmap.get(tensor.gradfn)
+
+
+def _checkrows(sparsity: Sparsity, output: Tensor) -> None:
+    if output.nelem != sparsity.dim[0]:
+        raise ValueError(
+            f"Cannot compute sparse jacobian, pattern rows do not match output elements ({sparsity.dim[0]} != {output.nelem})"
+        )
+
+
+def _seeds(colors: ndarray, tensor: Tensor) -> ndarray:
+    ncolors = colors.max(initial=-1) + 1
+    seeds = np.zeros((ncolors, tensor.nelem), dtype=tensor.data.dtype)
+    seeds[colors, np.arange(tensor.nelem)] = 1
+    return seeds.reshape((ncolors,) + tensor.dim)
+
+
+def _tocsr(sparsity: Sparsity, values: ndarray) -> Tuple[Tensor, Tensor, Tensor]:
+    count = np.bincount(sparsity.rows, minlength=sparsity.dim[0])
+    indptr = np.concatenate(([0], np.cumsum(count)))
+    return nura.tensor(values), nura.tensor(sparsity.cols), nura.tensor(indptr)
 
 
 def _getjac(tensor: Tensor, output: Tensor) -> Tensor:
@@ -0,0 +1,172 @@
+import numpy as np
+from nura.tensors import Tensor
+from nura.autograd.function import Function, Context
+from numpy import ndarray
+from nura.types import dim
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+
+class Kernel:
+
+    def __init__(
+        self,
+        ninputs: int,
+        steps: Tuple[Tuple[Type[Function], Tuple[int, ...]], ...],
+        dim: dim,
+        dtype: Any,
+        block: int = 16384,
+    ) -> None:
+        if block <= 0:
+            raise ValueError(
+                f"Cannot create kernel, block must be positive ({block=})"
+            )
+        self._ninputs = ninputs
+        self._steps = steps
+        self._dim = dim
+        self._dtype = np.dtype(dtype)
+        self._block = block
+
+    @property
+    def ninputs(self) -> int:
+        return self._ninputs
+
+    @property
+    def steps(self) -> Tuple[Tuple[Type[Function], Tuple[int, ...]], ...]:
+        return self._steps
+
+    @property
+    def dim(self) -> dim:
+        return self._dim
+
+    @property
+    def dtype(self) -> Any:
+        return self._dtype
+
+    @property
+    def block(self) -> int:
+        return self._block
+
+    def forward(self, arrays: Tuple[ndarray, ...]) -> ndarray:
+        output = np.empty(self.dim, self.dtype)
+        flat = output.reshape(-1)
+        size, block, last = flat.size, self.block, len(self.steps) - 1
+        inputs = [_flatten(a, size) for a in arrays]
+        scratch = [np.empty(min(block, size), self.dtype) for _ in range(last)]
+        for start in range(0, size, block):
+            stop = min(start + block, size)
+            regs = [a if not a.ndim else a[start:stop] for a in inputs]
+            for i, (function, refs) in enumerate(self.steps):
+                out = (
+                    flat[start:stop]
+                    if i == last
+                    else scratch[i][: stop - start]
+                )
+                function.ufunc(*(regs[r] for r in refs), out=out)
+                regs.append(out)
+        return output
+
+    def backward(
+        self,
+        arrays: Tuple[ndarray, ...],
+        usegrads: Tuple[bool, ...],
+        grad: ndarray,
+    ) -> Tuple[Optional[ndarray], ...]:
+        size, block, ninputs = int(np.prod(self.dim)), self.block, self.ninputs
+        inputs = [_flatten(a, size) for a in arrays]
+        grad = np.broadcast_to(grad, self.dim).reshape(-1)
+        usegrads = list(usegrads)
+        for _, refs in self.steps:
+            usegrads.append(any(usegrads[r] for r in refs))
+        grads: List[Optional[ndarray]] = [
+            np.zeros(a.shape, self.dtype) if u else None
+            for a, u in zip(inputs, usegrads)
+        ]
+        scratch = [np.empty(min(block, size), self.dtype) for _ in self.steps]
+        for start in range(0, size, block):
+            stop = min(start + block, size)
+            regs = [a if not a.ndim else a[start:stop] for a in inputs]
+            for i, (function, refs) in enumerate(self.steps):
+                out = scratch[i][: stop - start]
+                function.ufunc(*(regs[r] for r in refs), out=out)
+                regs.append(out)
+
+            regrads: List[Optional[ndarray]] = [None] * len(regs)
+            regrads[-1] = grad[start:stop]
+            for i in reversed(range(len(self.steps))):
+                function, refs = self.steps[i]
+                nodegrad = regrads[ninputs + i]
+                if nodegrad is None or not usegrads[ninputs + i]:
+                    continue
+                operands = tuple(regs[r] for r in refs)
+                for r, vjp in zip(refs, _vjps[function.ufunc]):
+                    if not usegrads[r]:
+                        continue
+                    arr = vjp(nodegrad, regs[ninputs + i], *operands)
+                    if not regs[r].ndim and arr.ndim:
+                        arr = arr.sum()
+                    regrads[r] = arr if regrads[r] is None else regrads[r] + arr
+
+            for j, arr in enumerate(grads):
+                if arr is None or regrads[j] is None:
+                    continue
+                if arr.ndim:
+                    arr[start:stop] = regrads[j]
+                else:
+                    arr += regrads[j]
+        return tuple(
+            g.reshape(a.shape) if g is not None else None
+            for g, a in zip(grads, arrays)
+        )
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __repr__(self) -> str:
+        steps, dim, block = len(self), self.dim, self.block
+        return f"{self.__class__.__name__}({steps=} {dim=} {block=})"
+
+
+class Fused(Function):
+
+    @staticmethod
+    def forward(context: Context, kernel: Kernel, *tensors: Tensor) -> ndarray:
+        context.save(*tensors)
+        context.kernel = kernel
+        return kernel.forward(tuple(t.data for t in tensors))
+
+    @staticmethod
+    def backward(
+        context: Context, grad: Tensor
+    ) -> Tuple[Optional[ndarray], ...]:
+        tensors = context.tensors()
+        arrays = tuple(t.data for t in tensors)
+        usegrads = tuple(t.usegrad for t in tensors)
+        return context.kernel.backward(arrays, usegrads, grad.data)
+
+
+def _flatten(arr: ndarray, size: int) -> ndarray:
+    if arr.size == 1 and size != 1:
+        return arr.reshape(())
+    return arr.reshape(-1)
+
+
+_vjps: Dict[np.ufunc, Tuple[Callable[..., ndarray], ...]] = {
+    np.add: (lambda g, y, a, b: g, lambda g, y, a, b: g),
+    np.subtract: (lambda g, y, a, b: g, lambda g, y, a, b: np.negative(g)),
+    np.multiply: (lambda g, y, a, b: g * b, lambda g, y, a, b: g * a),
+    np.divide: (
+        lambda g, y, a, b: g / b,
+        lambda g, y, a, b: np.negative(g) * y / b,
+    ),
+    np.power: (
+        lambda g, y, a, b: g * b * np.power(a, b - 1),
+        lambda g, y, a, b: g * y * np.log(a),
+    ),
+    np.exp: (lambda g, y, a: g * y,),
+    np.log: (lambda g, y, a: g / a,),
+    np.sin: (lambda g, y, a: g * np.cos(a),),
+    np.cos: (lambda g, y, a: np.negative(g) * np.sin(a),),
+    np.absolute: (lambda g, y, a: g * np.sign(a),),
+    np.negative: (lambda g, y, a: np.negative(g),),
+    np.tanh: (lambda g, y, a: g * (1 - np.square(y)),),
+}
@@ -1,7 +1,12 @@
+import numpy as np
 import nura
+from numpy import ndarray
 from nura.tensors import Tensor
 from typing import Optional, Type, Tuple, Union, Sequence
 from nura.autograd.function import Function, Context
+from nura.autograd.profile import profiled
+from nura.autograd.rowsparse import RowSparse
+from nura.autograd.slab import Slab
 from collections import deque
 
 
@@ -15,7 +20,7 @@ class Node:
         edges: Optional[Tuple[Optional["Node"], ...]] = None,
         accumulate: bool = False,
     ) -> None:
-        self._output = output
+        self._output: Optional[Tensor] = output
         self._function = function
         self._context = context
         self._edges = edges
@@ -23,6 +28,10 @@ class Node:
 
     @property
     def output(self) -> Tensor:
+        if self._output is None:
+            raise RuntimeError(
+                "Cannot retrieve output, graph has been released (use retaingraph=True to run backward more than once)"
+            )
         return self._output
 
     @property
@@ -39,6 +48,14 @@ class Node:
             return ()
         return self._edges
 
+    @property
+    def batched(self) -> bool:
+        return self._function is not None and self._function.batched
+
+    @property
+    def released(self) -> bool:
+        return self._function is not None and self._context is None
+
     @property
     def accumulate(self) -> bool:
         return self._accumulate and self.output.usegrad
@@ -49,11 +66,29 @@ class Node:
     def unretain(self) -> None:
         self._accumulate = False
 
-    def apply(self, grad: Tensor) -> Union[Tuple[Tensor, ...], Tensor]:
+    def release(self) -> None:
+        if self._function is None:
+            return
+        self._context = None
+        self._output = None
+
+    def apply(self, grad: Tensor) -> Tuple[Optional[ndarray], ...]:
+        if self.released:
+            raise RuntimeError(
+                "Cannot apply backward, graph has been released (use retaingraph=True to run backward more than once)"
+            )
         if self.function is None or self.context is None:
             raise RuntimeError("Cannot apply backward, function and/or context is None")
-        arr = self.function.backward(self.context, grad)
-        return nura.totensor(arr)
+        function, context = self.function, self.context
+        profile = nura.Autograd._profile
+        if profile is None:
+            arr = function.backward(context, grad)
+        else:
+            args = (context, grad)
+            arr = profile.run(function.name(), "backward", function.backward, args)
+        if isinstance(arr, tuple):
+            return tuple(_asarray(a) if a is not None else None for a in arr)
+        return (_asarray(arr),)
 
     def name(self) -> str:
         name = (
@@ -83,6 +118,7 @@ def linkedges(context: Context) -> Tuple[Optional[Node], ...]:
     return tuple(edges)
 
 
+@profiled("engine")
 def toposort(node: Union[Sequence[Node], Node]) -> Tuple[Node, ...]:
     if not isinstance(node, Sequence):
         node = (node,)
@@ -117,3 +153,11 @@ def toposort(node: Union[Sequence[Node], Node]) -> Tuple[Node, ...]:
             if not indegree[edge]:
                 queue.append(edge)
     return tuple(topolist)
+
+
+def _asarray(
+    arr: Union[ndarray, RowSparse, Slab]
+) -> Union[ndarray, RowSparse, Slab]:
+    if isinstance(arr, (RowSparse, Slab)):
+        return arr
+    return np.asarray(arr)
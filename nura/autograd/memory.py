@@ -0,0 +1,153 @@
+import gc
+import tracemalloc
+from nura.tensors import Tensor
+from nura.autograd.graph import Node
+from nura.autograd.function import Context
+from nura.autograd.profile import Profile
+from nura.autograd.mode import profiling
+from numpy import ndarray
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple
+
+
+class Stats:
+
+    def __init__(self, tensors: int, nodes: int, saved: Dict[str, int]) -> None:
+        self._tensors = tensors
+        self._nodes = nodes
+        self._saved = saved
+
+    @property
+    def tensors(self) -> int:
+        return self._tensors
+
+    @property
+    def nodes(self) -> int:
+        return self._nodes
+
+    @property
+    def saved(self) -> Dict[str, int]:
+        return dict(self._saved)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._saved.values())
+
+    def __repr__(self) -> str:
+        tensors, nodes, nbytes = self.tensors, self.nodes, self.nbytes
+        return f"{self.__class__.__name__}({tensors=} {nodes=} {nbytes=})"
+
+
+class Tracker(Profile):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._frames: List[int] = []
+        self._peaks: Dict[Tuple[str, str], int] = {}
+        self._baseline = 0
+        self._high = 0
+
+    @property
+    def peak(self) -> int:
+        self._flush()
+        return self._high - self._baseline
+
+    @property
+    def peaks(self) -> List[Tuple[str, str, int]]:
+        rows = [(n, p, b) for (n, p), b in self._peaks.items()]
+        return sorted(rows, key=lambda r: r[2], reverse=True)
+
+    def start(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._baseline = self._high = current
+
+    def run(
+        self,
+        name: str,
+        phase: str,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        self._flush()
+        current, _ = tracemalloc.get_traced_memory()
+        self._frames.append(current)
+        try:
+            output = super().run(name, phase, func, args, kwargs)
+        finally:
+            self._flush()
+            high = self._frames.pop()
+        key = (name, phase)
+        self._peaks[key] = max(self._peaks.get(key, 0), high - current)
+        return output
+
+    def _flush(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._frames = [max(f, peak) for f in self._frames]
+        self._high = max(self._high, peak)
+
+    def __repr__(self) -> str:
+        events, peak = len(self), self.peak
+        return f"{self.__class__.__name__}({events=} {peak=})"
+
+
+def stats() -> Stats:
+    tensors, nodes = 0, 0
+    saved: Dict[str, int] = {}
+    seen: Set[int] = set()
+    for obj in gc.get_objects():
+        if isinstance(obj, Tensor):
+            tensors += 1
+        elif isinstance(obj, Node):
+            nodes += 1
+            if obj.function is None or obj.context is None:
+                continue
+            nbytes = sum(_nbytes(v, seen) for v in _held(obj.context))
+            name = obj.function.name()
+            saved[name] = saved.get(name, 0) + nbytes
+    return Stats(tensors, nodes, saved)
+
+
+@contextmanager
+def tracker() -> Generator[Tracker, None, None]:
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracker = Tracker()
+    tracker.start()
+    try:
+        with profiling(tracker):
+            yield tracker
+    finally:
+        tracker._flush()
+        if not tracing:
+            tracemalloc.stop()
+
+
+def _held(context: Context) -> List[Any]:
+    values = []
+    for name, value in context.__dict__.items():
+        if name == "_context":
+            values.extend(t for t, _ in value or ())
+        else:
+            values.append(value)
+    return values
+
+
+def _nbytes(value: Any, seen: Set[int]) -> int:
+    if isinstance(value, Tensor):
+        value = value.data
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v, seen) for v in value)
+    if not isinstance(value, ndarray):
+        return 0
+    while isinstance(value.base, ndarray):
+        value = value.base
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    return value.nbytes
@@ -1,12 +1,25 @@
 import nura
 from nura.tensors import Tensor
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nura.autograd.batching import Level
+    from nura.autograd.forwardad import Tape
+    from nura.autograd.compiler import Graph
+    from nura.autograd.pool import Pool
+    from nura.autograd.profile import Profile
 
 
 class Autograd:
     _usegrad = True
     _forwardmode = False
+    _inference = False
+    _batch: Optional["Level"] = None
+    _tape: Optional["Tape"] = None
+    _trace: Optional["Graph"] = None
+    _pool: Optional["Pool"] = None
+    _profile: Optional["Profile"] = None
 
     @classmethod
     def reversemode(cls) -> bool:
@@ -16,18 +29,25 @@ class Autograd:
     def forwardmode(cls) -> bool:
         return cls._forwardmode and not cls._usegrad
 
+    @classmethod
+    def inferencemode(cls) -> bool:
+        return cls._inference
+
 
 @contextmanager
 def usegrad() -> Generator:
     usegrad = Autograd._usegrad
     forwardmode = Autograd._forwardmode
+    inference = Autograd._inference
     Autograd._usegrad = True
     Autograd._forwardmode = False
+    Autograd._inference = False
     try:
         yield
     finally:
         Autograd._usegrad = usegrad
         Autograd._forwardmode = forwardmode
+        Autograd._inference = inference
 
 
 @contextmanager
@@ -44,23 +64,96 @@ def nograd() -> Generator:
 def setgrad(state: bool) -> Generator:
     usegrad = Autograd._usegrad
     forwardmode = Autograd._forwardmode
+    inference = Autograd._inference
+    tape = Autograd._tape
+    scope = nura.forwardad.Tape() if not state else None
     Autograd._usegrad = state
     Autograd._forwardmode = not state
+    Autograd._inference = False
+    Autograd._tape = scope
     try:
         yield
     finally:
+        if scope is not None:
+            scope.release()
         Autograd._usegrad = usegrad
         Autograd._forwardmode = forwardmode
+        Autograd._inference = inference
+        Autograd._tape = tape
 
 
 @contextmanager
 def forwardmode() -> Generator:
     usegrad = Autograd._usegrad
     forwardmode = Autograd._forwardmode
+    inference = Autograd._inference
+    tape = Autograd._tape
     Autograd._usegrad = False
     Autograd._forwardmode = True
+    Autograd._inference = False
+    scope = nura.forwardad.Tape()
+    Autograd._tape = scope
+    try:
+        yield
+    finally:
+        scope.release()
+        Autograd._usegrad = usegrad
+        Autograd._forwardmode = forwardmode
+        Autograd._inference = inference
+        Autograd._tape = tape
+
+
+@contextmanager
+def inference() -> Generator:
+    usegrad = Autograd._usegrad
+    forwardmode = Autograd._forwardmode
+    inference = Autograd._inference
+    Autograd._usegrad = False
+    Autograd._forwardmode = False
+    Autograd._inference = True
     try:
         yield
     finally:
         Autograd._usegrad = usegrad
         Autograd._forwardmode = forwardmode
+        Autograd._inference = inference
+
+
+@contextmanager
+def batching(level: Optional["Level"]) -> Generator:
+    batch = Autograd._batch
+    Autograd._batch = level
+    try:
+        yield
+    finally:
+        Autograd._batch = batch
+
+
+@contextmanager
+def tracing(graph: Optional["Graph"]) -> Generator:
+    trace = Autograd._trace
+    Autograd._trace = graph
+    try:
+        yield
+    finally:
+        Autograd._trace = trace
+
+
+@contextmanager
+def pooling(pool: Optional["Pool"]) -> Generator:
+    previous = Autograd._pool
+    Autograd._pool = pool
+    try:
+        yield
+    finally:
+        Autograd._pool = previous
+
+
+@contextmanager
+def profiling(profile: Optional["Profile"]) -> Generator:
+    previous = Autograd._profile
+    Autograd._profile = profile
+    try:
+        yield
+    finally:
+        Autograd._profile = previous
@@ -0,0 +1,166 @@
+from nura.autograd.graph import Node, toposort
+from nura.autograd.function import Function
+from nura.autograd.pool import Pool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Type, List
+
+
+class Plan:
+
+    def __init__(self, pool: Optional[Pool] = None, workers: int = 0) -> None:
+        if workers < 0:
+            raise ValueError(
+                f"Cannot create plan, workers must be non-negative ({workers=})"
+            )
+        self._pool = Pool() if pool is None else pool
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._functions: Optional[Tuple[Optional[Type[Function]], ...]] = None
+        self._edges: Tuple[Tuple[int, ...], ...] = ()
+        self._fanin: Tuple[int, ...] = ()
+        self._accumulate: Tuple[bool, ...] = ()
+        self._roots: Tuple[int, ...] = ()
+        self._ready: Tuple[Tuple[int, ...], ...] = ()
+        self._records = 0
+        self._replays = 0
+
+    @property
+    def pool(self) -> Pool:
+        return self._pool
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        if self._workers and self._executor is None:
+            self._executor = ThreadPoolExecutor(self._workers)
+        return self._executor
+
+    @property
+    def recorded(self) -> bool:
+        return self._functions is not None
+
+    @property
+    def edges(self) -> Tuple[Tuple[int, ...], ...]:
+        return self._edges
+
+    @property
+    def fanin(self) -> Tuple[int, ...]:
+        return self._fanin
+
+    @property
+    def accumulate(self) -> Tuple[bool, ...]:
+        return self._accumulate
+
+    @property
+    def roots(self) -> Tuple[int, ...]:
+        return self._roots
+
+    @property
+    def ready(self) -> Tuple[Tuple[int, ...], ...]:
+        return self._ready
+
+    @property
+    def records(self) -> int:
+        return self._records
+
+    @property
+    def replays(self) -> int:
+        return self._replays
+
+    def schedule(self, roots: Tuple[Node, ...]) -> Tuple[Node, ...]:
+        if self.recorded:
+            nodes = self.replay(roots)
+            if nodes is not None:
+                self._replays += 1
+                return nodes
+        return self.record(roots)
+
+    def record(self, roots: Tuple[Node, ...]) -> Tuple[Node, ...]:
+        nodes = toposort(roots)
+        index = {n: i for i, n in enumerate(nodes)}
+        fanin = [0] * len(nodes)
+        last = [-1] * len(nodes)
+        functions, accumulate, edges = [], [], []
+        for i, n in enumerate(nodes):
+            slots = []
+            for e in n.edges:
+                if e is None:
+                    slots.append(-1)
+                    continue
+                k = index[e]
+                fanin[k] += 1
+                last[k] = i
+                slots.append(k)
+            functions.append(n.function)
+            accumulate.append(n.accumulate)
+            edges.append(tuple(slots))
+
+        self._functions = tuple(functions)
+        self._edges = tuple(edges)
+        self._fanin = tuple(fanin)
+        self._accumulate = tuple(accumulate)
+        self._roots = tuple(index[r] for r in roots)
+        ready: List[List[int]] = [[] for _ in range(len(nodes) + 1)]
+        for k, i in enumerate(last):
+            ready[i + 1].append(k)
+        self._ready = tuple(tuple(r) for r in ready)
+        self._records += 1
+        return nodes
+
+    def replay(self, roots: Tuple[Node, ...]) -> Optional[Tuple[Node, ...]]:
+        functions = self._functions
+        if functions is None or len(roots) != len(self._roots):
+            return None
+        nodes: List[Optional[Node]] = [None] * len(functions)
+        for r, k in zip(roots, self._roots):
+            if nodes[k] is not None:
+                return None
+            nodes[k] = r
+
+        for node, function, accumulate, slots in zip(
+            nodes, functions, self._accumulate, self._edges
+        ):
+            if node is None or node._function is not function:
+                return None
+            if node.accumulate is not accumulate:
+                return None
+            edges = node._edges if node._edges is not None else ()
+            if len(edges) != len(slots):
+                return None
+            for e, k in zip(edges, slots):
+                if e is None:
+                    if k >= 0:
+                        return None
+                elif k < 0:
+                    return None
+                elif nodes[k] is None:
+                    nodes[k] = e
+                elif nodes[k] is not e:
+                    return None
+        if len(set(nodes)) != len(nodes):
+            return None
+        return tuple(nodes)
+
+    def reset(self) -> None:
+        self._functions = None
+        self._edges = ()
+        self._fanin = ()
+        self._accumulate = ()
+        self._roots = ()
+        self._ready = ()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __len__(self) -> int:
+        return len(self._functions) if self._functions is not None else 0
+
+    def __repr__(self) -> str:
+        nodes, workers = len(self), self.workers
+        records, replays = self.records, self.replays
+        return f"{self.__class__.__name__}({nodes=} {workers=} {records=} {replays=})"
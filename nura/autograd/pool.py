@@ -0,0 +1,100 @@
+import threading
+import numpy as np
+import nura
+from numpy import ndarray
+from nura.types import dim
+from typing import Dict, List, Tuple, Any
+
+
+class Pool:
+
+    def __init__(self, limit: int = 2) -> None:
+        self._limit = limit
+        self._free: Dict[Tuple[dim, Any], List[ndarray]] = {}
+        self._allocs = 0
+        self._reuses = 0
+        self._allocbytes = 0
+        self._reusebytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def allocs(self) -> int:
+        return self._allocs
+
+    @property
+    def reuses(self) -> int:
+        return self._reuses
+
+    @property
+    def allocbytes(self) -> int:
+        return self._allocbytes
+
+    @property
+    def reusebytes(self) -> int:
+        return self._reusebytes
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(a.nbytes for free in self._free.values() for a in free)
+
+    def acquire(self, dim: dim, dtype: Any) -> ndarray:
+        key = (tuple(dim), np.dtype(dtype))
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                arr = free.pop()
+                self._reuses += 1
+                self._reusebytes += arr.nbytes
+                return arr
+            if free is None:
+                self._free[key] = []
+        arr = np.empty(dim, dtype)
+        with self._lock:
+            self._allocs += 1
+            self._allocbytes += arr.nbytes
+        return arr
+
+    def release(self, arr: ndarray) -> None:
+        if arr.base is not None or not arr.flags.c_contiguous:
+            return
+        if not arr.flags.writeable:
+            return
+        with self._lock:
+            free = self._free.get((arr.shape, arr.dtype))
+            if free is not None and len(free) < self._limit:
+                if not any(a is arr for a in free):
+                    free.append(arr)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._free.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(free) for free in self._free.values())
+
+    def __repr__(self) -> str:
+        limit, allocs, reuses = self.limit, self.allocs, self.reuses
+        allocbytes, reusebytes = self.allocbytes, self.reusebytes
+        return f"{self.__class__.__name__}({limit=} {allocs=} {reuses=} {allocbytes=} {reusebytes=})"
+
+
+def empty(dim: dim, dtype: Any) -> ndarray:
+    pool = nura.Autograd._pool
+    if pool is None:
+        return np.empty(dim, dtype)
+    return pool.acquire(dim, dtype)
+
+
+def zeros(dim: dim, dtype: Any) -> ndarray:
+    pool = nura.Autograd._pool
+    if pool is None:
+        return np.zeros(dim, dtype)
+    arr = pool.acquire(dim, dtype)
+    arr.fill(0)
+    return arr
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import threading
+import functools
+import nura
+from nura.tensors import Tensor
+from nura.autograd.mode import profiling
+from numpy import ndarray
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+
+class Event:
+
+    def __init__(
+        self,
+        name: str,
+        phase: str,
+        start: int,
+        stop: int,
+        thread: int,
+        inputs: Tuple[Tuple[int, ...], ...],
+        outputs: Tuple[Tuple[int, ...], ...],
+        nbytes: int,
+    ) -> None:
+        self._name = name
+        self._phase = phase
+        self._start = start
+        self._stop = stop
+        self._thread = thread
+        self._inputs = inputs
+        self._outputs = outputs
+        self._nbytes = nbytes
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def phase(self) -> str:
+        return self._phase
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def stop(self) -> int:
+        return self._stop
+
+    @property
+    def duration(self) -> int:
+        return self._stop - self._start
+
+    @property
+    def thread(self) -> int:
+        return self._thread
+
+    @property
+    def inputs(self) -> Tuple[Tuple[int, ...], ...]:
+        return self._inputs
+
+    @property
+    def outputs(self) -> Tuple[Tuple[int, ...], ...]:
+        return self._outputs
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def __repr__(self) -> str:
+        name, phase = self.name, self.phase
+        duration, nbytes = self.duration, self.nbytes
+        return (
+            f"{self.__class__.__name__}({name=} {phase=} {duration=} {nbytes=})"
+        )
+
+
+class Profile:
+
+    def __init__(self) -> None:
+        self._events: List[Event] = []
+        self._origin = time.perf_counter_ns()
+
+    @property
+    def events(self) -> Tuple[Event, ...]:
+        return tuple(self._events)
+
+    def run(
+        self,
+        name: str,
+        phase: str,
+        func: Callable[..., Any],
+        args: Tuple[Any, ...],
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        start = time.perf_counter_ns()
+        output = func(*args, **kwargs) if kwargs else func(*args)
+        stop = time.perf_counter_ns()
+        outputs = _arrays((output,))
+        self._events.append(
+            Event(
+                name,
+                phase,
+                start,
+                stop,
+                threading.get_ident(),
+                tuple(a.shape for a in _arrays(args)),
+                tuple(a.shape for a in outputs),
+                sum(a.nbytes for a in outputs),
+            )
+        )
+        return output
+
+    def summary(self) -> List[Tuple[str, str, int, int, int, int]]:
+        totals: Dict[Tuple[str, str], List[int]] = {}
+        for e, own in zip(self._events, _selftimes(self._events)):
+            total = totals.setdefault((e.name, e.phase), [0, 0, 0, 0])
+            total[0] += 1
+            total[1] += e.duration
+            total[2] += own
+            total[3] += e.nbytes
+        rows = [(n, p, c, t, o, b) for (n, p), (c, t, o, b) in totals.items()]
+        return sorted(rows, key=lambda r: r[4], reverse=True)
+
+    def table(self, limit: Optional[int] = None) -> str:
+        rows = self.summary()[:limit]
+        events = self._events
+        span = (
+            max(e.stop for e in events) - min(e.start for e in events)
+            if events
+            else 0
+        )
+        header = (
+            f"{'name':<24} {'phase':<11} {'calls':>8} {'total ms':>10} "
+            f"{'self ms':>10} {'mean us':>10} {'self %':>7} {'MiB':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, phase, calls, total, own, nbytes in rows:
+            percent = 100 * own / span if span else 0.0
+            lines.append(
+                f"{name:<24} {phase:<11} {calls:>8} {total / 1e6:>10.3f} "
+                f"{own / 1e6:>10.3f} {total / calls / 1e3:>10.2f} "
+                f"{percent:>6.1f}% {nbytes / 2**20:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        events = [
+            {
+                "name": e.name,
+                "cat": e.phase,
+                "ph": "X",
+                "ts": (e.start - self._origin) / 1e3,
+                "dur": e.duration / 1e3,
+                "pid": pid,
+                "tid": e.thread,
+                "args": {
+                    "inputs": [list(d) for d in e.inputs],
+                    "outputs": [list(d) for d in e.outputs],
+                    "nbytes": e.nbytes,
+                },
+            }
+            for e in self._events
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __repr__(self) -> str:
+        events = len(self)
+        return f"{self.__class__.__name__}({events=})"
+
+
+@contextmanager
+def profiler() -> Generator[Profile, None, None]:
+    profile = Profile()
+    with profiling(profile):
+        yield profile
+
+
+def profiled(phase: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profile = nura.Autograd._profile
+            if profile is None:
+                return func(*args, **kwargs)
+            return profile.run(name, phase, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _selftimes(events: List[Event]) -> List[int]:
+    own = [e.duration for e in events]
+    order = sorted(
+        range(len(events)),
+        key=lambda i: (events[i].thread, events[i].start, -events[i].stop),
+    )
+    stack: List[int] = []
+    for i in order:
+        e = events[i]
+        while stack and (
+            events[stack[-1]].thread != e.thread
+            or events[stack[-1]].stop <= e.start
+        ):
+            stack.pop()
+        if stack:
+            own[stack[-1]] -= e.duration
+        stack.append(i)
+    return own
+
+
+def _arrays(values: Tuple[Any, ...]) -> Tuple[ndarray, ...]:
+    arrays = []
+    for v in values:
+        if isinstance(v, Tensor):
+            arrays.append(v.data)
+        elif isinstance(v, ndarray):
+            arrays.append(v)
+        elif isinstance(v, tuple):
+            arrays.extend(_arrays(v))
+    return tuple(arrays)
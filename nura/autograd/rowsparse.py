@@ -0,0 +1,81 @@
+import numpy as np
+from numpy import ndarray
+from nura.types import dim
+from typing import Any, Tuple
+
+
+class RowSparse:
+
+    def __init__(self, indices: ndarray, rows: ndarray, dim: dim) -> None:
+        if indices.ndim != 1 or len(indices) != len(rows):
+            raise ValueError(
+                f"Cannot create row sparse gradient, expected one row per index ({indices.shape=} {rows.shape=})"
+            )
+        if rows.shape[1:] != tuple(dim[1:]):
+            raise ValueError(
+                f"Cannot create row sparse gradient, rows {rows.shape[1:]} do not match {dim}"
+            )
+        self._indices = indices
+        self._rows = rows
+        self._dim = tuple(dim)
+
+    @property
+    def indices(self) -> ndarray:
+        return self._indices
+
+    @property
+    def rows(self) -> ndarray:
+        return self._rows
+
+    @property
+    def dim(self) -> dim:
+        return self._dim
+
+    @property
+    def dtype(self) -> Any:
+        return self._rows.dtype
+
+    @property
+    def nnz(self) -> int:
+        return len(self._indices)
+
+    @property
+    def data(self) -> ndarray:
+        return self.dense()
+
+    def dense(self) -> ndarray:
+        arr = np.zeros(self.dim, self.dtype)
+        arr[self.indices] = self.rows
+        return arr
+
+    def scatter(self, arr: ndarray) -> ndarray:
+        arr[self.indices] += self.rows
+        return arr
+
+    def add(self, other: "RowSparse") -> "RowSparse":
+        if self.dim != other.dim:
+            raise ValueError(
+                f"Cannot add row sparse gradients, dimensions do not match ({self.dim} != {other.dim})"
+            )
+        indices, rows = coalesce(
+            np.concatenate((self.indices, other.indices)),
+            np.concatenate((self.rows, other.rows)),
+        )
+        return RowSparse(indices, rows, self.dim)
+
+    def __repr__(self) -> str:
+        dim, nnz = self.dim, self.nnz
+        return f"{self.__class__.__name__}({dim=} {nnz=})"
+
+
+def coalesce(indices: ndarray, rows: ndarray) -> Tuple[ndarray, ndarray]:
+    if not len(indices):
+        return indices.astype(np.int64), rows
+    order = np.argsort(indices, kind="stable")
+    indices = indices[order]
+    starts = np.flatnonzero(
+        np.concatenate(([True], indices[1:] != indices[:-1]))
+    )
+    return indices[starts].astype(np.int64), np.add.reduceat(
+        rows[order], starts, axis=0
+    )
@@ -0,0 +1,83 @@
+import numpy as np
+from numpy import ndarray
+from nura.types import dim
+from typing import Any, Tuple
+
+
+class Slab:
+
+    def __init__(
+        self, arr: ndarray, dim: dim, heads: int, start: int, stop: int
+    ) -> None:
+        width = stop - start
+        if heads <= 0 or width % heads:
+            raise ValueError(
+                f"Cannot create slab gradient, {width} features do not split into {heads} heads"
+            )
+        expected = tuple(dim[:-2]) + (heads, dim[-2], width // heads)
+        if arr.shape != expected:
+            raise ValueError(
+                f"Cannot create slab gradient, expected {expected} but received {arr.shape}"
+            )
+        self._arr = arr
+        self._dim = tuple(dim)
+        self._heads = heads
+        self._start = start
+        self._stop = stop
+
+    @property
+    def arr(self) -> ndarray:
+        return self._arr
+
+    @property
+    def dim(self) -> dim:
+        return self._dim
+
+    @property
+    def heads(self) -> int:
+        return self._heads
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._stop
+
+    @property
+    def dtype(self) -> Any:
+        return self._arr.dtype
+
+    @property
+    def data(self) -> ndarray:
+        return self.dense()
+
+    def region(self, arr: ndarray) -> ndarray:
+        arr = arr[..., self._start : self._stop]
+        return arr.reshape(arr.shape[:-1] + (self.heads, -1)).swapaxes(-2, -3)
+
+    def dense(self) -> ndarray:
+        return self.write(np.zeros(self.dim, self.dtype))
+
+    def write(self, arr: ndarray) -> ndarray:
+        np.copyto(self.region(arr), self.arr)
+        return arr
+
+    def scatter(self, arr: ndarray) -> ndarray:
+        region = self.region(arr)
+        np.add(region, self.arr, out=region)
+        return arr
+
+    def overlaps(self, spans: Tuple[Tuple[int, int], ...]) -> bool:
+        return any(a < self._stop and self._start < b for a, b in spans)
+
+    def __repr__(self) -> str:
+        dim, heads, span = self.dim, self.heads, self.span
+        return f"{self.__class__.__name__}({dim=} {heads=} {span=})"
+
+
+def fillgaps(arr: ndarray, spans: Tuple[Tuple[int, int], ...]) -> ndarray:
+    last = 0
+    for start, stop in sorted(spans):
+        if start > last:
+            arr[..., last:start] = 0
+        last = max(last, stop)
+    arr[..., last:] = 0
+    return arr
@@ -0,0 +1,83 @@
+import numpy as np
+from nura.tensors import Tensor
+from numpy import ndarray
+from typing import Optional, Tuple, Union
+
+
+class Sparsity:
+
+    def __init__(self, pattern: Union[Tensor, ndarray]) -> None:
+        mask = (
+            pattern.data if isinstance(pattern, Tensor) else np.asarray(pattern)
+        )
+        if mask.ndim != 2:
+            raise ValueError(
+                f"Cannot create sparsity, pattern must be 2D (output elements, input elements) ({mask.ndim=})"
+            )
+        self._mask = mask.astype(bool)
+        self._rows, self._cols = np.nonzero(self._mask)
+        self._colors: Optional[ndarray] = None
+        self._rowcolors: Optional[ndarray] = None
+
+    @property
+    def mask(self) -> ndarray:
+        return self._mask
+
+    @property
+    def dim(self) -> Tuple[int, int]:
+        return self._mask.shape
+
+    @property
+    def nnz(self) -> int:
+        return len(self._rows)
+
+    @property
+    def rows(self) -> ndarray:
+        return self._rows
+
+    @property
+    def cols(self) -> ndarray:
+        return self._cols
+
+    @property
+    def colors(self) -> ndarray:
+        if self._colors is None:
+            self._colors = _color(self._cols, self._rows, self.dim[1])
+        return self._colors
+
+    @property
+    def rowcolors(self) -> ndarray:
+        if self._rowcolors is None:
+            self._rowcolors = _color(self._rows, self._cols, self.dim[0])
+        return self._rowcolors
+
+    def mode(self) -> str:
+        ncolors = self.colors.max(initial=-1)
+        nrowcolors = self.rowcolors.max(initial=-1)
+        return "fwd" if ncolors <= nrowcolors else "rev"
+
+    def __repr__(self) -> str:
+        dim, nnz = self.dim, self.nnz
+        return f"{self.__class__.__name__}({dim=} {nnz=})"
+
+
+def _color(index: ndarray, other: ndarray, size: int) -> ndarray:
+    order = np.argsort(index, kind="stable")
+    index, other = index[order], other[order]
+    count = np.bincount(index, minlength=size)
+    ptr = np.concatenate(([0], np.cumsum(count)))
+    nother = other.max(initial=-1) + 1
+    used = np.zeros((nother, 8), dtype=bool)
+    colors = np.zeros(size, dtype=np.int64)
+    for i in np.argsort(-count, kind="stable"):
+        neighbours = other[ptr[i] : ptr[i + 1]]
+        taken = used[neighbours].any(axis=0)
+        free = np.flatnonzero(~taken)
+        if not len(free):
+            used = np.concatenate((used, np.zeros_like(used)), axis=1)
+            color = len(taken)
+        else:
+            color = free[0]
+        colors[i] = color
+        used[neighbours, color] = True
+    return colors
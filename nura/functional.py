@@ -1,3 +1,4 @@
+import numpy as np
 import nura.functions as functions
 from nura.tensors import Tensor, tensor
 from nura.types import Tensorlike, Scalar, dimlike, dim
@@ -289,3 +290,16 @@ def concat(a: Tensor, b: Tensor, dim: int = 0) -> Tensor:
             "Cannot concatenate Tensors, they differ for more than one dimension"
         )
     return functions.Concat.apply(a, b, dim)
+
+
+def maskedfill(a: Tensor, mask: Union[Tensor, Tensorlike], value: Scalar) -> Tensor:
+    mask = mask.data if isinstance(mask, Tensor) else np.asarray(mask)
+    if mask.dtype != np.bool_:
+        raise ValueError(
+            f"Cannot fill Tensor, mask must be boolean, received {mask.dtype}"
+        )
+    if np.broadcast_shapes(a.dim, mask.shape) != a.dim:
+        raise ValueError(
+            f"Cannot fill Tensor, mask {mask.shape} does not broadcast to {a.dim}"
+        )
+    return functions.MaskedFill.apply(a, mask, value)
@@ -1,6 +1,7 @@
 import numpy as np
 from .tensors import Tensor
 from .autograd.function import Context, Function
+from .autograd.pool import empty, zeros
 from nura.types import dim, dimlike
 from typing import Any, Tuple, Union, Optional
 
@@ -8,6 +9,9 @@ np._set_promotion_state("weak")
 
 
 class Add(Function):
+    batched = True
+    linear = True
+    ufunc = np.add
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor):
@@ -17,15 +21,26 @@ class Add(Function):
 
     @staticmethod
     def backward(context: Context, grad: Tensor):
-        return grad.data.copy(), grad.data.copy()
+        a, b = context.tensors()
+        arr0 = grad.data.copy() if a.usegrad else None
+        arr1 = grad.data.copy() if b.usegrad else None
+        return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
+        a, b = context.tensors()
+        if agrad is None:
+            return _broadcast(bgrad.data, a.data)
+        if bgrad is None:
+            return _broadcast(agrad.data, b.data)
         arr = agrad.data + bgrad.data
         return arr
 
 
 class Sub(Function):
+    batched = True
+    linear = True
+    ufunc = np.subtract
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor):
@@ -35,15 +50,25 @@ class Sub(Function):
 
     @staticmethod
     def backward(context: Any, grad: Tensor):
-        return grad.data.copy(), np.negative(grad.data)
+        a, b = context.tensors()
+        arr0 = grad.data.copy() if a.usegrad else None
+        arr1 = np.negative(grad.data) if b.usegrad else None
+        return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
+        a, b = context.tensors()
+        if agrad is None:
+            return np.negative(_broadcast(bgrad.data, a.data))
+        if bgrad is None:
+            return _broadcast(agrad.data, b.data)
         arr = agrad.data + np.negative(bgrad.data)
         return arr
 
 
 class Mul(Function):
+    batched = True
+    ufunc = np.multiply
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor):
@@ -54,18 +79,32 @@ class Mul(Function):
     @staticmethod
     def backward(context: Context, grad: Tensor):
         a, b = context.tensors()
-        arr0 = b.data * grad.data
-        arr1 = a.data * grad.data
+        arr0 = b.data * grad.data if a.usegrad else None
+        arr1 = a.data * grad.data if b.usegrad else None
         return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
         a, b = context.tensors()
-        arr = agrad.data * b.data + bgrad.data * a.data
-        return arr
+        arr0 = agrad.data * b.data if agrad is not None else None
+        arr1 = bgrad.data * a.data if bgrad is not None else None
+        return _addterms(arr0, arr1)
+
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        bgrad: Optional[Tensor],
+    ):
+        arr0 = bgrad.data * grad.data if bgrad is not None else None
+        arr1 = agrad.data * grad.data if agrad is not None else None
+        return arr0, arr1
 
 
 class Div(Function):
+    batched = True
+    ufunc = np.divide
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor):
@@ -76,17 +115,37 @@ class Div(Function):
     @staticmethod
     def backward(context: Context, grad: Tensor):
         a, b = context.tensors()
-        arr0 = grad.data * (1 / b.data)
-        arr1 = np.negative(a.data) * (1 / np.square(b.data)) * grad.data
+        arr0 = grad.data * (1 / b.data) if a.usegrad else None
+        arr1 = None
+        if b.usegrad:
+            arr1 = np.negative(a.data) * (1 / np.square(b.data)) * grad.data
         return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
         a, b = context.tensors()
-        arr0 = agrad.data * (1 / b.data)
-        arr1 = a.data * np.negative(1 / np.square(b.data)) * bgrad.data
-        arr = arr0 + arr1
-        return arr
+        arr0 = agrad.data * (1 / b.data) if agrad is not None else None
+        arr1 = None
+        if bgrad is not None:
+            arr1 = a.data * np.negative(1 / np.square(b.data)) * bgrad.data
+        return _addterms(arr0, arr1)
+
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        bgrad: Optional[Tensor],
+    ):
+        a, b = context.tensors()
+        inv = 1 / np.square(b.data)
+        if bgrad is None:
+            return None, np.negative(agrad.data) * inv * grad.data
+        arr0 = np.negative(grad.data) * bgrad.data * inv
+        arr1 = 2 * a.data * bgrad.data * (1 / b.data)
+        if agrad is not None:
+            arr1 = arr1 - agrad.data
+        return arr0, arr1 * inv * grad.data
 
 
 class Floordiv(Function):
@@ -116,20 +175,31 @@ class Dot(Function):
     @staticmethod
     def backward(context: Context, grad: Tensor):
         a, b = context.tensors()
-        arr0 = b.data * grad.data
-        arr1 = a.data * grad.data
+        arr0 = b.data * grad.data if a.usegrad else None
+        arr1 = a.data * grad.data if b.usegrad else None
         return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
         a, b = context.tensors()
-        arr0 = np.dot(agrad.data, b.data)
-        arr1 = np.dot(a.data, bgrad.data)
-        arr = arr0 + arr1
-        return arr
+        arr0 = np.dot(agrad.data, b.data) if agrad is not None else None
+        arr1 = np.dot(a.data, bgrad.data) if bgrad is not None else None
+        return _addterms(arr0, arr1)
+
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        bgrad: Optional[Tensor],
+    ):
+        arr0 = bgrad.data * grad.data if bgrad is not None else None
+        arr1 = agrad.data * grad.data if agrad is not None else None
+        return arr0, arr1
 
 
 class Matmul(Function):
+    batched = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor):
@@ -139,29 +209,61 @@ class Matmul(Function):
     @staticmethod
     def backward(context: Context, grad: Tensor):
         a, b = context.tensors()
+        arr0 = arr1 = None
         if a.ndim == 1:
-            axis = tuple(range(b.ndim - 2)) + (b.ndim - 1,)
-            arr0 = (b.data * np.expand_dims(grad.data, -2)).sum(axis=axis)
-            arr1 = np.einsum("...jl,k->...jkl", grad.data, a.data)
+            if a.usegrad:
+                axis = tuple(range(1 - b.ndim, -1))
+                arr0 = np.matmul(b.data, np.expand_dims(grad.data, -1))[..., 0]
+                arr0 = arr0.sum(axis=axis)
+            if b.usegrad:
+                arr1 = np.expand_dims(a.data, -1) * np.expand_dims(grad.data, -2)
         elif b.ndim == 1:
-            axis = tuple(range(a.ndim - 1))
-            arr0 = np.einsum("...,l->...l", grad.data, b.data)
-            arr1 = (a.data * np.expand_dims(grad.data, -1)).sum(axis=axis)
+            if a.usegrad:
+                arr0 = np.expand_dims(grad.data, -1) * b.data
+            if b.usegrad:
+                axis = tuple(range(1 - a.ndim, -1))
+                arr1 = np.matmul(np.expand_dims(grad.data, -2), a.data)[..., 0, :]
+                arr1 = arr1.sum(axis=axis)
         else:
-            arr1 = np.matmul(a.data.swapaxes(-2, -1), grad.data)
-            arr0 = np.matmul(grad.data, b.data.swapaxes(-2, -1))
+            if b.usegrad:
+                arr1 = np.matmul(a.data.swapaxes(-2, -1), grad.data)
+            if a.usegrad:
+                arr0 = np.matmul(grad.data, b.data.swapaxes(-2, -1))
         return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
         a, b = context.tensors()
-        arr0 = np.matmul(agrad.data, b.data)
-        arr1 = np.matmul(a.data, bgrad.data)
-        arr = arr0 + arr1
-        return arr
+        arr0 = arr1 = None
+        if agrad is not None:
+            arr0 = np.matmul(agrad.data, b.data)
+        if bgrad is not None and b.ndim == 1 and bgrad.ndim > 1:
+            arr1 = np.matmul(a.data, np.expand_dims(bgrad.data, -1))[..., 0]
+        elif bgrad is not None:
+            arr1 = np.matmul(a.data, bgrad.data)
+        return _addterms(arr0, arr1)
+
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        bgrad: Optional[Tensor],
+    ):
+        a, b = context.tensors()
+        adata = agrad.data if agrad is not None else a.data
+        bdata = bgrad.data if bgrad is not None else b.data
+        tangents = Context()
+        tangents.save(
+            Tensor(adata, a.usegrad and bgrad is not None, None, None, True),
+            Tensor(bdata, b.usegrad and agrad is not None, None, None, True),
+        )
+        return Matmul.backward(tangents, grad)
 
 
 class Pow(Function):
+    batched = True
+    ufunc = np.power
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor):
@@ -174,20 +276,49 @@ class Pow(Function):
     def backward(context: Context, grad: Tensor):
         a, b = context.tensors()
         arr = context.arr
-        arr0 = b.data * np.power(a.data, b.data - 1) * grad.data
-        arr1 = arr * np.log(a.data) * grad.data
+        arr0 = arr1 = None
+        if a.usegrad:
+            arr0 = b.data * np.power(a.data, b.data - 1) * grad.data
+        if b.usegrad:
+            arr1 = arr * np.log(a.data) * grad.data
         return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
+        a, b = context.tensors()
+        arr = context.arr
+        arr0 = arr1 = None
+        if agrad is not None:
+            arr0 = b.data * np.power(a.data, b.data - 1) * agrad.data
+        if bgrad is not None:
+            log = np.log(np.where(a.data > 0, a.data, 1))
+            arr1 = log * arr * bgrad.data
+        return _addterms(arr0, arr1)
+
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        bgrad: Optional[Tensor],
+    ):
         a, b = context.tensors()
         arr = context.arr
-        arr0 = b.data * np.power(a.data, b.data - 1) * agrad.data
-        arr1 = np.log(a.data) * arr * bgrad.data
-        return arr0 + arr1
+        log = np.log(np.where(a.data > 0, a.data, 1))
+        dpow = np.power(a.data, b.data - 1)
+        arr0 = arr1 = None
+        if agrad is not None:
+            arr0 = b.data * (b.data - 1) * np.power(a.data, b.data - 2) * agrad.data
+            arr1 = agrad.data * dpow * (1 + b.data * log)
+        if bgrad is not None:
+            arr0 = _addterms(arr0, bgrad.data * dpow * (1 + b.data * log))
+            arr1 = _addterms(arr1, arr * np.square(log) * bgrad.data)
+        return arr0 * grad.data, arr1 * grad.data
 
 
 class Exp(Function):
+    batched = True
+    ufunc = np.exp
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -206,8 +337,15 @@ class Exp(Function):
         arr = context.arr
         return arr * grad.data
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, agrad: Tensor):
+        arr = context.arr
+        return arr * agrad.data * grad.data
+
 
 class Log(Function):
+    batched = True
+    ufunc = np.log
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -227,8 +365,16 @@ class Log(Function):
         arr = (1 / a.data) * grad.data
         return arr
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, agrad: Tensor):
+        a = context.tensors()[0]
+        arr = np.negative(grad.data) * agrad.data * (1 / np.square(a.data))
+        return arr
+
 
 class Sin(Function):
+    batched = True
+    ufunc = np.sin
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -248,8 +394,16 @@ class Sin(Function):
         arr = np.cos(a.data) * grad.data
         return arr
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, agrad: Tensor):
+        a = context.tensors()[0]
+        arr = np.negative(grad.data) * np.sin(a.data) * agrad.data
+        return arr
+
 
 class Cos(Function):
+    batched = True
+    ufunc = np.cos
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -269,8 +423,15 @@ class Cos(Function):
         arr = grad.data * np.negative(np.sin(a.data))
         return arr
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, agrad: Tensor):
+        a = context.tensors()[0]
+        arr = np.negative(grad.data) * np.cos(a.data) * agrad.data
+        return arr
+
 
 class Sum(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim: dimlike, keepdims: bool):
@@ -288,7 +449,9 @@ class Sum(Function):
         graddata = grad.data
         if not keepdims and a.data.shape != graddata.shape:
             graddata = np.expand_dims(graddata, axis=dim)
-        return graddata + np.zeros_like(a.data)
+        arr = empty(a.data.shape, np.result_type(graddata, a.data))
+        np.copyto(arr, graddata)
+        return arr
 
     @staticmethod
     def tangent(context: Context, grad: Tensor):
@@ -299,6 +462,7 @@ class Sum(Function):
 
 
 class Max(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim: dimlike, keepdims: bool):
@@ -321,7 +485,8 @@ class Max(Function):
         mask = a.data == arr
         if not keepdims and a.data.shape != graddata.shape:
             graddata = np.expand_dims(graddata, axis=dim)
-        return mask * (graddata + np.zeros_like(a.data))
+        arr = empty(a.data.shape, np.result_type(graddata, a.data))
+        return np.multiply(mask, graddata, out=arr)
 
     @staticmethod
     def tangent(context: Context, grad: Tensor):
@@ -335,6 +500,7 @@ class Max(Function):
 
 
 class Min(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim: dimlike, keepdims: bool):
@@ -357,7 +523,8 @@ class Min(Function):
         mask = a.data == arr
         if not keepdims and a.data.shape != graddata.shape:
             graddata = np.expand_dims(graddata, axis=dim)
-        return mask * (graddata + np.zeros_like(a.data))
+        arr = empty(a.data.shape, np.result_type(graddata, a.data))
+        return np.multiply(mask, graddata, out=arr)
 
     @staticmethod
     def tangent(context: Context, grad: Tensor):
@@ -371,6 +538,7 @@ class Min(Function):
 
 
 class Mean(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim: dimlike, keepdims: bool):
@@ -425,6 +593,7 @@ class Var(Function):
 
 
 class Squeeze(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim: Optional[dimlike]):
@@ -447,6 +616,7 @@ class Squeeze(Function):
 
 
 class Unsqueeze(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim: dimlike):
@@ -469,6 +639,7 @@ class Unsqueeze(Function):
 
 
 class Reshape(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, newdim: dim):
@@ -491,6 +662,7 @@ class Reshape(Function):
 
 
 class Transpose(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dim0: int, dim1: int):
@@ -516,6 +688,7 @@ class Transpose(Function):
 
 
 class Permute(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, dims: dim):
@@ -541,6 +714,9 @@ class Permute(Function):
 
 
 class Abs(Function):
+    batched = True
+    linear = True
+    ufunc = np.absolute
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -561,6 +737,8 @@ class Abs(Function):
 
 
 class Pos(Function):
+    batched = True
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -577,6 +755,9 @@ class Pos(Function):
 
 
 class Neg(Function):
+    batched = True
+    linear = True
+    ufunc = np.negative
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -595,6 +776,8 @@ class Neg(Function):
 
 
 class Clone(Function):
+    batched = True
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor):
@@ -612,6 +795,7 @@ class Clone(Function):
 
 
 class Slice(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, slice_: Union[Tuple[slice, ...], slice]):
@@ -624,9 +808,9 @@ class Slice(Function):
     def backward(context: Context, grad: Tensor):
         a = context.tensors()[0]
         slice_ = context.slice_
-        mask = np.zeros_like(a.data)
-        mask[slice_] = grad.data
-        return mask
+        arr = zeros(a.data.shape, a.data.dtype)
+        arr[slice_] = grad.data
+        return arr
 
     @staticmethod
     def tangent(context: Context, grad: Tensor):
@@ -636,6 +820,7 @@ class Slice(Function):
 
 
 class Flatten(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, start: int, end: int):
@@ -662,6 +847,7 @@ class Flatten(Function):
 
 
 class Concat(Function):
+    linear = True
 
     @staticmethod
     def forward(context: Context, a: Tensor, b: Tensor, dim: int):
@@ -675,9 +861,59 @@ class Concat(Function):
         dim = context.dim
         index = a.data.shape[dim]
         output = tuple(np.split(grad.data, (index, index), axis=dim))
-        return (output[0].copy(), output[-1].copy())
+        arr0 = output[0].copy() if a.usegrad else None
+        arr1 = output[-1].copy() if b.usegrad else None
+        return arr0, arr1
 
     @staticmethod
-    def tangent(context: Context, agrad: Tensor, bgrad: Tensor):
+    def tangent(context: Context, agrad: Optional[Tensor], bgrad: Optional[Tensor]):
+        a, b = context.tensors()
         dim = context.dim
-        return np.concatenate((agrad.data, bgrad.data), axis=dim)
+        arr0 = agrad.data if agrad is not None else _zeros(a.data, bgrad.data)
+        arr1 = bgrad.data if bgrad is not None else _zeros(b.data, agrad.data)
+        return np.concatenate((arr0, arr1), axis=dim)
+
+
+class MaskedFill(Function):
+    linear = True
+
+    @staticmethod
+    def forward(context: Context, a: Tensor, mask: np.ndarray, value: float):
+        context.save(a)
+        context.mask = mask
+        arr = a.data.copy()
+        np.copyto(arr, value, where=mask)
+        return arr
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        arr = empty(grad.data.shape, grad.data.dtype)
+        np.copyto(arr, grad.data)
+        np.copyto(arr, 0, where=context.mask)
+        return arr
+
+    @staticmethod
+    def tangent(context: Context, grad: Tensor):
+        arr = grad.data.copy()
+        np.copyto(arr, 0, where=context.mask)
+        return arr
+
+
+def _addterms(*arrs: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    terms = [arr for arr in arrs if arr is not None]
+    if not terms:
+        return None
+    arr = terms[0]
+    for term in terms[1:]:
+        arr = arr + term
+    return arr
+
+
+def _broadcast(arr: np.ndarray, other: np.ndarray) -> np.ndarray:
+    dim = np.broadcast_shapes(arr.shape, other.shape)
+    return np.broadcast_to(arr, dim).copy()
+
+
+def _zeros(arr: np.ndarray, tangent: np.ndarray) -> np.ndarray:
+    prefix = tangent.shape[: tangent.ndim - arr.ndim]
+    return np.zeros(prefix + arr.shape, dtype=tangent.dtype)
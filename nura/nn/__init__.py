@@ -2,3 +2,4 @@ from nura.nn.loss import *
 from nura.nn.modules import *
 from nura.nn.optimizers import *
 from nura.nn.parameter import Parameter, parameter
+from nura.nn.cache import KVCache
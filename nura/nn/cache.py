@@ -0,0 +1,104 @@
+import numpy as np
+import nura
+from nura.tensors import Tensor
+from numpy import ndarray
+from typing import Optional, Sequence, Tuple
+
+
+class KVCache:
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(
+                f"Cannot create cache, capacity must be positive ({capacity=})"
+            )
+        self._capacity = capacity
+        self._keys: Optional[ndarray] = None
+        self._values: Optional[ndarray] = None
+        self._lengths: Optional[ndarray] = None
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def lengths(self) -> Tuple[int, ...]:
+        if self._lengths is None:
+            return ()
+        return tuple(int(n) for n in self._lengths)
+
+    def append(
+        self, k: Tensor, v: Tensor, counts: Optional[Sequence[int]] = None
+    ) -> Tuple[Tensor, Tensor, Tensor]:
+        if k.ndim != 4 or v.ndim != 4 or k.dim[:3] != v.dim[:3]:
+            raise ValueError(
+                f"Cannot append to cache, keys and values must be (batch, heads, length, dim) ({k.dim=} {v.dim=})"
+            )
+        if nura.Autograd.reversemode() and (k.usegrad or v.usegrad):
+            raise RuntimeError(
+                "Cannot append to cache, the cache is inference-only and would drop gradients to keys and values (use nura.nograd() or nura.inference())"
+            )
+        batch, heads, length = k.dim[:3]
+        if self._keys is None:
+            self._keys = np.zeros(
+                (batch, heads, self.capacity, k.dim[-1]), k.data.dtype
+            )
+            self._values = np.zeros(
+                (batch, heads, self.capacity, v.dim[-1]), v.data.dtype
+            )
+            self._lengths = np.zeros(batch, dtype=np.int64)
+        assert self._values is not None and self._lengths is not None
+        if self._keys.shape[:2] != (batch, heads):
+            raise ValueError(
+                f"Cannot append to cache, expected {self._keys.shape[:2]} batch and heads but received {(batch, heads)}"
+            )
+        counts = (
+            np.full(batch, length, dtype=np.int64)
+            if counts is None
+            else np.asarray(counts, dtype=np.int64)
+        )
+        if counts.shape != (batch,) or np.any((counts < 0) | (counts > length)):
+            raise ValueError(
+                f"Cannot append to cache, counts must hold one value in [0, {length}] per sequence"
+            )
+        start = self._lengths
+        if np.any(start + length > self.capacity):
+            raise ValueError(
+                f"Cannot append to cache, capacity exceeded ({self.capacity=})"
+            )
+
+        if np.all(start == start[0]):
+            self._keys[:, :, start[0] : start[0] + length] = k.data
+            self._values[:, :, start[0] : start[0] + length] = v.data
+        else:
+            for b, s in enumerate(start):
+                self._keys[b, :, s : s + length] = k.data[b]
+                self._values[b, :, s : s + length] = v.data[b]
+        self._lengths = start + counts
+
+        stop = int((start + length).max())
+        limit = np.minimum(
+            start[:, None] + np.arange(1, length + 1), self._lengths[:, None]
+        )
+        mask = np.arange(stop) < limit[..., None]
+        keys = self._keys[:, :, :stop]
+        values = self._values[:, :, :stop]
+        return _wrap(keys), _wrap(values), _wrap(mask[:, None])
+
+    def clear(self) -> None:
+        self._keys = None
+        self._values = None
+        self._lengths = None
+
+    def __len__(self) -> int:
+        if self._lengths is None:
+            return 0
+        return int(self._lengths.max())
+
+    def __repr__(self) -> str:
+        capacity, lengths = self.capacity, self.lengths
+        return f"{self.__class__.__name__}({capacity=} {lengths=})"
+
+
+def _wrap(arr: ndarray) -> Tensor:
+    return Tensor(arr, False, None, None, True)
@@ -1,8 +1,9 @@
+import numpy as np
 import nura
 import nura.nn.functions as functions
-import nura.utils as utils
 from nura.types import dimlike
 from nura.tensors import Tensor
+from numpy import ndarray
 from typing import Optional, Tuple
 
 
@@ -58,6 +59,11 @@ def softmax(x: Tensor, dim: int = -1) -> Tensor:
     return out
 
 
+def logsoftmax(x: Tensor, dim: int = -1) -> Tensor:
+    out = functions.LogSoftmax.apply(x, dim)
+    return out
+
+
 def attention(
     q: Tensor,
     k: Tensor,
@@ -65,11 +71,15 @@ def attention(
     mask: Optional[Tensor] = None,
     maskfill: float = -1e9,
     drop: Optional[float] = None,
-) -> Tuple[Tensor, Tensor]:
+    weights: bool = True,
+    block: int = 512,
+) -> Tuple[Tensor, Optional[Tensor]]:
+    if not weights and drop is None:
+        return flashattention(q, k, v, mask, maskfill, block), None
     norm = 1 / (k.dim[-1] ** 0.5)
     simscore = nura.matmul(q, k.transpose(-1, -2)) * norm
     if mask is not None:
-        simscore = utils.where(mask, simscore, maskfill)
+        simscore = nura.maskedfill(simscore, np.logical_not(mask.data), maskfill)
     attn = softmax(simscore, -1)
     if drop is not None:
         attn = dropout(attn, drop)
@@ -77,8 +87,71 @@ def attention(
     return context, attn
 
 
-def embedding(x: Tensor, w: Tensor, padid: Optional[int] = None) -> Tensor:
-    return functions.Embedding.apply(x, w, padid)
+def flashattention(
+    q: Tensor,
+    k: Tensor,
+    v: Tensor,
+    mask: Optional[Tensor] = None,
+    maskfill: float = -1e9,
+    block: int = 512,
+) -> Tensor:
+    if block <= 0:
+        raise ValueError(f"Cannot compute attention, block must be positive ({block=})")
+    maskdata = mask.data if mask is not None else None
+    return functions.Attention.apply(q, k, v, maskdata, maskfill, block)
+
+
+def causalmask(tq: int, tk: Optional[int] = None) -> Tensor:
+    if tk is None:
+        tk = tq
+    if tq <= 0 or tk < tq:
+        raise ValueError(
+            f"Cannot create causal mask, require 0 < tq <= tk ({tq=} {tk=})"
+        )
+    global _causalmask
+    if _causalmask is None or len(_causalmask) < tk:
+        size = max(tk, 2 * len(_causalmask) if _causalmask is not None else 0)
+        _causalmask = np.tri(size, dtype=bool)
+        _causalmask.flags.writeable = False
+    return Tensor(_causalmask[tk - tq : tk, :tk], False, None, None, True)
+
+
+def splitheads(
+    x: Tensor, heads: int, start: int = 0, stop: Optional[int] = None
+) -> Tensor:
+    if stop is None:
+        stop = x.dim[-1]
+    if (stop - start) % heads:
+        raise ValueError(
+            f"Cannot split heads, {stop - start} features are not divisible by {heads} heads"
+        )
+    return functions.SplitHeads.apply(x, heads, start, stop)
+
+
+def pack(*tensors: Tensor) -> Tensor:
+    if not tensors or any(t.ndim < 1 for t in tensors):
+        raise ValueError(
+            "Cannot pack tensors, expected one or more non-scalar tensors"
+        )
+    if any(t.dim[1:] != tensors[0].dim[1:] for t in tensors):
+        raise ValueError(
+            "Cannot pack tensors, they differ beyond the first dimension"
+        )
+    return functions.Pack.apply(*tensors)
+
+
+def mergeheads(x: Tensor) -> Tensor:
+    if x.ndim < 3:
+        raise ValueError(
+            f"Cannot merge heads, 'x' must be at least 3D, received {x.ndim}D"
+        )
+    return functions.MergeHeads.apply(x)
+
+
+def embedding(
+    x: Tensor, w: Tensor, padid: Optional[int] = None, sparse: bool = False
+) -> Tensor:
+    return functions.Embedding.apply(x, w, padid, sparse)
 
 
 def binarycrossentropy(
@@ -104,6 +177,19 @@ def crossentropy(
     return functions.CrossEntropy.apply(x, y, ignoreid, reduction)
 
 
+def nllloss(
+    x: Tensor,
+    y: Tensor,
+    ignoreid: Optional[int] = None,
+    reduction: Optional[str] = "mean",
+) -> Tensor:
+    if x.ndim != 2:
+        raise ValueError(f"'x' must be 2D, recieved {x.ndim}D")
+    if y.ndim != 1:
+        raise ValueError(f"'y' must be 1D, received {y.ndim}D")
+    return functions.NLLLoss.apply(x, y, ignoreid, reduction)
+
+
 def mse(x: Tensor, y: Tensor, reduction: Optional[str] = "mean") -> Tensor:
     if x.ndim != y.ndim:
         raise ValueError(
@@ -180,3 +266,6 @@ def avgpool2d():
 
 def avgpool3d():
     raise NotImplementedError
+
+
+_causalmask: Optional[ndarray] = None
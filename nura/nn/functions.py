@@ -1,14 +1,18 @@
 import numpy as np
 from nura.types import dimlike
 from nura.autograd.function import Function, Context
+from nura.autograd.pool import empty, zeros
+from nura.autograd.rowsparse import RowSparse, coalesce
+from nura.autograd.slab import Slab
 from nura.tensors import Tensor
-from typing import Optional
-
+from numpy import ndarray
+from typing import Optional, Tuple
 
 np._set_promotion_state("weak")
 
 
 class Sigmoid(Function):
+    batched = True
 
     @staticmethod
     def forward(context: Context, x: Tensor):
@@ -27,8 +31,15 @@ class Sigmoid(Function):
         arr = context.arr
         return arr * (1 - arr) * grad.data
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        arr = context.arr
+        return arr * (1 - arr) * (1 - 2 * arr) * xgrad.data * grad.data
+
 
 class Tanh(Function):
+    batched = True
+    ufunc = np.tanh
 
     @staticmethod
     def forward(context: Context, x: Tensor):
@@ -47,6 +58,11 @@ class Tanh(Function):
         arr = context.arr
         return (1 - np.square(arr)) * grad.data
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        arr = context.arr
+        return -2 * arr * (1 - np.square(arr)) * xgrad.data * grad.data
+
 
 class Softmax(Function):
 
@@ -63,44 +79,26 @@ class Softmax(Function):
     def backward(context: Context, grad: Tensor):
         p = context.p
         dim = context.dim
-        outshape = p.shape
-
-        if p.ndim == 1:
-            diagonal = np.diagflat(p)
-            offdiagonal = np.outer(p, p)
-            gdata = grad.data
-            jac = diagonal - offdiagonal
-        else:
-            p = p.swapaxes(dim, -1).reshape(-1, p.shape[dim])
-            diagonal = np.einsum("ij,jk->ijk", p, np.eye(p.shape[dim]))
-            offdiagonal = np.einsum("ij,ik->ijk", p, p)
-            gdata = grad.data.reshape(-1, p.shape[dim], 1)
-
-        # TODO figure out backward method
-
-        jac = diagonal - offdiagonal
-        gout = np.matmul(jac, gdata)
-        return gout.reshape(outshape).swapaxes(dim, -1) if p.ndim > 1 else gout
+        arr = p * grad.data
+        arr -= p * np.sum(arr, axis=dim, keepdims=True)
+        return arr
 
     @staticmethod
     def tangent(context: Context, grad: Tensor):
         p = context.p
         dim = context.dim
-        outshape = p.shape
-
-        if p.ndim == 1:
-            diagonal = np.diagflat(p)
-            offdiagonal = np.outer(p, p)
-            gdata = grad.data
-        else:
-            p = p.reshape(-1, p.shape[dim])
-            diagonal = np.einsum("ij,jk->ijk", p, np.eye(p.shape[dim]))
-            offdiagonal = np.einsum("ij,ik->ijk", p, p)
-            gdata = grad.data.reshape(-1, p.shape[dim], 1)
+        arr = p * grad.data
+        arr -= p * np.sum(arr, axis=dim, keepdims=True)
+        return arr
 
-        jac = diagonal - offdiagonal
-        gout = np.matmul(jac, gdata)
-        return gout.reshape(outshape) if p.ndim > 1 else gout
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        p = context.p
+        dim = context.dim
+        pgrad = p * (xgrad.data - np.sum(p * xgrad.data, axis=dim, keepdims=True))
+        arr0 = pgrad * (grad.data - np.sum(p * grad.data, axis=dim, keepdims=True))
+        arr1 = p * np.sum(pgrad * grad.data, axis=dim, keepdims=True)
+        return arr0 - arr1
 
 
 class LogSoftmax(Function):
@@ -110,16 +108,35 @@ class LogSoftmax(Function):
         context.save(x)
         xmax = x.data.max(axis=dim, keepdims=True)
         logsum = np.log(np.exp(x.data - xmax).sum(axis=dim, keepdims=True))
-        nll = np.negative(x.data - xmax - logsum)
-        return nll
+        log = x.data - xmax - logsum
+        context.log = log
+        context.dim = dim
+        return log
 
     @staticmethod
     def backward(context: Context, grad: Tensor):
-        # TODO impl backward
-        raise NotImplementedError
+        log = context.log
+        dim = context.dim
+        return grad.data - np.exp(log) * np.sum(grad.data, axis=dim, keepdims=True)
+
+    @staticmethod
+    def tangent(context: Context, grad: Tensor):
+        log = context.log
+        dim = context.dim
+        return grad.data - np.sum(np.exp(log) * grad.data, axis=dim, keepdims=True)
+
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        log = context.log
+        dim = context.dim
+        p = np.exp(log)
+        pgrad = p * (xgrad.data - np.sum(p * xgrad.data, axis=dim, keepdims=True))
+        return np.negative(pgrad) * np.sum(grad.data, axis=dim, keepdims=True)
 
 
 class ReLU(Function):
+    batched = True
+    linear = True
 
     @staticmethod
     def forward(context: Context, x: Tensor):
@@ -142,6 +159,8 @@ class ReLU(Function):
 
 
 class ReLU6(Function):
+    batched = True
+    linear = True
 
     @staticmethod
     def forward(context: Context, x: Tensor):
@@ -172,6 +191,8 @@ class ReLU6(Function):
 
 
 class LeakyReLU(Function):
+    batched = True
+    linear = True
 
     @staticmethod
     def forward(context: Context, x: Tensor, alpha: float):
@@ -201,6 +222,7 @@ class LeakyReLU(Function):
 
 
 class ELU(Function):
+    batched = True
 
     @staticmethod
     def forward(context: Context, x: Tensor, alpha: float):
@@ -224,8 +246,17 @@ class ELU(Function):
         mask = np.where(x.data > 0, np.array(1, dtype=dtype), alpha * np.exp(x.data))
         return mask * grad.data
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        x = context.tensors()[0]
+        alpha = context.alpha
+        dtype = x.data.dtype
+        mask = np.where(x.data > 0, np.array(0, dtype=dtype), alpha * np.exp(x.data))
+        return mask * xgrad.data * grad.data
+
 
 class CELU(Function):
+    batched = True
 
     @staticmethod
     def forward(context: Context, x: Tensor, alpha: float):
@@ -255,8 +286,21 @@ class CELU(Function):
         )
         return mask * grad.data
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        x = context.tensors()[0]
+        alpha = context.alpha
+        dtype = x.data.dtype
+        mask = np.where(
+            x.data >= 0,
+            np.array(0, dtype=dtype),
+            np.exp(x.data * (1 / alpha)) * (1 / alpha),
+        )
+        return mask * xgrad.data * grad.data
+
 
 class GELU(Function):
+    batched = True
 
     @staticmethod
     def forward(context: Context, x: Tensor):
@@ -296,14 +340,213 @@ class GELU(Function):
         )
         return dgelu * grad.data
 
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        x = context.tensors()[0]
+        PICONST = 0.79788456
+        CONST = 0.044715
+        tanh = context.tanh
+        dtanh = 1 - np.square(tanh)
+        dinner = PICONST * (1 + 3 * CONST * np.square(x.data))
+        ddgelu = dtanh * dinner + 0.5 * x.data * dtanh * (
+            6 * PICONST * CONST * x.data - 2 * tanh * np.square(dinner)
+        )
+        return ddgelu * xgrad.data * grad.data
+
+
+class Attention(Function):
+
+    @staticmethod
+    def forward(
+        context: Context,
+        q: Tensor,
+        k: Tensor,
+        v: Tensor,
+        mask: Optional[ndarray],
+        maskfill: float,
+        block: int,
+    ):
+        context.save(q, k, v)
+        norm = 1 / (k.data.shape[-1] ** 0.5)
+        qdata, kdata, vdata = q.data, k.data, v.data
+        dim = np.broadcast_shapes(qdata.shape[:-1], kdata.shape[:-2] + (1,))
+        rowmax = np.full(dim, -np.inf, dtype=qdata.dtype)
+        rowsum = np.zeros(dim, dtype=qdata.dtype)
+        arr = np.zeros(dim + vdata.shape[-1:], dtype=qdata.dtype)
+
+        for start in range(0, kdata.shape[-2], block):
+            stop = min(start + block, kdata.shape[-2])
+            score = _score(qdata, kdata, mask, maskfill, norm, start, stop)
+            newmax = np.maximum(rowmax, score.max(axis=-1))
+            shift = np.where(np.isneginf(newmax), 0, newmax)
+            scale = np.exp(rowmax - shift)
+            score -= shift[..., None]
+            p = np.exp(score, out=score)
+            rowsum = rowsum * scale + p.sum(axis=-1)
+            arr = arr * scale[..., None] + np.matmul(p, vdata[..., start:stop, :])
+            rowmax = newmax
+
+        arr /= rowsum[..., None]
+        context.logsum = rowmax + np.log(rowsum)
+        context.out = arr
+        context.mask = mask
+        context.maskfill = maskfill
+        context.norm = norm
+        context.block = block
+        return arr
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        q, k, v = context.tensors()
+        qdata, kdata, vdata = q.data, k.data, v.data
+        mask, maskfill, norm = context.mask, context.maskfill, context.norm
+        logsum = context.logsum[..., None]
+        graddata = grad.data
+        delta = np.sum(graddata * context.out, axis=-1, keepdims=True)
+        qgrad = np.zeros(graddata.shape[:-1] + qdata.shape[-1:], dtype=qdata.dtype)
+        kgrads, vgrads = [], []
+
+        for start in range(0, kdata.shape[-2], context.block):
+            stop = min(start + context.block, kdata.shape[-2])
+            kblock, vblock = kdata[..., start:stop, :], vdata[..., start:stop, :]
+            score = _score(qdata, kdata, mask, maskfill, norm, start, stop)
+            score -= logsum
+            p = np.exp(score, out=score)
+            vgrads.append(np.matmul(p.swapaxes(-1, -2), graddata))
+            scoregrad = np.matmul(graddata, vblock.swapaxes(-1, -2))
+            scoregrad -= delta
+            scoregrad *= p
+            if mask is not None:
+                scoregrad *= _maskblock(mask, start, stop)
+            scoregrad *= norm
+            qgrad += np.matmul(scoregrad, kblock)
+            kgrads.append(np.matmul(scoregrad.swapaxes(-1, -2), qdata))
+
+        return qgrad, np.concatenate(kgrads, axis=-2), np.concatenate(vgrads, axis=-2)
+
+    @staticmethod
+    def tangent(
+        context: Context,
+        qgrad: Optional[Tensor],
+        kgrad: Optional[Tensor],
+        vgrad: Optional[Tensor],
+    ):
+        q, k, v = context.tensors()
+        qdata, kdata, vdata = q.data, k.data, v.data
+        mask, maskfill, norm = context.mask, context.maskfill, context.norm
+        logsum, out = context.logsum[..., None], context.out
+        arr = np.zeros_like(out)
+        rowdot = np.zeros_like(logsum)
+
+        for start in range(0, kdata.shape[-2], context.block):
+            stop = min(start + context.block, kdata.shape[-2])
+            score = _score(qdata, kdata, mask, maskfill, norm, start, stop)
+            score -= logsum
+            p = np.exp(score, out=score)
+            if vgrad is not None:
+                arr += np.matmul(p, vgrad.data[..., start:stop, :])
+            if qgrad is None and kgrad is None:
+                continue
+            scoregrad = np.zeros_like(p)
+            if qgrad is not None:
+                kblock = kdata[..., start:stop, :]
+                scoregrad += np.matmul(qgrad.data, kblock.swapaxes(-1, -2))
+            if kgrad is not None:
+                kblock = kgrad.data[..., start:stop, :]
+                scoregrad += np.matmul(qdata, kblock.swapaxes(-1, -2))
+            if mask is not None:
+                scoregrad *= _maskblock(mask, start, stop)
+            scoregrad *= norm
+            scoregrad *= p
+            arr += np.matmul(scoregrad, vdata[..., start:stop, :])
+            rowdot += scoregrad.sum(axis=-1, keepdims=True)
+
+        arr -= out * rowdot
+        return arr
+
+
+class SplitHeads(Function):
+    linear = True
+
+    @staticmethod
+    def forward(context: Context, x: Tensor, heads: int, start: int, stop: int):
+        context.save(x)
+        context.heads = heads
+        context.start = start
+        context.stop = stop
+        return _splitheads(x.data, heads, start, stop)
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        x = context.tensors()[0]
+        heads, start, stop = context.heads, context.start, context.stop
+        return Slab(grad.data, x.data.shape, heads, start, stop)
+
+    @staticmethod
+    def tangent(context: Context, grad: Tensor):
+        heads, start, stop = context.heads, context.start, context.stop
+        return _splitheads(grad.data, heads, start, stop).copy()
+
+
+class Pack(Function):
+    linear = True
+
+    @staticmethod
+    def forward(context: Context, *tensors: Tensor):
+        context.save(*tensors)
+        return _pack(tuple(t.data for t in tensors))
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        tensors = context.tensors()
+        stops = np.cumsum([len(t.data) for t in tensors[:-1]])
+        return tuple(
+            arr if t.usegrad else None
+            for t, arr in zip(tensors, np.split(grad.data, stops))
+        )
+
+    @staticmethod
+    def tangent(context: Context, *grads: Optional[Tensor]):
+        tensors = context.tensors()
+        dtype = next(g.data.dtype for g in grads if g is not None)
+        return np.concatenate(
+            tuple(
+                g.data if g is not None else np.zeros(t.data.shape, dtype)
+                for t, g in zip(tensors, grads)
+            )
+        )
+
+
+class MergeHeads(Function):
+    linear = True
+
+    @staticmethod
+    def forward(context: Context, x: Tensor):
+        context.save(x)
+        return _mergeheads(x.data)
+
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        x = context.tensors()[0]
+        heads = x.data.shape[-3]
+        return _splitheads(grad.data, heads, 0, grad.data.shape[-1])
+
+    @staticmethod
+    def tangent(context: Context, grad: Tensor):
+        return _mergeheads(grad.data)
+
 
 class Embedding(Function):
+    linear = True
 
     @staticmethod
-    def forward(context: Context, x: Tensor, w: Tensor, padid: Optional[int]):
+    def forward(
+        context: Context, x: Tensor, w: Tensor, padid: Optional[int], sparse: bool
+    ):
         context.save(w)
         context.xdata = x.data
         context.padid = padid
+        context.sparse = sparse
         mask = x.data != padid
         mask = np.expand_dims(mask, -1)
         return w.data[x.data] * mask
@@ -314,10 +557,12 @@ class Embedding(Function):
         xdata = context.xdata
         padid = context.padid
 
-        arr = np.zeros_like(w.data)
         mask = xdata != padid
-        indices = xdata[mask]
-        np.add.at(arr, indices, grad.data[mask])
+        indices, rows = coalesce(xdata[mask], grad.data[mask])
+        if context.sparse:
+            return RowSparse(indices, rows, w.data.shape)
+        arr = zeros(w.data.shape, w.data.dtype)
+        arr[indices] = rows
         return arr
 
 
@@ -350,17 +595,85 @@ class CrossEntropy(Function):
         labels = context.labels
         reduction = context.reduction
 
-        a = np.exp(log)
+        arr = np.exp(log)
         mask = labels != ignoreid
-        ignore = np.invert(mask)
-        classes = labels[mask]
-        a[mask, classes] -= 1
-        a[ignore] = 0
+        arr[mask, labels[mask]] -= 1
+        arr *= _weights(mask, grad.data, reduction)
+        return arr
+
+    @staticmethod
+    def tangent(context: Context, xgrad: Tensor):
+        log = context.log
+        ignoreid = context.ignoreid
+        labels = context.labels
+        reduction = context.reduction
 
+        mask = labels != ignoreid
+        arr = np.sum(np.exp(log) * xgrad.data, axis=-1)
+        arr[..., mask] -= xgrad.data[..., mask, labels[mask]]
+        arr = arr[..., mask]
+        if reduction == "mean":
+            return arr.mean(axis=-1)
+        return arr.sum(axis=-1) if reduction == "sum" else arr
+
+    @staticmethod
+    def backtangent(context: Context, grad: Tensor, xgrad: Tensor):
+        log = context.log
+        ignoreid = context.ignoreid
+        labels = context.labels
+        reduction = context.reduction
+
+        p = np.exp(log)
+        mask = labels != ignoreid
+        arr = p * (xgrad.data - np.sum(p * xgrad.data, axis=-1, keepdims=True))
+        arr *= _weights(mask, grad.data, reduction)
+        return arr
+
+
+class NLLLoss(Function):
+    linear = True
+
+    @staticmethod
+    def forward(
+        context: Context, x: Tensor, y: Tensor, ignoreid: int, reduction: Optional[str]
+    ):
+        context.save(x)
+        context.ignoreid = ignoreid
+        context.labels = y.data
+        context.reduction = reduction
+        mask = y.data != ignoreid
+        nll = np.negative(x.data[mask, y.data[mask]])
         return (
-            (1 / labels.size) * a * grad.data if reduction == "mean" else a * grad.data
+            nll.mean()
+            if reduction == "mean"
+            else nll.sum() if reduction == "sum" else nll
         )
 
+    @staticmethod
+    def backward(context: Context, grad: Tensor):
+        x = context.tensors()[0]
+        ignoreid = context.ignoreid
+        labels = context.labels
+        reduction = context.reduction
+
+        mask = labels != ignoreid
+        arr = zeros(x.data.shape, x.data.dtype)
+        arr[mask, labels[mask]] = -1
+        arr *= _weights(mask, grad.data, reduction)
+        return arr
+
+    @staticmethod
+    def tangent(context: Context, xgrad: Tensor):
+        ignoreid = context.ignoreid
+        labels = context.labels
+        reduction = context.reduction
+
+        mask = labels != ignoreid
+        arr = np.negative(xgrad.data[..., mask, labels[mask]])
+        if reduction == "mean":
+            return arr.mean(axis=-1)
+        return arr.sum(axis=-1) if reduction == "sum" else arr
+
 
 class BinaryCrossEntropy(Function):
 
@@ -386,6 +699,29 @@ class BinaryCrossEntropy(Function):
             else arr * grad.data
         )
 
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        ygrad: Optional[Tensor],
+    ):
+        a, y = context.tensors()
+        reduction = context.reduction
+        arr = 0
+        if agrad is not None:
+            arr0 = y.data * (1 / np.square(a.data))
+            arr0 = arr0 + (1 - y.data) * (1 / np.square(1 - a.data))
+            arr = arr0 * agrad.data
+        if ygrad is not None:
+            arr1 = np.negative(1 / a.data) - 1 / (1 - a.data)
+            arr = arr + arr1 * ygrad.data
+        return (
+            (1 / y.data.size) * arr * grad.data
+            if reduction == "mean"
+            else arr * grad.data
+        )
+
 
 class MSE(Function):
 
@@ -410,8 +746,31 @@ class MSE(Function):
             else (a.data - y.data) * grad.data
         )
 
+    @staticmethod
+    def backtangent(
+        context: Context,
+        grad: Tensor,
+        agrad: Optional[Tensor],
+        ygrad: Optional[Tensor],
+    ):
+        y = context.tensors()[1]
+        reduction = context.reduction
+        if ygrad is None:
+            arr = agrad.data
+        elif agrad is None:
+            arr = np.negative(ygrad.data)
+        else:
+            arr = agrad.data - ygrad.data
+        return (
+            (1 / y.data.size) * arr * grad.data
+            if reduction == "mean"
+            else arr * grad.data
+        )
+
 
 class Dropout(Function):
+    linear = True
+    deterministic = False
 
     @staticmethod
     def forward(context: Context, x: Tensor, p: float):
@@ -539,3 +898,61 @@ class BatchNorm(Function):
         dx = dx0 + dx1 + dx2
 
         return dx, dgamma, dbeta
+
+
+def _weights(mask: ndarray, grad: ndarray, reduction: Optional[str]) -> ndarray:
+    weights = np.zeros(mask.shape + (1,), dtype=grad.dtype)
+    if reduction is None:
+        weights[mask, 0] = grad
+    else:
+        scale = 1 / max(mask.sum(), 1) if reduction == "mean" else 1
+        weights[mask] = grad * scale
+    return weights
+
+
+def _maskblock(mask: ndarray, start: int, stop: int) -> ndarray:
+    return mask if mask.shape[-1] == 1 else mask[..., start:stop]
+
+
+def _score(
+    q: ndarray,
+    k: ndarray,
+    mask: Optional[ndarray],
+    maskfill: float,
+    norm: float,
+    start: int,
+    stop: int,
+) -> ndarray:
+    score = np.matmul(q, k[..., start:stop, :].swapaxes(-1, -2))
+    score *= norm
+    if mask is not None:
+        np.copyto(score, maskfill, where=np.logical_not(_maskblock(mask, start, stop)))
+    return score
+
+
+def _splitheads(arr: ndarray, heads: int, start: int, stop: int) -> ndarray:
+    arr = arr[..., start:stop]
+    return arr.reshape(arr.shape[:-1] + (heads, -1)).swapaxes(-2, -3)
+
+
+def _pack(arrs: Tuple[ndarray, ...]) -> ndarray:
+    base = arrs[0].base
+    if (
+        base is None
+        or not base.flags.c_contiguous
+        or base.shape[1:] != arrs[0].shape[1:]
+        or not all(a.base is base and a.flags.c_contiguous for a in arrs)
+    ):
+        return np.concatenate(arrs)
+    start = (arrs[0].ctypes.data - base.ctypes.data) // max(base.strides[0], 1)
+    stop = start
+    for a in arrs:
+        if a.ctypes.data != base.ctypes.data + stop * base.strides[0]:
+            return np.concatenate(arrs)
+        stop += len(a)
+    return base[start:stop]
+
+
+def _mergeheads(arr: ndarray) -> ndarray:
+    arr = arr.swapaxes(-2, -3)
+    return arr.reshape(arr.shape[:-2] + (-1,))
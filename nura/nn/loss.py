@@ -47,6 +47,26 @@ class CrossEntropy(Loss):
         return f"{self.name()}({ignoreid=} {reduction=})"
 
 
+class NLLLoss(Loss):
+
+    def __init__(
+        self, ignoreid: Optional[int] = None, reduction: Optional[str] = "mean"
+    ):
+        super().__init__(reduction)
+        self._ignoreid = ignoreid
+
+    @property
+    def ignoreid(self) -> Optional[int]:
+        return self._ignoreid
+
+    def forward(self, x: Tensor, y: Tensor) -> Tensor:
+        return f.nllloss(x, y, ignoreid=self.ignoreid, reduction=self.reduction)
+
+    def __repr__(self) -> str:
+        ignoreid, reduction = self.ignoreid, self.reduction
+        return f"{self.name()}({ignoreid=} {reduction=})"
+
+
 class BinaryCrossEntropy(Loss):
 
     def __init__(self, reduction: Optional[str] = "mean"):
@@ -6,3 +6,4 @@ from .multihead import MultiHeadAttention
 from .dropout import Dropout
 from .layernorm import LayerNorm
 from .batchnorm import BatchNorm
+from .checkpoint import Checkpoint
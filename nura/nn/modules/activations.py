@@ -1,7 +1,9 @@
 import nura.nn.functional as f
+import nura.utils as utils
 from nura.nn.modules.module import Module
+from nura.nn.cache import KVCache
 from nura.tensors import Tensor
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
 
 class ReLU(Module):
@@ -112,6 +114,24 @@ class Softmax(Module):
         return f"{self.name()}({dim=})"
 
 
+class LogSoftmax(Module):
+
+    def __init__(self, dim: int = -1) -> None:
+        super().__init__()
+        self._dim = dim
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def forward(self, a: Tensor) -> Tensor:
+        return f.logsoftmax(a, self.dim)
+
+    def xrepr(self) -> str:
+        dim = self.dim
+        return f"{self.name()}({dim=})"
+
+
 class Tanh(Module):
 
     def __init__(self) -> None:
@@ -124,11 +144,17 @@ class Tanh(Module):
 class ScaledDotProductAttention(Module):
 
     def __init__(
-        self, maskfill: float = -1e-9, dropout: Optional[float] = None
+        self,
+        maskfill: float = -1e9,
+        dropout: Optional[float] = None,
+        weights: bool = True,
+        block: int = 512,
     ) -> None:
         super().__init__()
         self._maskfill = maskfill
         self._dropout = dropout
+        self._weights = weights
+        self._block = block
 
     @property
     def maskfill(self) -> float:
@@ -138,11 +164,51 @@ class ScaledDotProductAttention(Module):
     def dropout(self) -> Optional[float]:
         return self._dropout
 
+    @property
+    def weights(self) -> bool:
+        return self._weights
+
+    @property
+    def block(self) -> int:
+        return self._block
+
     def forward(
-        self, q: Tensor, k: Tensor, v: Tensor, mask: Optional[Tensor] = None
-    ) -> Tuple[Tensor, Tensor]:
-        return f.attention(q, k, v, mask, self.maskfill, self.dropout)
+        self,
+        q: Tensor,
+        k: Tensor,
+        v: Tensor,
+        mask: Optional[Tensor] = None,
+        cache: Optional[KVCache] = None,
+        counts: Optional[Sequence[int]] = None,
+    ) -> Tuple[Tensor, Optional[Tensor]]:
+        if counts is not None and cache is None:
+            raise ValueError(
+                "Cannot compute attention, counts requires a cache"
+            )
+        if cache is not None:
+            k, v, cachemask = cache.append(k, v, counts)
+            mask = (
+                cachemask if mask is None else utils.tensorand(mask, cachemask)
+            )
+        return f.attention(
+            q, k, v, mask, self.maskfill, self.dropout, self.weights, self.block
+        )
 
     def xrepr(self) -> str:
-        maskfill, dropout = self.maskfill, self.dropout
-        return f"{self.name()}({maskfill=:.1e} {dropout=})"
+        maskfill, dropout, weights = self.maskfill, self.dropout, self.weights
+        return f"{self.name()}({maskfill=:.1e} {dropout=} {weights=})"
+
+
+__all__ = [
+    "ReLU",
+    "ReLU6",
+    "LeakyReLU",
+    "ELU",
+    "GELU",
+    "CELU",
+    "Sigmoid",
+    "Softmax",
+    "LogSoftmax",
+    "Tanh",
+    "ScaledDotProductAttention",
+]
@@ -0,0 +1,23 @@
+import nura
+from nura.tensors import Tensor
+from nura.nn.modules.module import Module
+from typing import Any
+
+
+class Checkpoint(Module):
+
+    def __init__(self, module: Module) -> None:
+        super().__init__()
+        self._module = module
+
+    @property
+    def module(self) -> Module:
+        return self._module
+
+    def forward(self, *args: Any) -> Tensor:
+        return nura.checkpoint(
+            self.module, *args, parameters=self.module.parameters()
+        )
+
+    def xrepr(self) -> str:
+        return f"{self.name()}()"
@@ -16,12 +16,14 @@ class Embedding(Module):
         vocab: int,
         padid: Optional[int] = None,
         dtype: Optional[Type[dtype]] = None,
+        sparse: bool = False,
     ) -> None:
         super().__init__()
         self._emdim = emdim
         self._vocab = vocab
         self._padid = padid
         self._dtype = types.float if dtype is None else dtype
+        self._sparse = sparse
         self._weight = parameter(utils.randn(vocab, emdim), dtype=dtype)
 
     @property
@@ -36,6 +38,10 @@ class Embedding(Module):
     def padid(self) -> Optional[int]:
         return self._padid
 
+    @property
+    def sparse(self) -> bool:
+        return self._sparse
+
     @property
     def dtype(self) -> Type[dtype]:
         return self._dtype
@@ -50,9 +56,9 @@ class Embedding(Module):
         return mod
 
     def forward(self, x: Tensor) -> Tensor:
-        return f.embedding(x, self.weight, self.padid)
+        return f.embedding(x, self.weight, self.padid, self.sparse)
 
     def xrepr(self) -> str:
         emdim, vocab = self.emdim, self.vocab
-        padid, dtype = self.padid, self.dtype.name()
-        return f"{self.name()}({emdim=} {vocab=} {padid=} {dtype=})"
+        padid, sparse, dtype = self.padid, self.sparse, self.dtype.name()
+        return f"{self.name()}({emdim=} {vocab=} {padid=} {sparse=} {dtype=})"
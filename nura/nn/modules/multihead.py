@@ -1,9 +1,12 @@
+import numpy as np
+import nura.nn.functional as f
 from nura.tensors import Tensor
 from nura.nn.modules.module import Module
 from nura.nn.modules.linear import Linear
 from nura.nn.modules.activations import ScaledDotProductAttention
+from nura.nn.cache import KVCache
 from nura.types import dtype
-from typing import Optional, Tuple, Callable, Type
+from typing import Optional, Sequence, Tuple, Callable, Type
 
 
 class MultiHeadAttention(Module):
@@ -19,6 +22,7 @@ class MultiHeadAttention(Module):
         init: Optional[Callable[..., Tensor]] = None,
         dropout: Optional[float] = None,
         dtype: Optional[Type[dtype]] = None,
+        weights: bool = True,
     ) -> None:
 
         super().__init__()
@@ -34,7 +38,10 @@ class MultiHeadAttention(Module):
         self._kweight = Linear(dm, heads * dk, bias=bias, init=init, dtype=dtype)
         self._vweight = Linear(dm, heads * dv, bias=bias, init=init, dtype=dtype)
         self._oweight = Linear(heads * dv, dm, bias=bias, init=init, dtype=dtype)
-        self._attn = ScaledDotProductAttention(maskfill=maskfill, dropout=dropout)
+        _share(self._qweight, self._kweight, self._vweight)
+        self._attn = ScaledDotProductAttention(
+            maskfill=maskfill, dropout=dropout, weights=weights
+        )
 
     @property
     def dm(self) -> int:
@@ -69,20 +76,57 @@ class MultiHeadAttention(Module):
         return self._oweight
 
     def forward(
-        self, q: Tensor, k: Tensor, v: Tensor, mask: Optional[Tensor] = None
-    ) -> Tuple[Tensor, Tensor]:
-        qlen = q.dim[1]
-        klen = k.dim[1]
-        q = self._qweight(q).reshape((-1, qlen, self._heads, self._dk)).transpose(1, 2)
-        k = self._kweight(k).reshape((-1, klen, self._heads, self._dk)).transpose(1, 2)
-        v = self._vweight(v).reshape((-1, klen, self._heads, self._dv)).transpose(1, 2)
-
-        ctx, attn = self._attn(q, k, v, mask=mask)
-        ctx = ctx.reshape((-1, qlen, self._heads * self._dv))
-        out = self._oweight(ctx)
+        self,
+        q: Tensor,
+        k: Tensor,
+        v: Tensor,
+        mask: Optional[Tensor] = None,
+        cache: Optional[KVCache] = None,
+        counts: Optional[Sequence[int]] = None,
+    ) -> Tuple[Tensor, Optional[Tensor]]:
+        heads = self._heads
+        qstop = heads * self._dk
+        kstop = 2 * qstop
+        if q is k and k is v:
+            qkv = _fused(q, self._qweight, self._kweight, self._vweight)
+            q = f.splitheads(qkv, heads, 0, qstop)
+            k = f.splitheads(qkv, heads, qstop, kstop)
+            v = f.splitheads(qkv, heads, kstop, qkv.dim[-1])
+        elif k is v:
+            kv = _fused(k, self._kweight, self._vweight)
+            q = f.splitheads(self._qweight(q), heads)
+            k = f.splitheads(kv, heads, 0, qstop)
+            v = f.splitheads(kv, heads, qstop, kv.dim[-1])
+        else:
+            q = f.splitheads(self._qweight(q), heads)
+            k = f.splitheads(self._kweight(k), heads)
+            v = f.splitheads(self._vweight(v), heads)
+
+        ctx, attn = self._attn(q, k, v, mask=mask, cache=cache, counts=counts)
+        out = self._oweight(f.mergeheads(ctx))
         return out, attn
 
     def xrepr(self) -> str:
         dm, dk, dv = self.dm, self.dk, self.dv
         heads = self._heads
         return f"{self.name()}({dm=} {dk=} {dv=} {heads=})"
+
+
+def _share(*linears: Linear) -> None:
+    for name in ("weight", "bias"):
+        params = [getattr(linear, name) for linear in linears]
+        if params[0] is None:
+            continue
+        packed = np.concatenate([p.data for p in params])
+        stop = 0
+        for p in params:
+            start, stop = stop, stop + len(p.data)
+            p.data = packed[start:stop]
+
+
+def _fused(x: Tensor, *linears: Linear) -> Tensor:
+    weight = f.pack(*(linear.weight for linear in linears))
+    bias = linears[0].bias
+    if bias is not None:
+        bias = f.pack(*(linear.bias for linear in linears))
+    return f.linear(x, weight, bias)
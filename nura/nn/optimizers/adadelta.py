@@ -1,8 +1,11 @@
+import numpy as np
 import nura
 import nura.nn.utils as utils
 from nura.nn.optimizers.optimizer import Optimizer
+from nura.autograd.profile import profiled
 from nura.nn.parameter import Parameter
 from nura.tensors import Tensor
+from nura.autograd.rowsparse import RowSparse
 from typing import Optional, Iterator, Tuple
 
 
@@ -35,18 +38,33 @@ class AdaDelta(Optimizer):
     def squares(self) -> Iterator[Tuple[Parameter, Tensor]]:
         yield from self._squares.items()
 
+    @profiled("step")
     def step(self) -> None:
         super().step()
         for p in self._parameters:
             if p.grad is None or not p.usegrad:
                 continue
 
-            d = self._deltas.get(p, nura.zeroslike(p))
-            s = self._squares.get(p, nura.zeroslike(p))
+            d = self._deltas[p] if p in self._deltas else nura.zeroslike(p)
+            s = self._squares[p] if p in self._squares else nura.zeroslike(p)
+            if isinstance(p.grad, RowSparse):
+                u = sparseadadelta(
+                    parameter=p,
+                    delta=d,
+                    square=s,
+                    gamma=self.gamma,
+                    decay=self.decay,
+                    eps=self.eps,
+                )
+                self._deltas[p] = d
+                self._squares[p] = s
+                self.sparseupdate(p, u)
+                continue
             u, d_, s_ = adadelta(
                 parameter=p,
                 delta=d,
                 square=s,
+                gamma=self.gamma,
                 decay=self.decay,
                 eps=self.eps,
                 graph=False,
@@ -84,3 +102,20 @@ def adadelta(
     update = nura.sqrt(delta + eps) / nura.sqrt(nextsquare + eps) * grad
     nextdelta = gamma * delta + (1 - gamma) * update.square()
     return update, nextdelta, nextsquare
+
+
+def sparseadadelta(
+    parameter: Parameter,
+    delta: Tensor,
+    square: Tensor,
+    gamma: float = 0.9,
+    decay: Optional[float] = None,
+    eps: float = 1e-8,
+) -> RowSparse:
+    indices, grad = utils.rowgrad(parameter, decay)
+    nextsquare = gamma * square.data[indices] + (1 - gamma) * np.square(grad)
+    prevdelta = delta.data[indices]
+    update = np.sqrt(prevdelta + eps) / np.sqrt(nextsquare + eps) * grad
+    square.data[indices] = nextsquare
+    delta.data[indices] = gamma * prevdelta + (1 - gamma) * np.square(update)
+    return RowSparse(indices, update, parameter.dim)
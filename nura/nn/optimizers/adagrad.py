@@ -1,8 +1,11 @@
+import numpy as np
 import nura
 import nura.nn.utils as utils
 from nura.nn.optimizers.optimizer import Optimizer
+from nura.autograd.profile import profiled
 from nura.nn.parameter import Parameter
 from nura.tensors import Tensor
+from nura.autograd.rowsparse import RowSparse
 from typing import Optional, Iterator, Tuple
 
 
@@ -26,13 +29,25 @@ class AdaGrad(Optimizer):
     def squares(self) -> Iterator[Tuple[Parameter, Tensor]]:
         yield from self._squares.items()
 
+    @profiled("step")
     def step(self) -> None:
         super().step()
         for p in self._parameters:
             if p.grad is None or not p.usegrad:
                 continue
 
-            s = self._squares.get(p, nura.zeroslike(p))
+            s = self._squares[p] if p in self._squares else nura.zeroslike(p)
+            if isinstance(p.grad, RowSparse):
+                u = sparseadagrad(
+                    parameter=p,
+                    squaregrads=s,
+                    learnrate=self.learnrate,
+                    decay=self.decay,
+                    eps=self.eps,
+                )
+                self._squares[p] = s
+                self.sparseupdate(p, u)
+                continue
             u, s_ = adagrad(
                 parameter=p,
                 squaregrads=s,
@@ -70,3 +85,17 @@ def adagrad(
         squaregrads = squaregrads + grad.square()
         update = learnrate / nura.sqrt(squaregrads + eps) * grad
         return update, squaregrads
+
+
+def sparseadagrad(
+    parameter: Parameter,
+    squaregrads: Tensor,
+    learnrate: float,
+    decay: Optional[float] = None,
+    eps: float = 1e-8,
+) -> RowSparse:
+    indices, grad = utils.rowgrad(parameter, decay)
+    squares = squaregrads.data[indices] + np.square(grad)
+    squaregrads.data[indices] = squares
+    update = learnrate / np.sqrt(squares + eps) * grad
+    return RowSparse(indices, update, parameter.dim)
@@ -1,8 +1,11 @@
+import numpy as np
 import nura
 import nura.nn.utils as utils
 from nura.nn.optimizers.optimizer import Optimizer
+from nura.autograd.profile import profiled
 from nura.nn.parameter import Parameter
 from nura.tensors import Tensor
+from nura.autograd.rowsparse import RowSparse
 from typing import Optional, Iterator, Tuple
 
 
@@ -32,12 +35,30 @@ class Adam(Optimizer):
     def moments(self) -> Iterator[Tuple[Tensor, Tuple[Tensor, Tensor]]]:
         yield from self._moments.items()
 
+    @profiled("step")
     def step(self) -> None:
         super().step()
         for p in self._parameters:
             if p.grad is None or not p.usegrad:
                 continue
-            vs = self._moments.get(p, (nura.zeroslike(p), nura.zeroslike(p)))
+            vs = (
+                self._moments[p]
+                if p in self._moments
+                else (nura.zeroslike(p), nura.zeroslike(p))
+            )
+            if isinstance(p.grad, RowSparse):
+                u = sparseadam(
+                    parameter=p,
+                    velocities=vs,
+                    learnrate=self.learnrate,
+                    timestep=self.stepnum,
+                    betas=self.betas,
+                    decay=self.decay,
+                    eps=self.eps,
+                )
+                self._moments[p] = vs
+                self.sparseupdate(p, u)
+                continue
             g, vs = adam(
                 parameter=p,
                 velocities=vs,
@@ -82,3 +103,23 @@ def adam(
         vthat = 1 / (1 - betas[1] ** timestep) * vt
         update = mthat / nura.sqrt(vthat + eps) * learnrate
         return update, (mt, vt)
+
+
+def sparseadam(
+    parameter: Parameter,
+    velocities: Tuple[Tensor, Tensor],
+    learnrate: float,
+    timestep: int,
+    betas: Tuple[float, float] = (0.9, 0.99),
+    decay: Optional[float] = None,
+    eps: float = 1e-8,
+) -> RowSparse:
+    indices, grad = utils.rowgrad(parameter, decay)
+    m, v = velocities[0].data, velocities[1].data
+    mt = betas[0] * m[indices] + (1 - betas[0]) * grad
+    vt = betas[1] * v[indices] + (1 - betas[1]) * np.square(grad)
+    m[indices], v[indices] = mt, vt
+    mthat = 1 / (1 - betas[0] ** timestep) * mt
+    vthat = 1 / (1 - betas[1] ** timestep) * vt
+    update = mthat / np.sqrt(vthat + eps) * learnrate
+    return RowSparse(indices, update, parameter.dim)
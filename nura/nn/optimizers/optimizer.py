@@ -1,6 +1,7 @@
 import nura
 from nura.tensors import Tensor
 from nura.nn.parameter import Parameter
+from nura.autograd.rowsparse import RowSparse
 from typing import Iterator, Optional
 
 
@@ -37,9 +38,15 @@ class Optimizer:
         with nura.nograd():
             parameter -= gradstep
 
+    def sparseupdate(self, parameter: Tensor, gradstep: RowSparse) -> None:
+        parameter.data[gradstep.indices] -= gradstep.rows
+
     def zerograd(self) -> None:
         for p in self._parameters:
-            p.zerograd()
+            if p.grad is None or isinstance(p.grad, RowSparse):
+                p.cleargrad()
+            else:
+                p.zerograd()
 
     def step(self) -> None:
         self._stepnum += 1
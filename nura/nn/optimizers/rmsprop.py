@@ -1,8 +1,11 @@
+import numpy as np
 import nura
 import nura.nn.utils as utils
 from nura.nn.optimizers.optimizer import Optimizer
+from nura.autograd.profile import profiled
 from nura.nn.parameter import Parameter
 from nura.tensors import Tensor
+from nura.autograd.rowsparse import RowSparse
 from typing import Optional, Iterator, Tuple
 
 
@@ -32,12 +35,25 @@ class RMSProp(Optimizer):
     def moments(self) -> Iterator[Tuple[Tensor, Tensor]]:
         yield from self._moments.items()
 
+    @profiled("step")
     def step(self) -> None:
         super().step()
         for p in self._parameters:
             if p.grad is None or not p.usegrad:
                 continue
-            v = self._moments.get(p, nura.zeroslike(p))
+            v = self._moments[p] if p in self._moments else nura.zeroslike(p)
+            if isinstance(p.grad, RowSparse):
+                u = sparsermsprop(
+                    parameter=p,
+                    velocity=v,
+                    learnrate=self.learnrate,
+                    alpha=self.alpha,
+                    decay=self.decay,
+                    eps=self.eps,
+                )
+                self._moments[p] = v
+                self.sparseupdate(p, u)
+                continue
             g, v_ = rmsprop(
                 parameter=p,
                 velocity=v,
@@ -77,3 +93,18 @@ def rmsprop(
         nextvel = alpha * velocity + (1 - alpha) * nura.square(grad)
         update = learnrate / nura.sqrt(nextvel + eps) * grad
         return update, nextvel
+
+
+def sparsermsprop(
+    parameter: Parameter,
+    velocity: Tensor,
+    learnrate: float,
+    alpha: float = 0.9,
+    decay: Optional[float] = None,
+    eps: float = 1e-8,
+) -> RowSparse:
+    indices, grad = utils.rowgrad(parameter, decay)
+    nextvel = alpha * velocity.data[indices] + (1 - alpha) * np.square(grad)
+    velocity.data[indices] = nextvel
+    update = learnrate / np.sqrt(nextvel + eps) * grad
+    return RowSparse(indices, update, parameter.dim)
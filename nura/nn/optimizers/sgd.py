@@ -1,8 +1,10 @@
 import nura
 import nura.nn.utils as utils
 from nura.nn.optimizers.optimizer import Optimizer
+from nura.autograd.profile import profiled
 from nura.nn.parameter import Parameter
 from nura.tensors import Tensor
+from nura.autograd.rowsparse import RowSparse
 from typing import Optional, Iterator, Tuple
 
 
@@ -33,12 +35,25 @@ class SGD(Optimizer):
     def moments(self) -> Iterator[Tuple[Parameter, Tensor]]:
         yield from self._moments.items()
 
+    @profiled("step")
     def step(self) -> None:
         super().step()
         for p in self._parameters:
             if p.grad is None or not p.usegrad:
                 continue
-            v = self._moments.get(p, nura.zeroslike(p))
+            v = self._moments[p] if p in self._moments else nura.zeroslike(p)
+            if isinstance(p.grad, RowSparse):
+                u = sparsesgd(
+                    parameter=p,
+                    velocity=v,
+                    learnrate=self.learnrate,
+                    momentum=self.momentum,
+                    nesterov=self.nesterov,
+                    decay=self.decay,
+                )
+                self._moments[p] = v
+                self.sparseupdate(p, u)
+                continue
             g = sgd(
                 parameter=p,
                 velocity=v,
@@ -80,3 +95,20 @@ def sgd(
             grad += momentum * velocity
         update = momentum * velocity + learnrate * grad
         return update
+
+
+def sparsesgd(
+    parameter: Parameter,
+    velocity: Tensor,
+    learnrate: float,
+    momentum: float = 0.9,
+    nesterov: bool = False,
+    decay: Optional[float] = None,
+) -> RowSparse:
+    indices, grad = utils.rowgrad(parameter, decay)
+    prev = velocity.data[indices]
+    if nesterov:
+        grad = grad + momentum * prev
+    update = momentum * prev + learnrate * grad
+    velocity.data[indices] = update
+    return RowSparse(indices, update, parameter.dim)
@@ -1,13 +1,29 @@
 import nura
 from nura.tensors import Tensor
 from nura.types import dtype
-from typing import Optional, Type
+from nura.autograd.rowsparse import RowSparse
+from numpy import ndarray
+from typing import Optional, Tuple, Type
 
 
 def computedecay(tensor: Tensor, grad: Tensor, decay: float) -> Tensor:
     return grad + tensor * decay
 
 
+def rowgrad(
+    tensor: Tensor, decay: Optional[float] = None
+) -> Tuple[ndarray, ndarray]:
+    grad = tensor.grad
+    if not isinstance(grad, RowSparse):
+        raise ValueError(
+            "Cannot compute sparse update, parameter.grad is not row sparse"
+        )
+    rows = grad.rows
+    if decay is not None:
+        rows = rows + tensor.data[grad.indices] * decay
+    return grad.indices, rows
+
+
 def xavier(
     inputdim: int,
     outputdim: int,
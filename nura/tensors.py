@@ -6,6 +6,7 @@ from numpy import ndarray
 
 if TYPE_CHECKING:
     from nura.autograd.graph import Node
+    from nura.autograd.plan import Plan
 
 
 class Tensor:
@@ -31,14 +32,18 @@ class Tensor:
 
     @property
     def dim(self) -> dim:
+        if nura.Autograd._batch is not None and nura.Autograd._batch.batched(self):
+            return self._data.shape[1:]
         return self._data.shape
 
     @property
     def ndim(self) -> int:
-        return self._data.ndim
+        return len(self.dim)
 
     @property
     def nelem(self) -> int:
+        if nura.Autograd._batch is not None and nura.Autograd._batch.batched(self):
+            return self._data.size // len(self._data)
         return self._data.size
 
     @property
@@ -63,7 +68,7 @@ class Tensor:
 
     @property
     def dtype(self) -> Type[dtype]:
-        return types.dtypeof(self.data)
+        return types.dtypeof(self._data)
 
     @property
     def gradtensor(self) -> bool:
@@ -116,9 +121,13 @@ class Tensor:
         return self.data.tolist()
 
     def backward(
-        self, grad: Optional["Tensor"] = None, input: Optional["Tensor"] = None
+        self,
+        grad: Optional["Tensor"] = None,
+        input: Optional["Tensor"] = None,
+        plan: Optional["Plan"] = None,
+        retaingraph: bool = False,
     ) -> None:
-        nura.backward(self, grad, input)
+        nura.backward(self, grad, input, plan, retaingraph)
 
     def cleargrad(self) -> None:
         self._grad = None
@@ -342,7 +351,10 @@ class Tensor:
         return nura.hashtensor(self)
 
     def __len__(self) -> int:
-        return len(self.data)
+        dim = self.dim
+        if not dim:
+            raise TypeError("Cannot take length of tensor, tensor is 0-d")
+        return dim[0]
 
     def __bool__(self) -> None:
         raise ValueError(
@@ -395,20 +407,7 @@ class Tensor:
         return self.to(types.bool)
 
     def __setattr__(self, name: str, value: Any) -> None:
-        if name not in set(
-            (
-                "data",
-                "usegrad",
-                "dim",
-                "dtype",
-                "_data",
-                "_usegrad",
-                "_grad",
-                "_gradfn",
-                "_leaf",
-                "_version",
-            )
-        ):
+        if name not in _setattrs:
             raise AttributeError(
                 f"Cannot assign value of type {type(value)} to {name} of {nura.typename(self)}"
             )
@@ -469,3 +468,19 @@ def tensor(
         dtype = nura.dtypeof(data)
     data = dtype.numpy(data)
     return Tensor(data, usegrad, None, None, True)
+
+
+_setattrs = frozenset(
+    (
+        "data",
+        "usegrad",
+        "dim",
+        "dtype",
+        "_data",
+        "_usegrad",
+        "_grad",
+        "_gradfn",
+        "_leaf",
+        "_version",
+    )
+)
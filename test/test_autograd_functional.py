@@ -0,0 +1,722 @@
+import json
+import weakref
+import pytest
+import nura
+import nura.nn as nn
+import nura.nn.functional as nf
+import numpy as np
+
+
+def mlp(x, w0, b0, w1, b1):
+    h = nf.relu(nf.linear(x, w0, b0))
+    return nf.linear(h, w1, b1).sum()
+
+
+def test_plan_backward_matches_backward():
+    x = nura.randn(4, 3)
+    params = [nura.randn(5, 3), nura.randn(5), nura.randn(2, 5), nura.randn(2)]
+    a = [p.detach().attach() for p in params]
+    b = [p.detach().attach() for p in params]
+    plan = nura.Plan()
+
+    mlp(x, *a).backward()
+    mlp(x, *b).backward(plan=plan)
+    for p, q in zip(a, b):
+        assert p.grad is not None and q.grad is not None
+        np.testing.assert_allclose(p.grad.data, q.grad.data, rtol=1e-7, atol=1e-7)
+
+
+def test_plan_replay():
+    x = nura.randn(4, 3)
+    params = [nura.randn(5, 3, usegrad=True), nura.randn(5, usegrad=True)]
+    params += [nura.randn(2, 5, usegrad=True), nura.randn(2, usegrad=True)]
+    plan = nura.Plan()
+
+    grads = []
+    for _ in range(3):
+        for p in params:
+            p.cleargrad()
+        mlp(x, *params).backward(plan=plan)
+        grads.append([p.grad.data.copy() for p in params])
+
+    assert plan.records == 1
+    assert plan.replays == 2
+    for g in grads[1:]:
+        for a, b in zip(grads[0], g):
+            np.testing.assert_allclose(a, b, rtol=1e-7, atol=1e-7)
+
+
+def test_plan_fanin():
+    a = nura.randn(3, usegrad=True)
+    b = a * a
+    c = (b + a).sum()
+    plan = nura.Plan()
+    c.backward(plan=plan)
+
+    leaf = plan.fanin[list(plan.accumulate).index(True)]
+    assert leaf == 3
+    np.testing.assert_allclose(a.grad.data, 2 * a.data + 1, rtol=1e-6, atol=1e-6)
+
+
+def test_plan_invalidated_on_structure_change():
+    a = nura.randn(3, usegrad=True)
+    plan = nura.Plan()
+    (a * a).sum().backward(plan=plan)
+    a.cleargrad()
+    (a * a).sum().backward(plan=plan)
+    a.cleargrad()
+    (a.exp() * a).sum().backward(plan=plan)
+
+    assert plan.records == 2
+    assert plan.replays == 1
+    expected = np.exp(a.data) * a.data + np.exp(a.data)
+    np.testing.assert_allclose(a.grad.data, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_plan_invalidated_on_shared_node():
+    a = nura.randn(3, usegrad=True)
+    plan = nura.Plan()
+    b, c = a.exp(), a.exp()
+    (b * c).sum().backward(plan=plan)
+    a.cleargrad()
+    b = a.exp()
+    (b * b).sum().backward(plan=plan)
+
+    assert plan.records == 2
+    expected = 2 * np.exp(2 * a.data)
+    np.testing.assert_allclose(a.grad.data, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_backward_does_not_mutate_seed():
+    a = nura.randn(3, usegrad=True)
+    b = a * 2.0
+    c = b * 3.0
+    bgrad, cgrad = nura.oneslike(b), nura.oneslike(c)
+    nura.backward((c, b), (cgrad, bgrad))
+
+    np.testing.assert_array_equal(bgrad.data, np.ones(3))
+    np.testing.assert_array_equal(cgrad.data, np.ones(3))
+    np.testing.assert_allclose(a.grad.data, np.full(3, 8.0), rtol=1e-6, atol=1e-6)
+
+
+def test_backward_accumulates_through_views():
+    a = nura.randn(2, 3, usegrad=True)
+    b = a.reshape((3, 2))
+    b.retain()
+    c = b.transpose()
+    (c.sum() + (b * b).sum()).backward()
+
+    expected = 1 + 2 * b.data
+    np.testing.assert_allclose(b.grad.data, expected, rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(
+        a.grad.data, expected.reshape(2, 3), rtol=1e-6, atol=1e-6
+    )
+
+
+def test_backward_accumulates_in_place():
+    a = nura.randn(3, usegrad=True)
+    (a * a).sum().backward()
+    grad = a.grad
+    (a * a).sum().backward()
+
+    assert a.grad is grad
+    np.testing.assert_allclose(a.grad.data, 4 * a.data, rtol=1e-6, atol=1e-6)
+
+
+def test_plan_pool_reuses_buffers():
+    x = nura.randn(4, 3)
+    params = [nura.randn(5, 3, usegrad=True), nura.randn(5, usegrad=True)]
+    params += [nura.randn(2, 5, usegrad=True), nura.randn(2, usegrad=True)]
+    plan = nura.Plan()
+
+    previous = None
+    for _ in range(3):
+        for p in params:
+            p.cleargrad()
+        mlp(x, *params).backward(plan=plan)
+        grads = [p.grad for p in params]
+        if previous is not None:
+            for p, (g, copy) in zip(params, previous):
+                assert p.grad is not g
+                np.testing.assert_array_equal(g.data, copy)
+        previous = [(g, g.data.copy()) for g in grads]
+
+    assert plan.pool.reuses > 0
+
+
+def test_pool_backs_backward_kernels():
+    x = nura.randn(4, 6, usegrad=True)
+    plan = nura.Plan()
+
+    for _ in range(3):
+        x.cleargrad()
+        y = x[1:3].sum(dim=1) + x.max(dim=0).sum()
+        y.sum().backward(plan=plan)
+        expected = np.zeros((4, 6))
+        expected[1:3] = 1
+        expected += 2 * (x.data == x.data.max(axis=0))
+        np.testing.assert_allclose(x.grad.data, expected)
+
+    pool = plan.pool
+    assert pool.reuses > 0
+    assert pool.reusebytes > 0
+    assert pool.allocbytes > 0
+    assert nura.Autograd._pool is None
+    arr = nura.autograd.pool.zeros((2, 3), np.float64)
+    np.testing.assert_array_equal(arr, np.zeros((2, 3)))
+
+
+def test_pooling_is_opt_in_and_clearable():
+    x = nura.randn(4, 6, usegrad=True)
+    (x.exp() * x).sum().backward()
+    assert nura.Autograd._pool is None
+
+    pool = nura.Pool()
+    with nura.pooling(pool):
+        for _ in range(3):
+            x.cleargrad()
+            (x.exp() * x).sum().backward()
+    np.testing.assert_allclose(
+        x.grad.data, np.exp(x.data) * (1 + x.data), rtol=1e-7, atol=1e-7
+    )
+    assert pool.reuses > 0 and len(pool) > 0
+    pool.clear()
+    assert len(pool) == 0 and pool.nbytes == 0
+
+
+def test_backward_releases_graph():
+    a = nura.randn(3, usegrad=True)
+    b = a.exp()
+    c = b.sum()
+    context = weakref.ref(b.gradfn.context)
+    intermediate = weakref.ref(b)
+    del b
+    c.backward()
+
+    assert c.gradfn.released
+    assert context() is None
+    assert intermediate() is None
+    with pytest.raises(RuntimeError):
+        c.backward()
+
+
+def test_backward_retaingraph():
+    a = nura.randn(3, usegrad=True)
+    b = (a * a).sum()
+    b.backward(retaingraph=True)
+    assert not b.gradfn.released
+    b.backward()
+
+    assert b.gradfn.released
+    np.testing.assert_allclose(a.grad.data, 4 * a.data, rtol=1e-6, atol=1e-6)
+
+
+def test_backward_through_released_graph():
+    a = nura.randn(3, usegrad=True)
+    b = a.exp()
+    b.sum().backward()
+    with pytest.raises(RuntimeError):
+        (b * 2.0).sum().backward()
+
+
+def test_checkpoint_matches_backward():
+    x = nura.randn(4, 3, usegrad=True)
+    params = [nura.randn(5, 3), nura.randn(5), nura.randn(2, 5), nura.randn(2)]
+    a = [p.detach().attach() for p in params]
+    b = [p.detach().attach() for p in params]
+    y = x.detach().attach()
+
+    mlp(x, *a).backward()
+    nura.checkpoint(mlp, y, *b).backward()
+    for p, q in zip(a + [x], b + [y]):
+        np.testing.assert_allclose(p.grad.data, q.grad.data, rtol=1e-6, atol=1e-6)
+
+
+def test_checkpoint_parameters():
+    x = nura.randn(4, 3)
+    model = nn.Linear(3, 2)
+    ckpt = nn.Checkpoint(model)
+    out = ckpt(x)
+    out.sum().backward()
+    grads = [p.grad.data.copy() for p in model.parameters()]
+    for p in model.parameters():
+        p.cleargrad()
+    model(x).sum().backward()
+
+    for g, p in zip(grads, model.parameters()):
+        np.testing.assert_allclose(g, p.grad.data, rtol=1e-6, atol=1e-6)
+
+
+def test_checkpoint_replays_dropout():
+    x = nura.randn(8, 8, usegrad=True)
+    out = nura.checkpoint(nf.dropout, x, 0.5)
+    out.sum().backward()
+    mask = (out.data != 0).astype(x.data.dtype)
+    np.testing.assert_allclose(x.grad.data, mask * 2.0, rtol=1e-6, atol=1e-6)
+
+
+def test_checkpoint_requires_parameters():
+    x = nura.randn(4, 3)
+    model = nn.Linear(3, 2)
+    out = nura.checkpoint(model, x.attach())
+    with pytest.raises(RuntimeError):
+        out.sum().backward()
+
+
+def test_plan_workers_match_serial():
+    x = nura.randn(6, 8)
+    params = [nura.randn(8, 8) for _ in range(3)]
+    heads = lambda q, k, v: (
+        (x @ q).exp().sum() + ((x @ k) * (x @ v)).sum() + (x @ q @ k).sum()
+    )
+    a = [p.detach().attach() for p in params]
+    b = [p.detach().attach() for p in params]
+    plan = nura.Plan(workers=4)
+
+    heads(*a).backward()
+    for _ in range(2):
+        for p in b:
+            p.cleargrad()
+        heads(*b).backward(plan=plan)
+    plan.close()
+    for p, q in zip(a, b):
+        np.testing.assert_array_equal(p.grad.data, q.grad.data)
+
+
+def test_plan_workers_run_checkpoints_serially():
+    a = nura.randn(128, 128)
+    weights = [nura.randn(128, 128) for _ in range(4)]
+    branch = lambda a, w: nf.dropout(nura.matmul(a, w), 0.5)
+    plan = nura.Plan(workers=4)
+
+    for seed in range(20):
+        grads = []
+        for p in (None, plan):
+            x = a.detach().attach()
+            np.random.seed(seed)
+            c = [nura.checkpoint(branch, x, w, parameters=()) for w in weights]
+            ((c[0] + c[1]) * (c[2] + c[3])).sum().backward(plan=p)
+            grads.append(x.grad.data)
+        np.testing.assert_array_equal(grads[0], grads[1])
+    plan.close()
+
+
+def test_inference_matches_nograd():
+    x = nura.randn(2, 3)
+    model = nn.Linear(3, 4)
+    with nura.nograd():
+        expected = nf.relu(model(x)).sum()
+    with nura.inference():
+        out = nf.relu(model(x)).sum()
+        assert nura.Autograd.inferencemode()
+        with nura.usegrad():
+            assert not nura.Autograd.inferencemode()
+            assert model(x).gradfn is not None
+
+    assert not nura.Autograd.inferencemode()
+    assert out.gradfn is None and not out.usegrad
+    np.testing.assert_allclose(out.data, expected.data, rtol=1e-6, atol=1e-6)
+
+
+def test_jacrev_matches_vjp_rows():
+    x, w, b = nura.randn(3, 4), nura.randn(5, 4), nura.randn(5)
+    func = lambda x, w, b: nf.tanh(nf.linear(x, w, b)).transpose().sum(1) * b
+
+    for pos in range(3):
+        input = tuple(t.mutated(usegrad=True, grad=None, leaf=True) for t in (x, w, b))
+        output, jac = nura.autograd.functional.jacrev(input, func, pos)
+        assert output.gradfn is None
+        for row in np.ndindex(output.dim):
+            vector = nura.zeroslike(output)
+            vector.data[row] = 1.0
+            _, vjps = nura.autograd.functional.vjp((x, w, b), vector, func)
+            np.testing.assert_allclose(
+                jac.data[row], vjps[pos].data, rtol=1e-6, atol=1e-6
+            )
+
+
+def test_jvp_through_chained_functions():
+    x, v = nura.randn(4), nura.randn(4)
+    _, tangent = nura.autograd.functional.jvp(x, v, lambda x: (x * 2.0).exp())
+    expected = 2.0 * np.exp(2.0 * x.data) * v.data
+    np.testing.assert_allclose(tangent.data, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_jacfwd_matches_jacrev():
+    x, w, b = nura.randn(3, 4), nura.randn(5, 4), nura.randn(5)
+    func = lambda x, w, b: nf.sigmoid(nf.linear(x, w, b)).transpose().sum(1) * b
+
+    for pos in range(3):
+        _, expected = nura.autograd.functional.jacrev((x, w, b), func, pos)
+        for chunk in (None, 1, 7):
+            output, jac = nura.autograd.functional.jacfwd(
+                (x, w, b), func, pos, chunk=chunk
+            )
+            assert output.grad is None
+            np.testing.assert_allclose(jac.data, expected.data, rtol=1e-5, atol=1e-5)
+
+
+def test_symbolic_zero_tangents_and_grads():
+    x, c = nura.randn(4, usegrad=True), nura.randn(4, usegrad=True)
+    with nura.forwardmode():
+        p = nura.forwardad.primal(x, nura.oneslike(x))
+        y = c * c + 1.0
+        z = p * y - c
+        assert y.usegrad and y.grad is None
+        np.testing.assert_allclose(z.grad.data, y.data, rtol=1e-6)
+
+    _, tangent = nura.autograd.functional.jvp(x, nura.oneslike(x), lambda x: c.exp())
+    np.testing.assert_array_equal(tangent.data, np.zeros(4))
+
+    a = nura.randn(3, 4, usegrad=True)
+    b = nura.randn(4, 2)
+    output = nura.matmul(a, b)
+    grads = output.gradfn.apply(nura.oneslike(output))
+    assert grads[0] is not None and grads[1] is None
+    output.backward(nura.oneslike(output))
+    np.testing.assert_allclose(a.grad.data, np.ones((3, 2)) @ b.data.T, rtol=1e-6)
+
+
+def test_vmap_matches_loop():
+    w, b, z = nura.randn(5, 4), nura.randn(5), nura.randn(3, 1)
+    func = (
+        lambda x, y: (nf.tanh(nf.linear(x, w, b)) @ y).unsqueeze(0).transpose() * z
+        + x.sum()
+    )
+    x, y = nura.randn(4, 6), nura.randn(6, 5, 3)
+
+    out = nura.vmap(func, indims=(1, 0), outdims=-1)(x, y)
+    expected = np.stack([func(x[:, i], y[i]).data for i in range(6)], axis=-1)
+    assert out.dim == (3, 1, 6)
+    np.testing.assert_allclose(out.data, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_vmap_reshapes_logical_dims():
+    func = lambda x: x.reshape((4, 3)).permute((1, 0)).unsqueeze(-1).squeeze().sum(0)
+    x = nura.randn(5, 2, 6)
+
+    out = nura.vmap(func)(x)
+    expected = np.stack([func(x[i]).data for i in range(5)])
+    np.testing.assert_allclose(out.data, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_vmap_per_example_gradients():
+    w = nura.randn(3, 4)
+    x, y = nura.randn(6, 4), nura.randn(6, 3)
+    loss = lambda w, x, y: ((nf.linear(x, w) - y) * 2.0).exp().sum()
+    pergrad = lambda x, y: nura.autograd.functional.vjp(w, nura.tensor(1.0), loss, x, y)
+
+    _, (grads,) = nura.vmap(pergrad, indims=0)(x, y)
+    assert grads.dim == (6, 3, 4)
+    for i in range(6):
+        _, (expected,) = pergrad(x[i], y[i])
+        np.testing.assert_allclose(grads.data[i], expected.data, rtol=1e-6, atol=1e-6)
+
+
+def test_vmap_backward():
+    x = nura.randn(5, 3, usegrad=True)
+    out = nura.vmap(lambda x: (x.exp() * x).sum())(x)
+    out.sum().backward()
+    expected = np.exp(x.data) * (1 + x.data)
+    np.testing.assert_allclose(x.grad.data, expected, rtol=1e-6, atol=1e-6)
+
+
+def test_vmap_len_hides_batch_axis():
+    def func(x):
+        assert len(x) == 3 and x.dim == (3, 2)
+        with pytest.raises(TypeError):
+            len(x.sum())
+        return x * len(x)
+
+    x = nura.randn(5, 3, 2)
+    out = nura.vmap(func)(x)
+    assert len(x) == 5
+    np.testing.assert_allclose(out.data, x.data * 3, rtol=1e-7, atol=1e-7)
+
+
+def test_jacsparse_matches_jacrev():
+    b = nura.randn(12)
+    func = lambda x: (
+        x.exp() * b
+        + nura.concat(x[1:], nura.zeros(1), 0) * x
+        - nura.concat(nura.zeros(1), x[:-1], 0)
+    )
+    pattern = nura.jacpattern(nura.randn(12), func)
+    assert pattern.colors.max() + 1 == 3
+    assert pattern.rowcolors.max() + 1 == 3
+
+    for _ in range(2):
+        x = nura.randn(12)
+        _, expected = nura.autograd.functional.jacrev(x, func)
+        for mode in (None, "fwd", "rev"):
+            _, jac = nura.jacsparse(x, func, pattern=pattern, mode=mode)
+            np.testing.assert_allclose(jac.data, expected.data, rtol=1e-6, atol=1e-6)
+        _, (values, cols, indptr) = nura.jacsparse(x, func, pattern=pattern, csr=True)
+        for i in range(12):
+            row = slice(indptr.data[i], indptr.data[i + 1])
+            np.testing.assert_allclose(
+                values.data[row], expected.data[i, cols.data[row]], rtol=1e-6, atol=1e-6
+            )
+
+
+def test_jacsparse_elementwise_uses_one_color():
+    x, w = nura.randn(3, 4), nura.randn(4)
+    func = lambda x, w: nf.sigmoid(x) * w
+    pattern = nura.Sparsity(np.eye(12, dtype=bool))
+    assert pattern.mode() == "fwd" and pattern.colors.max() == 0
+
+    _, jac = nura.jacsparse((x, w), func, 0, pattern=np.eye(12).reshape(3, 4, 3, 4))
+    _, expected = nura.autograd.functional.jacfwd((x, w), func, 0)
+    np.testing.assert_allclose(jac.data, expected.data, rtol=1e-6, atol=1e-6)
+    with pytest.raises(ValueError):
+        nura.jacsparse((x, w), func, 0, pattern=np.eye(6, 12))
+    with pytest.raises(ValueError):
+        nura.jacsparse((x, w), func, 0)
+
+
+def test_hessian_quadratic_form():
+    a = nura.randn(6, 6).to(nura.double)
+    x = nura.randn(6).to(nura.double)
+    output, hess = nura.hessian(x, lambda x: x.dot(a @ x))
+
+    np.testing.assert_allclose(output.data, x.data @ a.data @ x.data, rtol=1e-7)
+    np.testing.assert_allclose(hess.data, a.data + a.data.T, rtol=1e-7, atol=1e-7)
+
+
+def test_hvp_matches_finite_differences():
+    x, w = nura.randn(3, 4).to(nura.double), nura.randn(5, 4).to(nura.double)
+    y = nura.tensor(np.array([1, 0, 4]))
+    func = lambda x, w: nf.crossentropy(nf.tanh(nf.linear(x, w)) * x.sum(), y)
+    vx, vw = nura.randn(3, 4).to(nura.double), nura.randn(5, 4).to(nura.double)
+    _, (hx, hw) = nura.hvp((x, w), (vx, vw), func)
+
+    eps = 1e-5
+    _, upper = nura.autograd.functional.vjp(
+        (x + vx * eps, w + vw * eps), nura.tensor(1.0).to(nura.double), func
+    )
+    _, lower = nura.autograd.functional.vjp(
+        (x - vx * eps, w - vw * eps), nura.tensor(1.0).to(nura.double), func
+    )
+    for h, u, l in zip((hx, hw), upper, lower):
+        expected = (u.data - l.data) / (2 * eps)
+        np.testing.assert_allclose(h.data, expected, rtol=1e-5, atol=1e-7)
+
+
+def test_hessian_matches_hvp():
+    x, w = nura.randn(2, 3), nura.randn(4, 3)
+    func = lambda x, w: (
+        nf.sigmoid(nf.linear(x, w)) * nf.softmax(x @ w.transpose(), -1)
+    ).sum()
+    v = nura.randn(4, 3)
+    _, (_, hv) = nura.hvp((x, w), (nura.zeroslike(x), v), func)
+
+    for chunk in (None, 5):
+        _, hess = nura.hessian((x, w), func, 1, chunk=chunk)
+        expected = hess.data.reshape(12, 12) @ v.data.ravel()
+        np.testing.assert_allclose(hv.data.ravel(), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_forwardmode_releases_tangents():
+    x = nura.randn(3, usegrad=True)
+    with nura.forwardmode():
+        tape = nura.Autograd._tape
+        p = nura.forwardad.primal(x, nura.oneslike(x))
+        y = p.exp()
+        intermediate = weakref.ref(y)
+        assert len(tape) == 2
+        del y
+        assert intermediate() is None
+        assert len(tape) == 1
+
+    assert p.grad is None
+    assert nura.Autograd._tape is None
+    assert len(tape) == 0
+
+
+def test_compile_matches_eager():
+    w, b = nura.randn(4, 3, usegrad=True), nura.randn(3, usegrad=True)
+    func = lambda x, y: nf.mse(nf.tanh(x @ w + b), y)
+    x, y = nura.randn(5, 4), nura.randn(5, 3)
+    compiled = nura.compile(func, (x, y))
+
+    x, y = nura.randn(5, 4), nura.randn(5, 3)
+    expected = func(x, y)
+    expected.backward()
+    grads = w.grad.data.copy(), b.grad.data.copy()
+    w.cleargrad()
+    b.cleargrad()
+    output = compiled(x, y)
+    output.backward()
+    np.testing.assert_allclose(output.data, expected.data, rtol=1e-6)
+    np.testing.assert_allclose(w.grad.data, grads[0], rtol=1e-6)
+    np.testing.assert_allclose(b.grad.data, grads[1], rtol=1e-6)
+
+    x = x.mutated(usegrad=True)
+    (expected,) = nura.grad(x, func(x, y))
+    (xgrad,) = nura.grad(x, compiled(x, y))
+    np.testing.assert_allclose(xgrad.data, expected.data, rtol=1e-6)
+
+
+def test_compile_rejects_values_frozen_while_tracing():
+    x = nura.randn(3, 4)
+    for func in (
+        lambda x: x * nura.tensor(x.data.sum()),
+        lambda x: nura.where(x > 0, x, 0.0) * 2,
+        lambda x: x + nura.randn(3, 4),
+    ):
+        with pytest.raises(RuntimeError):
+            nura.compile(func, x)
+
+    compiled = nura.compile(lambda x: nf.dropout(x * 2 + 1, 0.5), x)
+    np.random.seed(0)
+    output = compiled(x)
+    np.random.seed(0)
+    np.testing.assert_array_equal(output.data, nf.dropout(x * 2 + 1, 0.5).data)
+
+
+def test_compile_optimizes_graph():
+    w = nura.randn(4, 4, usegrad=True)
+    c = nura.randn(4)
+
+    def func(x):
+        scale = (c * 2.0).exp().sum()
+        h = (+x).reshape((2, 8)).reshape((4, 4))
+        a = (h @ w) * scale
+        unused = h.sin()
+        return (a + (h @ w) * scale).sum()
+
+    x = nura.randn(4, 4)
+    compiled = nura.compile(func, x)
+    names = [op.name() for op in compiled.graph.ops]
+    assert names == ["Matmul", "Fused", "Sum"]
+    np.testing.assert_allclose(compiled(x).data, func(x).data, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        compiled(nura.randn(2, 4))
+
+
+def test_compile_fuses_elementwise_chains():
+    def func(x, m, v, rate):
+        m = m * 0.9 + x * 0.1
+        v = v * 0.99 + (x**2.0) * 0.01
+        return (rate * m / ((v + 1e-8) ** 0.5) - nf.tanh(x)).sum()
+
+    x, m = nura.randn(150, 150, usegrad=True), nura.randn(150, 150, usegrad=True)
+    v, rate = nura.rand(150, 150), nura.tensor(1e-3, usegrad=True)
+    compiled = nura.compile(func, (x, m, v, rate))
+    names = [op.name() for op in compiled.graph.ops]
+    assert names == ["Fused", "Sum"]
+    kernel = compiled.graph.ops[0].args[0]
+    assert kernel.dim == (150, 150) and len(kernel) > kernel.ninputs
+
+    output = compiled(x, m, v, rate)
+    grads = nura.grad((x, m, rate), output)
+    expected = nura.grad((x, m, rate), func(x, m, v, rate))
+    np.testing.assert_allclose(output.data, func(x, m, v, rate).data, rtol=1e-5)
+    for g, e in zip(grads, expected):
+        np.testing.assert_allclose(g.data, e.data, rtol=1e-4, atol=1e-6)
+
+
+def test_profiler_records_phases(tmp_path):
+    model = nn.Linear(3, 2)
+    optimizer = nn.SGD(model.parameters(), 1e-2)
+    x = nura.randn(4, 3)
+
+    with nura.profiler() as profile:
+        model(x).sum().backward()
+        optimizer.step()
+        nura.autograd.functional.jvp(x, nura.randn(4, 3), lambda x: x.exp().sum())
+    assert nura.Autograd._profile is None
+
+    phases = {(e.name, e.phase) for e in profile.events}
+    assert ("Matmul", "forward") in phases
+    assert ("Matmul", "backward") in phases
+    assert ("Exp", "tangent") in phases
+    assert ("SGD.step", "step") in phases
+    assert ("toposort", "engine") in phases
+    matmul = next(e for e in profile.events if e.name == "Matmul")
+    assert matmul.inputs == ((4, 3), (3, 2))
+    assert matmul.outputs == ((4, 2),)
+    assert matmul.nbytes == 4 * 2 * x.data.itemsize
+    assert "Matmul" in profile.table()
+    nested = nura.Profile()
+    work = lambda: sum(range(10**5))
+    nested.run("outer", "engine", nested.run, ("inner", "backward", work, ()))
+    rows = {r[0]: r for r in nested.summary()}
+    outer, inner = nested.events[1], nested.events[0]
+    assert rows["outer"][3] == outer.duration
+    assert rows["outer"][4] == outer.duration - inner.duration
+    assert rows["inner"][4] == inner.duration
+
+    path = tmp_path / "trace.json"
+    profile.export(str(path))
+    trace = json.loads(path.read_text())
+    assert len(trace["traceEvents"]) == len(profile)
+    assert all(e["ph"] == "X" for e in trace["traceEvents"])
+
+
+def test_memory_stats_and_tracker():
+    a = nura.randn(64, 32, usegrad=True)
+    b = nura.randn(32, 16, usegrad=True)
+
+    with nura.memory.tracker() as tracker:
+        c = nura.matmul(a, b).exp()
+        stats = nura.memory.stats()
+        saved = stats.saved
+        assert saved["Matmul"] == a.data.nbytes + b.data.nbytes
+        assert saved["Exp"] >= c.data.nbytes
+        assert stats.nodes >= 2 and stats.tensors >= 3
+        c.sum().backward()
+
+    assert nura.memory.stats().saved.get("Exp", 0) == 0
+    peaks = {(n, p): b for n, p, b in tracker.peaks}
+    assert peaks[("Matmul", "forward")] >= c.data.nbytes
+    assert ("Matmul", "backward") in peaks
+    assert tracker.peak >= max(peaks.values())
+    assert nura.Autograd._profile is None
+
+
+def test_softmax_and_crossentropy_tangents():
+    x = nura.randn(4, 5).double()
+    v = nura.randn(4, 5).double()
+    y = nura.tensor(np.array([1, 0, 4, 2]))
+    h = 1e-6
+
+    for func in (
+        lambda x: nf.softmax(x, dim=0),
+        lambda x: nf.crossentropy(x, y, ignoreid=0),
+    ):
+        _, tangent = nura.autograd.functional.jvp(x, v, func)
+        upper, lower = func(x + h * v), func(x - h * v)
+        np.testing.assert_allclose(
+            tangent.data, (upper.data - lower.data) / (2 * h), rtol=1e-5, atol=1e-6
+        )
+
+
+def test_logsoftmax_nllloss_tangents_and_hvp():
+    x = nura.randn(4, 5).double()
+    v = nura.randn(4, 5).double()
+    y = nura.tensor(np.array([1, 0, 4, 2]))
+    func = lambda x: nf.nllloss(nf.logsoftmax(x), y, ignoreid=0)
+    reference = lambda x: nf.crossentropy(x, y, ignoreid=0)
+    h = 1e-6
+
+    _, tangent = nura.autograd.functional.jvp(x, v, func)
+    upper, lower = func(x + h * v), func(x - h * v)
+    np.testing.assert_allclose(
+        tangent.data, (upper.data - lower.data) / (2 * h), rtol=1e-5, atol=1e-6
+    )
+    _, (hv,) = nura.hvp(x, v, func)
+    _, (expected,) = nura.hvp(x, v, reference)
+    np.testing.assert_allclose(hv.data, expected.data, atol=1e-10)
+
+
+def test_maskedfill_tangent_broadcasts_mask():
+    x = nura.randn(2, 3, 4).double()
+    v = nura.randn(2, 3, 4).double()
+    mask = np.random.rand(1, 3, 4) > 0.5
+    _, tangent = nura.autograd.functional.jvp(
+        x, v, lambda x: nura.maskedfill(x, mask, -1e9)
+    )
+
+    np.testing.assert_array_equal(tangent.data, np.where(mask, 0, v.data))
@@ -716,6 +716,27 @@ def test_matmul_matrix_matrix_backward():
     )
 
 
+def test_matmul_vector_matrix_backward():
+    a = np.random.rand(4)
+    b = np.random.rand(4, 5)
+    a_tensor = nura.tensor(a, usegrad=True)
+    b_tensor = nura.tensor(b, usegrad=True)
+    result_tensor = f.matmul(a_tensor, b_tensor)
+    result_tensor.backward(nura.oneslike(result_tensor))
+
+    expected_grad_a = np.dot(b, np.ones(5))
+    expected_grad_b = np.outer(a, np.ones(5))
+
+    assert a_tensor.grad is not None
+    assert b_tensor.grad is not None
+    np.testing.assert_allclose(
+        a_tensor.grad.data, expected_grad_a, rtol=1e-7, atol=1e-7
+    )
+    np.testing.assert_allclose(
+        b_tensor.grad.data, expected_grad_b, rtol=1e-7, atol=1e-7
+    )
+
+
 def test_matmul_tensor_tensor_backward():
     a = np.random.rand(2, 3, 4)
     b = np.random.rand(2, 4, 5)
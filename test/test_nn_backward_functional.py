@@ -1,5 +1,7 @@
+import pytest
 import numpy as np
 import nura
+import nura.nn as nn
 import nura.nn.functional as f
 
 
@@ -748,3 +750,290 @@ def test_celu_backward_custom_alpha_high_order():
 
     assert x_tensor.grad is not None
     np.testing.assert_allclose(x_tensor.grad.data, expected_grad, rtol=1e-7, atol=1e-7)
+
+
+def test_softmax_backward_matches_jacobian():
+    x = np.random.randn(2, 3, 4)
+    w = np.random.randn(2, 3, 4)
+    for dim in (0, 1, -1):
+        x_tensor = nura.tensor(x, usegrad=True)
+        result_tensor = f.softmax(x_tensor, dim=dim)
+        result_tensor.backward(nura.tensor(w))
+
+        p = np.exp(x - x.max(axis=dim, keepdims=True))
+        p /= p.sum(axis=dim, keepdims=True)
+        expected_grad = p * (w - np.sum(p * w, axis=dim, keepdims=True))
+
+        assert x_tensor.grad is not None
+        np.testing.assert_allclose(
+            x_tensor.grad.data, expected_grad, rtol=1e-7, atol=1e-7
+        )
+
+
+def test_crossentropy_backward_mean_ignores_padding():
+    x = np.random.randn(5, 4)
+    y = np.array([0, 3, 1, 3, 2])
+    x_tensor = nura.tensor(x, usegrad=True)
+    result_tensor = f.crossentropy(x_tensor, nura.tensor(y), ignoreid=3)
+    result_tensor.backward()
+
+    mask = y != 3
+    p = np.exp(x - x.max(axis=-1, keepdims=True))
+    p /= p.sum(axis=-1, keepdims=True)
+    p[np.arange(5), y] -= 1
+    expected_grad = np.where(mask[:, None], p, 0) / mask.sum()
+
+    assert x_tensor.grad is not None
+    np.testing.assert_allclose(x_tensor.grad.data, expected_grad, rtol=1e-7, atol=1e-7)
+
+
+def test_logsoftmax_backward_matches_jacobian():
+    x = np.random.randn(3, 4, 5)
+    w = np.random.randn(3, 4, 5)
+    for dim in (0, -1):
+        x_tensor = nura.tensor(x, usegrad=True)
+        result_tensor = f.logsoftmax(x_tensor, dim=dim)
+        result_tensor.backward(nura.tensor(w))
+
+        p = np.exp(x - x.max(axis=dim, keepdims=True))
+        p /= p.sum(axis=dim, keepdims=True)
+        expected_grad = w - p * np.sum(w, axis=dim, keepdims=True)
+
+        assert x_tensor.grad is not None
+        np.testing.assert_allclose(
+            x_tensor.grad.data, expected_grad, rtol=1e-7, atol=1e-7
+        )
+
+
+def test_nllloss_backward_matches_crossentropy():
+    x = np.random.randn(6, 4)
+    y = nura.tensor(np.array([0, 2, 1, 2, 3, 0]))
+    for reduction in ("mean", "sum"):
+        a = nura.tensor(x, usegrad=True)
+        b = nura.tensor(x, usegrad=True)
+        loss = f.nllloss(f.logsoftmax(a), y, ignoreid=2, reduction=reduction)
+        expected = f.crossentropy(b, y, ignoreid=2, reduction=reduction)
+        loss.backward()
+        expected.backward()
+
+        np.testing.assert_allclose(loss.data, expected.data, rtol=1e-7, atol=1e-7)
+        np.testing.assert_allclose(a.grad.data, b.grad.data, rtol=1e-7, atol=1e-7)
+
+
+def test_flashattention_backward_matches_dense():
+    q = np.random.randn(2, 6, 4)
+    k = np.random.randn(2, 9, 4)
+    v = np.random.randn(2, 9, 3)
+    w = np.random.randn(2, 6, 3)
+    mask = np.tril(np.ones((6, 9)), k=3).astype(bool)
+    q_tensor, k_tensor, v_tensor = (nura.tensor(a, usegrad=True) for a in (q, k, v))
+    result_tensor = f.flashattention(
+        q_tensor, k_tensor, v_tensor, nura.tensor(mask), block=4
+    )
+    result_tensor.backward(nura.tensor(w))
+
+    norm = 1 / np.sqrt(4)
+    scores = np.where(mask, q @ k.swapaxes(-1, -2) * norm, -1e9)
+    p = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    p /= p.sum(axis=-1, keepdims=True)
+    pgrad = w @ v.swapaxes(-1, -2)
+    sgrad = p * (pgrad - np.sum(p * pgrad, axis=-1, keepdims=True)) * mask * norm
+
+    np.testing.assert_allclose(result_tensor.data, p @ v, rtol=1e-7, atol=1e-7)
+    np.testing.assert_allclose(q_tensor.grad.data, sgrad @ k, rtol=1e-7, atol=1e-7)
+    np.testing.assert_allclose(
+        k_tensor.grad.data, sgrad.swapaxes(-1, -2) @ q, rtol=1e-7, atol=1e-7
+    )
+    np.testing.assert_allclose(
+        v_tensor.grad.data, p.swapaxes(-1, -2) @ w, rtol=1e-7, atol=1e-7
+    )
+
+
+def test_splitheads_mergeheads_backward():
+    x = np.random.randn(2, 5, 12)
+    w = np.random.randn(2, 2, 5, 3)
+    x_tensor = nura.tensor(x, usegrad=True)
+    heads = f.splitheads(x_tensor, 2, 4, 10)
+    merged = f.mergeheads(heads)
+    heads.backward(nura.tensor(w))
+
+    expected = np.zeros_like(x)
+    expected[..., 4:10] = w.swapaxes(1, 2).reshape(2, 5, 6)
+
+    np.testing.assert_array_equal(
+        heads.data, x[..., 4:10].reshape(2, 5, 2, 3).swapaxes(1, 2)
+    )
+    np.testing.assert_array_equal(merged.data, x[..., 4:10])
+    np.testing.assert_array_equal(x_tensor.grad.data, expected)
+
+
+def test_splitheads_backward_shares_one_buffer():
+    x = np.random.randn(2, 3, 12)
+    w = np.random.randn(2, 2, 3, 2)
+    x_tensor = nura.tensor(x, usegrad=True)
+    q = f.splitheads(x_tensor, 2, 0, 4)
+    k = f.splitheads(x_tensor, 2, 4, 8)
+    overlap = f.splitheads(x_tensor, 2, 2, 6)
+    output = (q * nura.tensor(w)).sum() + (k**2).sum() + (overlap**2).sum()
+    output.backward()
+
+    expected = np.zeros_like(x)
+    expected[..., :4] = w.swapaxes(1, 2).reshape(2, 3, 4)
+    expected[..., 4:8] = 2 * x[..., 4:8]
+    expected[..., 2:6] += 2 * x[..., 2:6]
+    np.testing.assert_allclose(
+        x_tensor.grad.data, expected, rtol=1e-7, atol=1e-7
+    )
+
+
+def test_maskedfill_backward_broadcasts_mask():
+    x = np.random.randn(2, 2, 3, 5)
+    w = np.random.randn(2, 2, 3, 5)
+    for mask in (np.random.rand(2, 1, 1, 5) > 0.5, np.random.rand(1, 1, 3, 5) > 0.5):
+        x_tensor = nura.tensor(x, usegrad=True)
+        result_tensor = nura.maskedfill(x_tensor, mask, -1e9)
+        result_tensor.backward(nura.tensor(w))
+
+        np.testing.assert_array_equal(result_tensor.data, np.where(mask, -1e9, x))
+        np.testing.assert_array_equal(x_tensor.grad.data, np.where(mask, 0, w))
+
+
+def test_attention_backward_through_mask():
+    q = np.random.randn(2, 4, 3)
+    k = np.random.randn(2, 4, 3)
+    v = np.random.randn(2, 4, 3)
+    w = np.random.randn(2, 4, 3)
+    mask = f.causalmask(4)
+    dense = [nura.tensor(a, usegrad=True) for a in (q, k, v)]
+    flash = [nura.tensor(a, usegrad=True) for a in (q, k, v)]
+    context, _ = f.attention(*dense, mask)
+    expected = f.flashattention(*flash, mask)
+    context.backward(nura.tensor(w))
+    expected.backward(nura.tensor(w))
+
+    np.testing.assert_allclose(context.data, expected.data, rtol=1e-7, atol=1e-7)
+    for a, b in zip(dense, flash):
+        np.testing.assert_allclose(a.grad.data, b.grad.data, rtol=1e-7, atol=1e-7)
+    np.testing.assert_array_equal(f.causalmask(2, 4).data, np.tri(2, 4, 2, dtype=bool))
+    for t in range(1, 40):
+        step = f.causalmask(1, t).data
+        assert step.all() and step.shape == (1, t)
+    assert np.shares_memory(f.causalmask(1, 39).data, f.causalmask(39).data)
+    with pytest.raises(ValueError):
+        nura.maskedfill(nura.randn(3, 4), np.ones((2, 4), dtype=bool), 0.0)
+
+
+def test_embedding_sparse_backward_matches_dense():
+    x = np.array([[1, 3, 3, 0], [2, 3, 1, 0]])
+    w = np.random.randn(6, 4)
+    dense = nura.tensor(w, usegrad=True)
+    sparse = nura.tensor(w, usegrad=True)
+    (f.embedding(nura.tensor(x), dense, padid=0) ** 2).sum().backward()
+    (f.embedding(nura.tensor(x), sparse, padid=0, sparse=True) ** 2).sum().backward()
+
+    assert isinstance(sparse.grad, nura.RowSparse)
+    np.testing.assert_array_equal(sparse.grad.indices, [1, 2, 3])
+    np.testing.assert_allclose(sparse.grad.data, dense.grad.data, rtol=1e-7, atol=1e-7)
+
+    tied = nura.tensor(w, usegrad=True)
+    output = f.embedding(nura.tensor(x), tied, sparse=True).sum() + tied.sum()
+    output.backward()
+    expected = np.ones_like(w) + np.bincount(x.ravel(), minlength=6)[:, None]
+    assert not isinstance(tied.grad, nura.RowSparse)
+    np.testing.assert_allclose(tied.grad.data, expected, rtol=1e-7, atol=1e-7)
+
+    embedding = nn.Embedding(4, 6, 0, nura.double)
+    assert not embedding.sparse and embedding.dtype is nura.double
+
+
+def test_optimizers_sparse_step_matches_dense():
+    x = nura.tensor(np.array([[4, 1, 4], [7, 1, 2]]))
+    w = np.random.randn(8, 3)
+    optimizers = (
+        lambda p: nn.SGD(p, 0.1, nesterov=True),
+        lambda p: nn.Adam(p, 0.1),
+        lambda p: nn.RMSProp(p, 0.1),
+        lambda p: nn.AdaGrad(p, 0.1),
+        lambda p: nn.AdaDelta(p),
+    )
+    for optimizer in optimizers:
+        weights = []
+        for sparse in (False, True):
+            weight = nura.tensor(w, usegrad=True)
+            opt = optimizer([weight])
+            opt.zerograd()
+            f.embedding(x, weight, sparse=sparse).square().sum().backward()
+            opt.step()
+            opt.zerograd()
+            weights.append(weight.data)
+        assert weight.grad is None
+        np.testing.assert_allclose(weights[1], weights[0], rtol=1e-7, atol=1e-7)
+        np.testing.assert_array_equal(weights[1][[0, 3, 5, 6]], w[[0, 3, 5, 6]])
+
+
+def test_embedding_sparse_backward_through_compile():
+    x = nura.tensor(np.array([[1, 3, 3, 0]]))
+    w = np.random.randn(5, 2)
+    func = lambda w: (f.embedding(x, w, None, True) ** 2).sum()
+    compiled = nura.compile(func, nura.tensor(w))
+    a, b = nura.tensor(w, usegrad=True), nura.tensor(w, usegrad=True)
+    compiled(a).backward()
+    func(b).backward()
+
+    np.testing.assert_allclose(a.grad.data, b.grad.data, rtol=1e-7, atol=1e-7)
+
+
+def test_flashattention_backward_with_neginf_padding_mask():
+    q = np.random.randn(2, 2, 5, 4)
+    k = np.random.randn(2, 2, 7, 4)
+    v = np.random.randn(2, 2, 7, 3)
+    w = np.random.randn(2, 2, 5, 3)
+    mask = np.ones((2, 1, 1, 7), dtype=bool)
+    mask[0, ..., :4] = False
+    flash = [nura.tensor(a, usegrad=True) for a in (q, k, v)]
+    dense = [nura.tensor(a, usegrad=True) for a in (q, k, v)]
+    result_tensor = f.flashattention(*flash, nura.tensor(mask), -np.inf, block=2)
+    expected, _ = f.attention(*dense, nura.tensor(mask), -np.inf)
+    result_tensor.backward(nura.tensor(w))
+    expected.backward(nura.tensor(w))
+
+    assert np.all(np.isfinite(result_tensor.data))
+    np.testing.assert_allclose(result_tensor.data, expected.data, rtol=1e-7, atol=1e-7)
+    for a, b in zip(flash, dense):
+        np.testing.assert_allclose(a.grad.data, b.grad.data, rtol=1e-7, atol=1e-7)
+
+
+def test_flashattention_jacfwd_matches_dense():
+    q, k, v = (nura.randn(2, 3, 2).double() for _ in range(3))
+    mask = f.causalmask(3)
+    flash = lambda *a: f.attention(*a, mask, weights=False, block=2)[0]
+    dense = lambda *a: f.attention(*a, mask)[0]
+
+    for pos in range(3):
+        _, result = nura.autograd.functional.jacfwd((q, k, v), flash, pos)
+        _, expected = nura.autograd.functional.jacfwd((q, k, v), dense, pos)
+        np.testing.assert_allclose(
+            result.data, expected.data, rtol=1e-7, atol=1e-7
+        )
+
+
+def test_multiheadattention_fused_projection_matches_separate():
+    mha = nn.MultiHeadAttention(8, 2, 3, 4, bias=True, dtype=nura.double)
+    linears = (mha.qweight, mha.kweight, mha.vweight)
+    x = nura.randn(2, 5, 8).double()
+    outputs, grads = [], []
+    for args in ((x, x, x), (x, x.clone(), x.clone())):
+        for l in linears:
+            l.weight.cleargrad()
+        output, _ = mha(*args)
+        (output**2).sum().backward()
+        outputs.append(output.data)
+        grads.append([l.weight.grad.data for l in linears])
+
+    assert mha.kweight.weight.dim == (8, 8) and mha.vweight.weight.dim == (12, 8)
+    packed = f.pack(*(l.weight for l in linears))
+    assert packed.dim == (28, 8)
+    assert np.shares_memory(packed.data, mha.qweight.weight.data)
+    np.testing.assert_allclose(outputs[0], outputs[1], rtol=1e-7, atol=1e-7)
+    for a, b in zip(*grads):
+        np.testing.assert_allclose(a, b, rtol=1e-7, atol=1e-7)
@@ -1,3 +1,4 @@
+import pytest
 import numpy as np
 import nura
 import nura.nn.functional as f
@@ -914,6 +915,81 @@ def test_attention_no_peak():
     np.testing.assert_allclose(weights.data, expected_weights, rtol=1e-7, atol=1e-7)
 
 
+def test_attention_tiled_without_weights():
+    q = np.random.rand(2, 5, 4)
+    k = np.random.rand(2, 7, 4)
+    v = np.random.rand(2, 7, 3)
+    mask = np.random.choice([True, False], size=(2, 5, 7))
+    q_tensor = nura.tensor(q)
+    k_tensor = nura.tensor(k)
+    v_tensor = nura.tensor(v)
+    mask_tensor = nura.tensor(mask)
+    context, weights = f.attention(
+        q_tensor, k_tensor, v_tensor, mask_tensor, weights=False, block=3
+    )
+
+    expected_context, _ = attention_reference(q, k, v, mask)
+
+    assert weights is None
+    np.testing.assert_allclose(context.data, expected_context, rtol=1e-7, atol=1e-7)
+
+
+def test_multiheadattention_kvcache_matches_full_sequence():
+    mha = nura.nn.MultiHeadAttention(8, 2, 2, 4, dtype=nura.double)
+    x = nura.randn(2, 5, 8).double()
+    mask = nura.tensor(np.tril(np.ones((5, 5))).astype(bool))
+    cache = nura.nn.KVCache(8)
+
+    with nura.inference():
+        expected, _ = mha(x, x, x, mask=mask)
+        prefix = x[:, :2]
+        outputs = [mha(prefix, prefix, prefix, cache=cache)[0]]
+        for t in range(2, 5):
+            token = x[:, t : t + 1]
+            outputs.append(mha(token, token, token, cache=cache)[0])
+
+    result = np.concatenate([o.data for o in outputs], axis=1)
+    assert cache.lengths == (5, 5)
+    np.testing.assert_allclose(result, expected.data, rtol=1e-7, atol=1e-7)
+    with pytest.raises(ValueError):
+        cache.append(nura.randn(2, 4, 4, 2), nura.randn(2, 4, 4, 2))
+
+
+def test_kvcache_ragged_lengths_mask_padding():
+    k = np.random.rand(2, 1, 3, 4)
+    v = np.random.rand(2, 1, 3, 4)
+    cache = nura.nn.KVCache(6)
+    cache.append(nura.tensor(k), nura.tensor(v), counts=[3, 1])
+    _, _, mask = cache.append(nura.tensor(k[:, :, :1]), nura.tensor(v[:, :, :1]))
+
+    assert cache.lengths == (4, 2)
+    np.testing.assert_array_equal(
+        mask.data[:, 0, 0], [[True, True, True, True], [True, True, False, False]]
+    )
+
+
+def test_multiheadattention_kvcache_counts_and_grad_mode():
+    mha = nura.nn.MultiHeadAttention(8, 2, 2, 4, dtype=nura.double)
+    x = nura.randn(2, 3, 8).double()
+    cache = nura.nn.KVCache(6)
+
+    with nura.inference():
+        mha(x, x, x, cache=cache, counts=[3, 1])
+        token = x[1:2, :1]
+        expected, _ = mha(x[1:2, :2], x[1:2, :2], x[1:2, :2], mask=f.causalmask(2))
+        step = x[:, 1:2]
+        result, _ = mha(step, step, step, cache=cache)
+        with pytest.raises(ValueError):
+            mha(token, token, token, counts=[1])
+
+    assert cache.lengths == (4, 2)
+    np.testing.assert_allclose(
+        result.data[1, 0], expected.data[0, 1], rtol=1e-7, atol=1e-7
+    )
+    with pytest.raises(RuntimeError):
+        mha(step, step, step, cache=cache)
+
+
 def test_attention_with_dropout():
     q = np.random.rand(2, 3, 4)
     k = np.random.rand(2, 3, 4)